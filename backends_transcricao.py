@@ -0,0 +1,240 @@
+"""Backends de inferência: carga do modelo, transcrição de um array e detecção de idioma.
+
+O motor só conversa com ModeloInferencia. O backend "whisper" usa o openai-whisper (PyTorch),
+"ctranslate2" usa o faster-whisper (pacote opcional) e "stub" devolve texto sintético sem
+modelo algum, para testes e benchmarks. Todos devolvem os segmentos no mesmo formato,
+(início, fim, texto, avg_logprob, no_speech_prob, tokens), com os tempos relativos ao array.
+
+Um modelo é identificado pelo backend, nome e precisão ("small", "small:int8",
+"ctranslate2/small:int8"); o backend e a precisão padrão são omitidos do identificador.
+"""
+import time
+
+from instrumentacao_transcricao import INSTRUMENTACAO
+from quantizacao_transcricao import PRECISAO_PADRAO, carregar_modelo_whisper
+
+BACKEND_PADRAO = "whisper"
+TAXA_AMOSTRAGEM = 16000  # Taxa de amostragem esperada pelo Whisper (16 kHz, mono)
+AMOSTRAS_JANELA = 30 * TAXA_AMOSTRAGEM  # Janela fixa do encoder do Whisper (30 s)
+TIPOS_CTRANSLATE2 = {"fp32": "float32", "int8": "int8"}  # Precisão -> compute_type do CTranslate2
+
+
+def identificador_modelo(nome_modelo, precisao=PRECISAO_PADRAO, backend=BACKEND_PADRAO):
+    """Nome do modelo no cache e nos processos; um nome já qualificado é mantido"""
+    if "/" in nome_modelo or ":" in nome_modelo:
+        return nome_modelo
+    identificador = nome_modelo if precisao == PRECISAO_PADRAO else f"{nome_modelo}:{precisao}"
+    return identificador if backend == BACKEND_PADRAO else f"{backend}/{identificador}"
+
+
+def separar_identificador(identificador):
+    """(backend, nome do modelo, precisão) de um identificador criado por identificador_modelo()"""
+    backend, _, resto = identificador.rpartition("/")
+    nome_modelo, _, precisao = resto.partition(":")
+    return backend or BACKEND_PADRAO, nome_modelo, precisao or PRECISAO_PADRAO
+
+
+def carregar_modelo_inferencia(identificador, threads=None):
+    """Carrega o modelo; `threads` limita as threads de CPU da inferência (None: padrão do backend)"""
+    backend, nome_modelo, precisao = separar_identificador(identificador)
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconhecido: '{backend}' (use {', '.join(BACKENDS)})")
+    return BACKENDS[backend].carregar(nome_modelo, precisao, threads)
+
+
+def _resumir_janela(texto, segmentos):
+    """(texto, avg_logprob, no_speech_prob, tokens) de uma janela transcrita segmento a segmento"""
+    if not segmentos:
+        return "", 0.0, 1.0, []
+    avg_logprob = sum(segmento[3] for segmento in segmentos) / len(segmentos)
+    tokens = [token for segmento in segmentos for token in segmento[5]]
+    return texto, avg_logprob, segmentos[0][4], tokens
+
+
+class ModeloInferencia:
+    """Interface dos modelos carregados por um backend"""
+    multilingue = True
+
+    @classmethod
+    def carregar(cls, nome_modelo, precisao, threads=None):
+        raise NotImplementedError
+
+    def transcrever(self, audio, idioma, temperatura):
+        """(texto, segmentos) de um array float32 a 16 kHz; com `idioma` None, o modelo decide"""
+        raise NotImplementedError
+
+    def decodificar_janelas(self, janelas, idioma, temperatura):
+        """(texto, avg_logprob, no_speech_prob, tokens) de cada janela de até 30 s, na mesma ordem.
+
+        Sem decodificação em lote no backend, as janelas são transcritas uma a uma.
+        """
+        resultados = []
+        for janela in janelas:
+            with INSTRUMENTACAO.medir('inferencia', janelas=1):
+                texto, segmentos = self.transcrever(janela, idioma, temperatura)
+            resultados.append(_resumir_janela(texto, segmentos))
+        return resultados
+
+    def probabilidades_idioma(self, janelas):
+        """Distribuição {código: probabilidade} de cada janela de até 30 s"""
+        raise NotImplementedError
+
+    def tamanho_mb(self):
+        """Memória dos pesos, ou None se o backend não informar"""
+        return None
+
+
+def _bytes_tensores(valor):
+    # As camadas quantizadas guardam o peso int8 e o bias em uma tupla, fora de parameters()
+    if isinstance(valor, (tuple, list)):
+        return sum(_bytes_tensores(item) for item in valor)
+    if hasattr(valor, 'element_size'):
+        return valor.numel() * valor.element_size()
+    return 0
+
+
+class ModeloWhisper(ModeloInferencia):
+    """openai-whisper em PyTorch, em fp32 ou com as camadas lineares quantizadas"""
+
+    def __init__(self, modelo):
+        self.modelo = modelo
+
+    @classmethod
+    def carregar(cls, nome_modelo, precisao, threads=None):
+        if threads:
+            import torch
+
+            # O limite do PyTorch vale para o processo inteiro, não só para este modelo
+            torch.set_num_threads(threads)
+            try:
+                torch.set_num_interop_threads(1)
+            except RuntimeError:
+                pass  # Só pode ser definido antes do primeiro trabalho paralelo
+        return cls(carregar_modelo_whisper(nome_modelo, precisao))
+
+    @property
+    def multilingue(self):
+        return self.modelo.is_multilingual
+
+    def transcrever(self, audio, idioma, temperatura):
+        resultado = self.modelo.transcribe(audio, language=idioma, temperature=temperatura, task="transcribe")
+        return resultado['text'], [(segmento['start'], segmento['end'], segmento['text'], segmento['avg_logprob'],
+                                    segmento['no_speech_prob'], segmento['tokens'])
+                                   for segmento in resultado['segments']]
+
+    def _mels(self, janelas):
+        import torch
+        import whisper
+
+        return torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(janela), n_mels=self.modelo.dims.n_mels)
+            for janela in janelas
+        ]).to(self.modelo.device)
+
+    def decodificar_janelas(self, janelas, idioma, temperatura):
+        """Empilha o log-mel das janelas e as decodifica em uma única chamada do Whisper.
+
+        Diferente de transcribe(), não há nova tentativa com temperaturas maiores; janelas
+        classificadas como sem fala viram texto vazio.
+        """
+        import whisper
+
+        with INSTRUMENTACAO.medir('log_mel', janelas=len(janelas)):
+            mels = self._mels(janelas)
+        opcoes_decodificacao = whisper.DecodingOptions(task="transcribe", language=idioma, temperature=temperatura,
+                                                       without_timestamps=True,
+                                                       fp16=self.modelo.device.type == "cuda")
+        with INSTRUMENTACAO.medir('inferencia', janelas=len(janelas)):
+            decodificados = whisper.decode(self.modelo, mels, opcoes_decodificacao)
+        resultados = []
+        for resultado in decodificados:
+            # Mesmo critério de transcribe() para descartar alucinações em trechos sem fala
+            if resultado.no_speech_prob > 0.6 and resultado.avg_logprob < -1.0:
+                resultados.append(("", resultado.avg_logprob, resultado.no_speech_prob, []))
+            else:
+                # transcribe() devolve o texto com espaço inicial
+                resultados.append((" " + resultado.text, resultado.avg_logprob, resultado.no_speech_prob,
+                                   resultado.tokens))
+        return resultados
+
+    def probabilidades_idioma(self, janelas):
+        _, probabilidades = self.modelo.detect_language(self._mels(janelas))
+        return [probabilidades] if isinstance(probabilidades, dict) else probabilidades
+
+    def tamanho_mb(self):
+        try:
+            return sum(_bytes_tensores(valor) for valor in self.modelo.state_dict().values()) / (1024 * 1024)
+        except Exception:
+            return None
+
+
+class ModeloCTranslate2(ModeloInferencia):
+    """faster-whisper sobre o CTranslate2; a precisão vira o compute_type (int8 sem quantizar em Python)"""
+
+    def __init__(self, modelo):
+        self.modelo = modelo
+
+    @classmethod
+    def carregar(cls, nome_modelo, precisao, threads=None):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise RuntimeError("O backend 'ctranslate2' requer o pacote faster-whisper "
+                               "(pip install faster-whisper)") from e
+        # cpu_threads=0 deixa o CTranslate2 escolher (todos os núcleos)
+        return cls(WhisperModel(nome_modelo, device="auto", compute_type=TIPOS_CTRANSLATE2[precisao],
+                                cpu_threads=threads or 0))
+
+    @property
+    def multilingue(self):
+        return self.modelo.model.is_multilingual
+
+    def transcrever(self, audio, idioma, temperatura):
+        # beam_size=1: decodificação gulosa, como o transcribe() do openai-whisper por padrão
+        segmentos, _ = self.modelo.transcribe(audio, language=idioma, temperature=temperatura, task="transcribe",
+                                              beam_size=1)
+        segmentos = [(segmento.start, segmento.end, segmento.text, segmento.avg_logprob, segmento.no_speech_prob,
+                      list(segmento.tokens))
+                     for segmento in segmentos]
+        return "".join(segmento[2] for segmento in segmentos), segmentos
+
+    def probabilidades_idioma(self, janelas):
+        import numpy as np
+
+        extrator = self.modelo.feature_extractor
+        distribuicoes = []
+        for janela in janelas:
+            janela = np.pad(janela, (0, max(0, AMOSTRAS_JANELA - len(janela))))[:AMOSTRAS_JANELA]
+            saida = self.modelo.encode(extrator(janela)[..., :extrator.nb_max_frames])
+            # Tokens no formato "<|pt|>"
+            distribuicoes.append({token[2:-2]: probabilidade
+                                  for token, probabilidade in self.modelo.model.detect_language(saida)[0]})
+        return distribuicoes
+
+
+class ModeloStub(ModeloInferencia):
+    """Sem modelo: texto fixo e `custo` segundos de espera por segundo de áudio (testes e benchmarks)"""
+
+    def __init__(self, custo=0.0, idioma="pt"):
+        self.custo = custo
+        self.idioma = idioma
+
+    @classmethod
+    def carregar(cls, nome_modelo, precisao, threads=None):
+        return cls()
+
+    def transcrever(self, audio, idioma, temperatura):
+        segundos = len(audio) / TAXA_AMOSTRAGEM
+        if self.custo:
+            time.sleep(segundos * self.custo)
+        texto = f" Trecho sintético de {segundos:.1f} segundos."
+        return texto, [(0.0, segundos, texto, -0.2, 0.01, [50364, 1, 2, 3])]
+
+    def probabilidades_idioma(self, janelas):
+        return [{self.idioma: 1.0} for _ in janelas]
+
+    def tamanho_mb(self):
+        return 0.0
+
+
+BACKENDS = {"whisper": ModeloWhisper, "ctranslate2": ModeloCTranslate2, "stub": ModeloStub}
@@ -0,0 +1,60 @@
+"""Compara a vazão da inferência sequencial (transcribe por segmento) com a inferência em lote.
+
+Uso:
+    python benchmark_inferencia.py pasta_ou_arquivos... [--modelo base] [--lotes 1 4 8 16]
+
+Cada configuração transcreve os mesmos arquivos com o mesmo modelo já carregado, sem cache
+de transcrições, gravando em uma pasta temporária. A vazão é medida em segundos de áudio
+transcritos por segundo de relógio (xRT); o carregamento do modelo fica de fora.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from motor_transcricao import CacheModelos, MotorTranscricao, OpcoesTranscricao, listar_arquivos_audio
+
+
+def medir(arquivos_audio, opcoes, cache_modelos):
+    motor = MotorTranscricao(opcoes, cache_modelos=cache_modelos)
+    motor.carregar_modelo()
+    inicio = time.perf_counter()
+    resumo = motor.processar_lote(arquivos_audio)
+    tempo = time.perf_counter() - inicio
+    return tempo, motor.estatisticas['audio_processado'], resumo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("entradas", nargs="+", help="Arquivos de áudio e/ou pastas")
+    parser.add_argument("--modelo", default="base")
+    parser.add_argument("--idioma", default="auto")
+    parser.add_argument("--segmento", type=int, default=30, help="Duração do segmento em segundos (padrão: 30)")
+    parser.add_argument("--lotes", type=int, nargs="+", default=[1, 4, 8, 16],
+                        help="Tamanhos de lote a comparar; 1 é o laço sequencial atual")
+    args = parser.parse_args()
+
+    arquivos_audio = []
+    for entrada in args.entradas:
+        if os.path.isdir(entrada):
+            arquivos_audio.extend(listar_arquivos_audio(entrada))
+        else:
+            arquivos_audio.append(os.path.abspath(entrada))
+
+    cache_modelos = CacheModelos()
+    referencia = None
+    with tempfile.TemporaryDirectory() as pasta_saida:
+        for tamanho_lote in args.lotes:
+            opcoes = OpcoesTranscricao(modelo=args.modelo, idioma=args.idioma, segmento_duracao=args.segmento,
+                                       formato_saida="txt", pasta_saida=pasta_saida, cache_transcricoes=False,
+                                       tamanho_lote=tamanho_lote)
+            tempo, audio, resumo = medir(arquivos_audio, opcoes, cache_modelos)
+            vazao = audio / tempo if tempo else 0.0
+            referencia = referencia or vazao
+            print(f"lote {tamanho_lote:>3}: {len(arquivos_audio)} arquivo(s) | {audio:8.1f}s de áudio em "
+                  f"{tempo:7.2f}s | vazão {vazao:7.2f}x tempo real | {vazao / referencia:5.2f}x o primeiro | "
+                  f"erros: {resumo['erros']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""Benchmark reprodutível do pipeline de transcrição, com resultados em JSON para comparar execuções.
+
+Uso:
+    python benchmark_pipeline.py --stub --saida resultados.json
+    python benchmark_pipeline.py --modelos tiny base --formatos txt srt docx --segmentos 15 30 \\
+        --duracoes 60 600 --silencio 0.4 --formatos-audio mp3 flac wav --saida resultados.json
+    python benchmark_pipeline.py --stub --comparar anterior.json --tolerancia 0.1
+
+O áudio é sintético e determinístico (rajadas harmônicas moduladas e ruído, intercaladas com
+silêncio na proporção pedida), gerado em WAV e convertido pelo ffmpeg para os outros formatos.
+Com --stub, um modelo substituto devolve texto fixo e simula --custo-stub segundos de
+inferência por segundo de áudio: mede só o que é do pipeline (decodificação, segmentação,
+checkpoints, gravação), sem GPU nem download de modelos.
+
+Para cada combinação de modelo, formato de saída e duração de segmento, o lote inteiro é
+transcrito por um motor novo, sem cache de transcrições. O relatório traz o fator de tempo real
+de ponta a ponta, a sobrecarga por segmento, o tempo de gravação, o pico de memória e o tempo
+por etapa; a vazão de decodificação é medida à parte, por formato de áudio. Com --comparar, as
+combinações iguais são confrontadas com um resultado anterior, e o código de saída é 1 se o
+fator de tempo real piorar além da tolerância.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import wave
+from datetime import datetime
+
+import numpy as np
+
+from backends_transcricao import BACKEND_PADRAO, BACKENDS, ModeloStub
+from instrumentacao_transcricao import INSTRUMENTACAO, pico_rss_mb
+from motor_transcricao import FORMATOS_SAIDA, TAXA_AMOSTRAGEM, CacheModelos, MotorTranscricao, OpcoesTranscricao, \
+    carregar_audio_pcm
+from quantizacao_transcricao import PRECISAO_PADRAO, PRECISOES
+
+VERSAO_RESULTADOS = 1
+MODELO_STUB = "stub"
+
+
+# --- Áudio sintético ---
+def gerar_pcm(duracao, proporcao_silencio, semente=0, taxa=TAXA_AMOSTRAGEM):
+    """PCM float32 mono com trechos "de fala" e de silêncio; a mesma semente gera o mesmo áudio"""
+    gerador = np.random.default_rng(semente)
+    audio = np.zeros(int(duracao * taxa), dtype=np.float32)
+    posicao = 0
+    while posicao < len(audio):
+        # Blocos de 1 a 4 s; a proporção de silêncio vale na média do arquivo
+        tamanho = int(gerador.uniform(1.0, 4.0) * taxa)
+        if gerador.random() >= proporcao_silencio:
+            t = np.arange(min(tamanho, len(audio) - posicao)) / taxa
+            fundamental = gerador.uniform(100, 250)
+            sinal = sum(np.sin(2 * np.pi * fundamental * harmonico * t) / harmonico for harmonico in range(1, 6))
+            envelope = 0.5 + 0.5 * np.sin(2 * np.pi * gerador.uniform(3, 6) * t)  # Ritmo de sílabas
+            ruido = gerador.normal(0, 0.05, len(t))
+            audio[posicao:posicao + len(t)] = (0.2 * sinal * envelope + ruido).astype(np.float32)
+        posicao += tamanho
+    return np.clip(audio, -1.0, 1.0)
+
+
+def gravar_wav(caminho, audio, taxa=TAXA_AMOSTRAGEM):
+    with wave.open(caminho, 'wb') as arquivo:
+        arquivo.setnchannels(1)
+        arquivo.setsampwidth(2)
+        arquivo.setframerate(taxa)
+        arquivo.writeframes((audio * 32767).astype('<i2').tobytes())
+
+
+def gerar_corpus(pasta, duracoes, proporcao_silencio, formatos_audio, semente=0):
+    """Um arquivo por (duração, formato); retorna a lista de caminhos"""
+    arquivos = []
+    for indice, duracao in enumerate(duracoes):
+        base = os.path.join(pasta, f"sintetico_{duracao}s_{int(proporcao_silencio * 100)}sil")
+        caminho_wav = base + ".wav"
+        gravar_wav(caminho_wav, gerar_pcm(duracao, proporcao_silencio, semente + indice))
+        for formato in formatos_audio:
+            caminho = f"{base}.{formato}"
+            if formato != "wav":
+                subprocess.run(["ffmpeg", "-nostdin", "-y", "-v", "error", "-i", caminho_wav, caminho], check=True)
+            arquivos.append(caminho)
+        if "wav" not in formatos_audio:
+            os.remove(caminho_wav)
+    return arquivos
+
+
+# --- Medições ---
+def medir_decodificacao(arquivos):
+    """Segundos de áudio decodificados por segundo de relógio, por formato de entrada"""
+    por_formato = {}
+    for caminho in arquivos:
+        inicio = time.perf_counter()
+        audio = carregar_audio_pcm(caminho)
+        tempo = time.perf_counter() - inicio
+        acumulado = por_formato.setdefault(os.path.splitext(caminho)[1].lstrip("."), [0.0, 0.0])
+        acumulado[0] += len(audio) / TAXA_AMOSTRAGEM
+        acumulado[1] += tempo
+    return {formato: {'audio': audio, 'tempo': tempo, 'vazao': audio / tempo if tempo else None}
+            for formato, (audio, tempo) in por_formato.items()}
+
+
+def medir_configuracao(arquivos, opcoes, cache_modelos, memoria_python=False):
+    """Transcreve o corpus com um motor novo e resume as métricas da execução.
+
+    Com `memoria_python`, o tracemalloc mede o pico de alocações Python e numpy da combinação;
+    ele deixa o código Python mais lento, então os tempos dessa execução não são comparáveis.
+    """
+    with tempfile.TemporaryDirectory() as pasta_saida:
+        opcoes.pasta_saida = pasta_saida
+        motor = MotorTranscricao(opcoes, cache_modelos=cache_modelos)
+        motor.carregar_modelo()  # A carga fica fora da medição; ela aparece em 'carga_modelos'
+        INSTRUMENTACAO.limpar()
+        if memoria_python:
+            tracemalloc.start()
+        inicio = time.perf_counter()
+        resumo = motor.processar_lote(arquivos)
+        tempo = time.perf_counter() - inicio
+        pico_python = None
+        if memoria_python:
+            pico_python = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+
+    metricas = INSTRUMENTACAO.para_dict()
+    etapas = metricas['etapas']
+    audio = motor.estatisticas['audio_processado']
+    segmentos = etapas.get('inferencia', {}).get('contagem', 0)
+    sobrecarga = sum(etapas.get(etapa, {}).get('total', 0.0) for etapa in ('segmentacao', 'checkpoint'))
+    return {
+        'modelo': opcoes.identificador_modelo,
+        'formato': opcoes.formato_saida,
+        'segmento': opcoes.segmento_duracao,
+        'arquivos': len(arquivos),
+        'sucessos': resumo['sucessos'],
+        'erros': resumo['erros'],
+        'audio': audio,
+        'tempo': tempo,
+        'fator_tempo_real': tempo / audio if audio else None,
+        'segmentos': segmentos,
+        'sobrecarga_por_segmento_ms': sobrecarga / segmentos * 1000 if segmentos else None,
+        'gravacao': etapas.get('gravacao', {}).get('total', 0.0),
+        'pico_rss_mb': pico_rss_mb(),  # Do processo inteiro, portanto monotônico ao longo das combinações
+        'pico_python_mb': pico_python,  # Alocações Python e numpy desta combinação (só com --memoria-python)
+        'etapas': etapas,
+        'carga_modelos': metricas['carga_modelos'],
+    }
+
+
+def _ambiente():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {'python': sys.version.split()[0], 'plataforma': platform.platform(), 'processador': platform.processor(),
+            'cpus': os.cpu_count(), 'numpy': np.__version__, 'commit': commit}
+
+
+# --- Comparação ---
+def _chave(resultado):
+    return resultado['modelo'], resultado['formato'], resultado['segmento']
+
+
+def comparar(atual, anterior, tolerancia):
+    """Imprime a variação por combinação e retorna as que pioraram além da tolerância"""
+    if anterior.get('corpus') != atual['corpus']:
+        print("⚠️ O corpus difere do resultado anterior; a comparação é apenas indicativa")
+    anteriores = {_chave(resultado): resultado for resultado in anterior['resultados']}
+    regressoes = []
+    for resultado in atual['resultados']:
+        referencia = anteriores.get(_chave(resultado))
+        if not referencia or not referencia['fator_tempo_real'] or not resultado['fator_tempo_real']:
+            continue
+        variacao = resultado['fator_tempo_real'] / referencia['fator_tempo_real'] - 1
+        marca = "❌" if variacao > tolerancia else ("✅" if variacao < -tolerancia else "  ")
+        print(f"{marca} {resultado['modelo']:<8} {resultado['formato']:<8} segmento {resultado['segmento']:>3}s: "
+              f"RTF {referencia['fator_tempo_real']:.4f} -> {resultado['fator_tempo_real']:.4f} ({variacao:+.1%})")
+        if variacao > tolerancia:
+            regressoes.append(_chave(resultado))
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stub", action="store_true", help="Usar o modelo substituto em vez do Whisper")
+    parser.add_argument("--custo-stub", type=float, default=0.0,
+                        help="Segundos de inferência simulados por segundo de áudio no modelo substituto")
+    parser.add_argument("--modelos", nargs="+", default=["tiny"], help="Modelos Whisper (ignorado com --stub)")
+    parser.add_argument("--backend", default=BACKEND_PADRAO, choices=[b for b in BACKENDS if b != MODELO_STUB],
+                        help="Backend de inferência dos modelos (ignorado com --stub)")
+    parser.add_argument("--precisao", default=PRECISAO_PADRAO, choices=PRECISOES,
+                        help="Precisão da inferência dos modelos (ignorado com --stub)")
+    parser.add_argument("--formatos", nargs="+", default=["txt"], choices=FORMATOS_SAIDA)
+    parser.add_argument("--segmentos", type=int, nargs="+", default=[30], help="Durações de segmento em segundos")
+    parser.add_argument("--duracoes", type=int, nargs="+", default=[60, 300],
+                        help="Duração em segundos de cada arquivo sintético")
+    parser.add_argument("--silencio", type=float, default=0.3, help="Proporção de silêncio do áudio (0 a 1)")
+    parser.add_argument("--formatos-audio", nargs="+", default=["wav", "mp3", "flac"])
+    parser.add_argument("--idioma", default="pt", help="Idioma fixo (o modelo substituto não detecta idioma)")
+    parser.add_argument("--vad", action="store_true", help="Pular silêncio com o VAD")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--memoria-python", action="store_true",
+                        help="Medir o pico de alocações Python/numpy com tracemalloc (deixa os tempos mais lentos)")
+    parser.add_argument("--saida", help="Arquivo JSON para os resultados")
+    parser.add_argument("--comparar", metavar="ANTERIOR", help="Resultado JSON anterior para comparação")
+    parser.add_argument("--tolerancia", type=float, default=0.1,
+                        help="Piora relativa do fator de tempo real aceita na comparação (padrão: 0.1)")
+    args = parser.parse_args()
+
+    modelos = [MODELO_STUB] if args.stub else args.modelos
+    cache_modelos = CacheModelos()
+    if args.stub:
+        cache_modelos.adicionar(MODELO_STUB, ModeloStub(args.custo_stub))
+
+    corpus = {'duracoes': args.duracoes, 'silencio': args.silencio, 'formatos_audio': args.formatos_audio,
+              'semente': args.semente, 'vad': args.vad, 'memoria_python': args.memoria_python}
+    resultados = {'versao': VERSAO_RESULTADOS, 'data': datetime.now().isoformat(timespec='seconds'),
+                  'ambiente': _ambiente(), 'corpus': corpus, 'custo_stub': args.custo_stub if args.stub else None,
+                  'resultados': []}
+
+    with tempfile.TemporaryDirectory() as pasta_corpus:
+        arquivos = gerar_corpus(pasta_corpus, args.duracoes, args.silencio, args.formatos_audio, args.semente)
+        resultados['decodificacao'] = medir_decodificacao(arquivos)
+        for formato, medida in resultados['decodificacao'].items():
+            print(f"decodificação {formato:<5}: {medida['audio']:8.1f}s de áudio em {medida['tempo']:6.2f}s "
+                  f"| {medida['vazao'] or 0:8.1f}x tempo real")
+
+        for modelo in modelos:
+            for formato in args.formatos:
+                for segmento in args.segmentos:
+                    opcoes = OpcoesTranscricao(modelo=modelo, idioma=args.idioma, segmento_duracao=segmento,
+                                               formato_saida=formato, cache_transcricoes=False, vad=args.vad)
+                    if not args.stub:
+                        opcoes.backend, opcoes.precisao = args.backend, args.precisao
+                    resultado = medir_configuracao(arquivos, opcoes, cache_modelos, args.memoria_python)
+                    resultados['resultados'].append(resultado)
+                    print(f"{resultado['modelo']:<8} {formato:<8} segmento {segmento:>3}s: RTF "
+                          f"{resultado['fator_tempo_real'] or 0:.4f} | {resultado['segmentos']} segmento(s), "
+                          f"sobrecarga {resultado['sobrecarga_por_segmento_ms'] or 0:.2f} ms/segmento | "
+                          f"gravação {resultado['gravacao']:.3f}s | pico RSS {resultado['pico_rss_mb'] or 0:.0f} MB"
+                          f" | erros: {resultado['erros']}")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultados, arquivo, ensure_ascii=False, indent=2)
+        print(f"Resultados gravados em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as arquivo:
+            regressoes = comparar(resultados, json.load(arquivo), args.tolerancia)
+        if regressoes:
+            print(f"{len(regressoes)} combinação(ões) mais lenta(s) que o limite de {args.tolerancia:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
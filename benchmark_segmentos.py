@@ -0,0 +1,81 @@
+"""Mede o custo por segmento do caminho antigo (WAV temporário) versus o caminho em memória.
+
+Uso:
+    python benchmark_segmentos.py caminho/do/audio.mp3 [--segmento 30]
+
+A inferência do modelo é idêntica nos dois caminhos e por isso fica de fora:
+medimos apenas o que acontece entre "tenho o áudio" e "entreguei o segmento ao Whisper".
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import whisper
+from pydub import AudioSegment
+
+from motor_transcricao import TAXA_AMOSTRAGEM, carregar_audio_pcm
+
+
+def medir_caminho_wav_temporario(caminho_audio, segmento_duracao):
+    """Caminho antigo: fatiar AudioSegment, exportar WAV e deixar o Whisper decodificar de novo"""
+    inicio = time.perf_counter()
+    audio = AudioSegment.from_file(caminho_audio)
+    tempo_decodificacao = time.perf_counter() - inicio
+
+    duracao = len(audio) / 1000
+    tempos = []
+    for start in range(0, int(duracao) + 1, segmento_duracao):
+        segmento = audio[start * 1000:min(start + segmento_duracao, duracao) * 1000]
+        if len(segmento) == 0:
+            continue
+        t0 = time.perf_counter()
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
+            temp_file_path = temp_file.name
+        segmento.export(temp_file_path, format="wav")
+        whisper.load_audio(temp_file_path)  # O que modelo.transcribe(caminho) faz internamente
+        os.remove(temp_file_path)
+        tempos.append(time.perf_counter() - t0)
+
+    return tempo_decodificacao, tempos
+
+
+def medir_caminho_memoria(caminho_audio, segmento_duracao):
+    """Caminho novo: decodificar uma vez e entregar views do buffer float32"""
+    inicio = time.perf_counter()
+    audio = carregar_audio_pcm(caminho_audio)
+    tempo_decodificacao = time.perf_counter() - inicio
+
+    amostras_segmento = segmento_duracao * TAXA_AMOSTRAGEM
+    tempos = []
+    for inicio_amostra in range(0, len(audio), amostras_segmento):
+        t0 = time.perf_counter()
+        segmento = audio[inicio_amostra:inicio_amostra + amostras_segmento]
+        assert segmento.base is not None  # Garante que é uma view, não uma cópia
+        tempos.append(time.perf_counter() - t0)
+
+    return tempo_decodificacao, tempos
+
+
+def _resumir(nome, tempo_decodificacao, tempos):
+    media_ms = (sum(tempos) / len(tempos)) * 1000 if tempos else 0.0
+    print(f"{nome:<22} decodificação: {tempo_decodificacao:8.3f}s | segmentos: {len(tempos):5d} | "
+          f"overhead/segmento: {media_ms:9.3f} ms | overhead total: {sum(tempos):8.3f}s")
+    return media_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("arquivo", help="Arquivo de áudio a ser usado na medição")
+    parser.add_argument("--segmento", type=int, default=30, help="Duração do segmento em segundos (padrão: 30)")
+    args = parser.parse_args()
+
+    media_antiga = _resumir("WAV temporário", *medir_caminho_wav_temporario(args.arquivo, args.segmento))
+    media_nova = _resumir("Buffer em memória", *medir_caminho_memoria(args.arquivo, args.segmento))
+
+    if media_nova > 0:
+        print(f"\nO caminho em memória reduz o overhead por segmento em {media_antiga / media_nova:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Cache em disco do áudio decodificado (PCM float32 mono a 16 kHz).
+
+Transcrever de novo o mesmo acervo com outro modelo, idioma ou temperatura decodificaria cada
+arquivo outra vez pelo ffmpeg, o que pesa em formatos comprimidos (M4A, OGG, WEBM). Aqui as
+amostras decodificadas ficam em `<pasta>/<sha256>_<taxa>.f32`, um array float32 cru, endereçado
+pelo SHA-256 do arquivo de origem: renomear ou copiar o áudio não invalida a entrada, e
+alterá-lo muda o hash. O hash de cada caminho vem da MemoriaHashes do cache de transcrições
+(mesmo banco), então cada arquivo novo é lido uma única vez pelos dois caches. Na
+reutilização, o array é mapeado em memória (np.memmap), então os segmentos são views do
+arquivo, lidas sob demanda, sem cópia nem decodificação. Ao exceder `tamanho_max_mb`, as
+entradas acessadas há mais tempo são removidas.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from backends_transcricao import TAXA_AMOSTRAGEM
+from cache_transcricoes import BANCO_CACHE_PADRAO, MemoriaHashes
+
+PASTA_CACHE_AUDIO_PADRAO = "cache_audio"
+TAMANHO_CACHE_AUDIO_PADRAO_MB = 4096
+BYTES_AMOSTRA = 4  # float32
+
+
+class GravacaoAudio:
+    """Entrada em gravação, bloco a bloco; só é registrada no cache ao concluir"""
+
+    def __init__(self, cache, hash_audio, taxa):
+        self.cache = cache
+        self.hash_audio = hash_audio
+        self.taxa = taxa
+        self.caminho = cache.caminho_entrada(hash_audio, taxa)
+        self.temporario = f"{self.caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self.amostras = 0
+        self._arquivo = open(self.temporario, 'wb')
+
+    def escrever(self, bloco):
+        np.asarray(bloco, dtype=np.float32).tofile(self._arquivo)
+        self.amostras += len(bloco)
+
+    def concluir(self):
+        self._arquivo.close()
+        os.replace(self.temporario, self.caminho)
+        self.cache.registrar(self.hash_audio, self.taxa, self.amostras)
+
+    def descartar(self):
+        self._arquivo.close()
+        try:
+            os.remove(self.temporario)
+        except OSError:
+            pass
+
+
+class CacheAudio:
+    """PCM decodificado por hash do arquivo de origem, com remoção dos menos acessados ao exceder `tamanho_max_mb`"""
+
+    def __init__(self, pasta=PASTA_CACHE_AUDIO_PADRAO, tamanho_max_mb=TAMANHO_CACHE_AUDIO_PADRAO_MB,
+                 banco_hashes=BANCO_CACHE_PADRAO):
+        self.pasta = pasta
+        self.tamanho_max_mb = tamanho_max_mb
+        self.acertos = 0
+        self.falhas = 0
+        self.removidos = 0
+        self._lock = threading.Lock()
+        os.makedirs(pasta, exist_ok=True)
+        self.caminho_banco = os.path.join(pasta, "indice.db")
+        self._inicializar_banco()
+        self.hashes = MemoriaHashes(banco_hashes)
+
+    # --- Persistência ---
+    def _conectar(self):
+        return sqlite3.connect(self.caminho_banco, timeout=30)
+
+    def _inicializar_banco(self):
+        with self._conectar() as conexao:
+            conexao.execute("""
+                CREATE TABLE IF NOT EXISTS entradas (
+                    hash_audio TEXT NOT NULL,
+                    taxa INTEGER NOT NULL,
+                    amostras INTEGER NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    criado_em REAL NOT NULL,
+                    ultimo_acesso REAL NOT NULL,
+                    PRIMARY KEY (hash_audio, taxa)
+                )
+            """)
+
+    def caminho_entrada(self, hash_audio, taxa):
+        return os.path.join(self.pasta, f"{hash_audio}_{taxa}.f32")
+
+    # --- Chaves ---
+    def hash_audio(self, caminho_audio):
+        """Hash do conteúdo, pela memória compartilhada com o cache de transcrições"""
+        return self.hashes.hash_audio(caminho_audio)
+
+    # --- Áudio ---
+    def obter(self, caminho_audio, taxa=TAXA_AMOSTRAGEM):
+        """Amostras do arquivo mapeadas em memória, ou None se ainda não estiverem no cache"""
+        hash_audio = self.hash_audio(caminho_audio)
+        with self._conectar() as conexao:
+            linha = conexao.execute("SELECT amostras FROM entradas WHERE hash_audio = ? AND taxa = ?",
+                                    (hash_audio, taxa)).fetchone()
+            if linha:
+                conexao.execute("UPDATE entradas SET ultimo_acesso = ? WHERE hash_audio = ? AND taxa = ?",
+                                (time.time(), hash_audio, taxa))
+        audio = self._mapear(hash_audio, taxa, linha[0]) if linha else None
+        with self._lock:
+            if audio is not None:
+                self.acertos += 1
+            else:
+                self.falhas += 1
+        return audio
+
+    def _mapear(self, hash_audio, taxa, amostras):
+        caminho = self.caminho_entrada(hash_audio, taxa)
+        try:
+            if os.path.getsize(caminho) != amostras * BYTES_AMOSTRA:
+                raise OSError("tamanho diferente do registrado")
+            if amostras == 0:
+                return np.zeros(0, dtype=np.float32)
+            # "c" (cópia na escrita): as views são graváveis, como as de um array decodificado,
+            # mas nada volta ao arquivo
+            return np.memmap(caminho, dtype=np.float32, mode='c', shape=(amostras,))
+        except OSError as e:
+            logging.warning(f"Entrada do cache de áudio ilegível em '{caminho}', decodificando de novo: {e}")
+            with self._conectar() as conexao:
+                conexao.execute("DELETE FROM entradas WHERE hash_audio = ? AND taxa = ?", (hash_audio, taxa))
+            return None
+
+    def gravador(self, caminho_audio, taxa=TAXA_AMOSTRAGEM):
+        """GravacaoAudio para guardar o arquivo bloco a bloco, enquanto ele é decodificado"""
+        return GravacaoAudio(self, self.hash_audio(caminho_audio), taxa)
+
+    def guardar(self, caminho_audio, audio, taxa=TAXA_AMOSTRAGEM):
+        gravacao = self.gravador(caminho_audio, taxa)
+        try:
+            gravacao.escrever(audio)
+        except BaseException:
+            gravacao.descartar()
+            raise
+        gravacao.concluir()
+
+    def registrar(self, hash_audio, taxa, amostras):
+        agora = time.time()
+        with self._conectar() as conexao:
+            conexao.execute(
+                "INSERT OR REPLACE INTO entradas (hash_audio, taxa, amostras, tamanho, criado_em, ultimo_acesso) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (hash_audio, taxa, amostras, amostras * BYTES_AMOSTRA, agora, agora)
+            )
+        self._aplicar_limite()
+
+    def _aplicar_limite(self):
+        """Remove as entradas acessadas há mais tempo até caber no tamanho máximo"""
+        limite = self.tamanho_max_mb * 1024 * 1024
+        with self._conectar() as conexao:
+            total = conexao.execute("SELECT COALESCE(SUM(tamanho), 0) FROM entradas").fetchone()[0]
+            if total <= limite:
+                return
+            linhas = conexao.execute(
+                "SELECT hash_audio, taxa, tamanho FROM entradas ORDER BY ultimo_acesso").fetchall()
+            removidas = []
+            for hash_audio, taxa, tamanho in linhas:
+                if total <= limite:
+                    break
+                try:
+                    os.remove(self.caminho_entrada(hash_audio, taxa))
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    # No Windows, um arquivo mapeado por outra transcrição não pode ser removido agora
+                    logging.warning(f"Não foi possível remover do cache de áudio: {e}")
+                    continue
+                removidas.append((hash_audio, taxa))
+                total -= tamanho
+            conexao.executemany("DELETE FROM entradas WHERE hash_audio = ? AND taxa = ?", removidas)
+        with self._lock:
+            self.removidos += len(removidas)
+        logging.info(f"Cache de áudio: {len(removidas)} entrada(s) removida(s) para caber em "
+                     f"{self.tamanho_max_mb} MB")
+
+    def limpar(self):
+        with self._conectar() as conexao:
+            linhas = conexao.execute("SELECT hash_audio, taxa FROM entradas").fetchall()
+            for hash_audio, taxa in linhas:
+                try:
+                    os.remove(self.caminho_entrada(hash_audio, taxa))
+                except OSError:
+                    pass
+            conexao.execute("DELETE FROM entradas")
+
+    def resumo(self):
+        """Linhas de texto para a aba de estatísticas e para o log"""
+        with self._conectar() as conexao:
+            entradas, total = conexao.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM entradas").fetchone()
+        return [f"Entradas: {entradas} ({total / (1024 * 1024):.1f} de {self.tamanho_max_mb} MB)",
+                f"Acertos: {self.acertos} | Falhas: {self.falhas} | Removidas: {self.removidos}"]
@@ -0,0 +1,264 @@
+"""Cache de transcrições endereçado pelo conteúdo do áudio.
+
+A chave combina o SHA-256 do arquivo com os parâmetros que alteram o texto (modelo, precisão,
+idioma, temperatura, duração do segmento, VAD e decodificação em lote), então renomear ou
+copiar um áudio não invalida o cache, e trocar qualquer parâmetro gera uma nova entrada. O
+banco SQLite também guarda o hash de cada caminho (por tamanho e data de modificação), para
+não reler arquivos inalterados, as saídas já gravadas, para não duplicar transcrições a cada
+execução, e o idioma detectado de cada áudio por modelo, backend e precisão, para não sondá-lo
+de novo. Cada transcrição guarda também os segmentos do Whisper (ArmazemSegmentos), de onde
+qualquer formato é gerado; entradas antigas, só com o texto, contam como falha e são
+substituídas.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from backends_transcricao import BACKEND_PADRAO
+from quantizacao_transcricao import PRECISAO_PADRAO
+from segmentos_transcricao import ArmazemSegmentos
+
+BANCO_CACHE_PADRAO = "cache_transcricoes.db"
+TAMANHO_CACHE_PADRAO_MB = 256
+
+
+def calcular_hash_arquivo(caminho_arquivo, tamanho_bloco=1024 * 1024):
+    """SHA-256 do conteúdo, lido em blocos para não carregar o arquivo inteiro"""
+    sha = hashlib.sha256()
+    with open(caminho_arquivo, 'rb') as arquivo:
+        while True:
+            bloco = arquivo.read(tamanho_bloco)
+            if not bloco:
+                break
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+class MemoriaHashes:
+    """Hash do conteúdo de cada caminho, reaproveitado enquanto tamanho e data de modificação não mudarem.
+
+    Os caches de transcrições e de áudio usam a mesma tabela, então um arquivo novo ou
+    alterado é lido e hasheado uma única vez, mesmo com os dois ativos.
+    """
+
+    def __init__(self, caminho_banco=BANCO_CACHE_PADRAO):
+        self.caminho_banco = caminho_banco
+        with self._conectar() as conexao:
+            conexao.execute("""
+                CREATE TABLE IF NOT EXISTS hashes (
+                    caminho TEXT PRIMARY KEY,
+                    tamanho INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    hash_audio TEXT NOT NULL
+                )
+            """)
+
+    def _conectar(self):
+        return sqlite3.connect(self.caminho_banco, timeout=30)
+
+    def hash_audio(self, caminho_audio):
+        caminho_audio = os.path.abspath(caminho_audio)
+        info = os.stat(caminho_audio)
+        with self._conectar() as conexao:
+            linha = conexao.execute("SELECT tamanho, mtime, hash_audio FROM hashes WHERE caminho = ?",
+                                    (caminho_audio,)).fetchone()
+        if linha and linha[0] == info.st_size and linha[1] == info.st_mtime:
+            return linha[2]
+
+        hash_audio = calcular_hash_arquivo(caminho_audio)
+        with self._conectar() as conexao:
+            conexao.execute("INSERT OR REPLACE INTO hashes (caminho, tamanho, mtime, hash_audio) VALUES (?, ?, ?, ?)",
+                            (caminho_audio, info.st_size, info.st_mtime, hash_audio))
+        return hash_audio
+
+
+class CacheTranscricoes:
+    """Transcrições já feitas, com remoção das menos acessadas ao exceder `tamanho_max_mb`"""
+
+    def __init__(self, caminho_banco=BANCO_CACHE_PADRAO, tamanho_max_mb=TAMANHO_CACHE_PADRAO_MB):
+        self.caminho_banco = caminho_banco
+        self.tamanho_max_mb = tamanho_max_mb
+        self.acertos = 0
+        self.falhas = 0
+        self.removidos = 0
+        self._lock = threading.Lock()
+        self._inicializar_banco()
+        self.hashes = MemoriaHashes(caminho_banco)
+
+    # --- Persistência ---
+    def _conectar(self):
+        return sqlite3.connect(self.caminho_banco, timeout=30)
+
+    def _inicializar_banco(self):
+        with self._conectar() as conexao:
+            conexao.execute("""
+                CREATE TABLE IF NOT EXISTS transcricoes (
+                    chave TEXT PRIMARY KEY,
+                    hash_audio TEXT NOT NULL,
+                    texto TEXT NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    criado_em REAL NOT NULL,
+                    ultimo_acesso REAL NOT NULL
+                )
+            """)
+            colunas = {linha[1] for linha in conexao.execute("PRAGMA table_info(transcricoes)")}
+            if 'segmentos' not in colunas:
+                conexao.execute("ALTER TABLE transcricoes ADD COLUMN segmentos BLOB")
+            conexao.execute("""
+                CREATE TABLE IF NOT EXISTS saidas (
+                    chave TEXT NOT NULL,
+                    caminho_audio TEXT NOT NULL,
+                    formato TEXT NOT NULL,
+                    pasta_saida TEXT NOT NULL,
+                    caminho_saida TEXT NOT NULL,
+                    PRIMARY KEY (chave, caminho_audio, formato, pasta_saida)
+                )
+            """)
+            conexao.execute("""
+                CREATE TABLE IF NOT EXISTS idiomas (
+                    hash_audio TEXT NOT NULL,
+                    modelo TEXT NOT NULL,
+                    idioma TEXT NOT NULL,
+                    confianca REAL NOT NULL,
+                    PRIMARY KEY (hash_audio, modelo)
+                )
+            """)
+
+    # --- Chaves ---
+    def hash_audio(self, caminho_audio):
+        """Hash do conteúdo, reaproveitado enquanto tamanho e data de modificação não mudarem"""
+        return self.hashes.hash_audio(caminho_audio)
+
+    @staticmethod
+    def chave(hash_audio, opcoes):
+        parametros = {
+            'modelo': opcoes.modelo,
+            'idioma': opcoes.idioma,
+            'temperatura': float(opcoes.temperatura),
+            'segmento_duracao': int(opcoes.segmento_duracao),
+            'vad': bool(opcoes.vad),
+        }
+        if opcoes.precisao != PRECISAO_PADRAO:
+            parametros['precisao'] = opcoes.precisao  # Só fora do padrão, para manter as chaves já gravadas
+        if opcoes.backend != BACKEND_PADRAO:
+            parametros['backend'] = opcoes.backend
+        if opcoes.tamanho_lote > 1:
+            # Em lote, as janelas são decodificadas sem o texto anterior como contexto, então o texto
+            # muda; o tamanho do lote em si não altera o resultado
+            parametros['em_lote'] = True
+        assinatura = json.dumps(parametros, sort_keys=True)
+        return hashlib.sha256(f"{hash_audio}|{assinatura}".encode('utf-8')).hexdigest()
+
+    # --- Transcrições ---
+    def obter(self, chave):
+        """ArmazemSegmentos em cache para a chave, ou None"""
+        with self._conectar() as conexao:
+            linha = conexao.execute("SELECT segmentos FROM transcricoes WHERE chave = ? AND segmentos IS NOT NULL",
+                                    (chave,)).fetchone()
+            if linha:
+                conexao.execute("UPDATE transcricoes SET ultimo_acesso = ? WHERE chave = ?", (time.time(), chave))
+        with self._lock:
+            if linha:
+                self.acertos += 1
+            else:
+                self.falhas += 1
+        return ArmazemSegmentos.de_bytes(linha[0])[0] if linha else None
+
+    def guardar(self, chave, hash_audio, armazem, incluir_timestamps=False):
+        """Guarda os segmentos e, para consulta direta no banco, o texto já formatado"""
+        agora = time.time()
+        texto = armazem.texto_completo(incluir_timestamps)
+        segmentos = armazem.para_bytes()
+        with self._conectar() as conexao:
+            conexao.execute(
+                "INSERT OR REPLACE INTO transcricoes (chave, hash_audio, texto, segmentos, tamanho, criado_em, "
+                "ultimo_acesso) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (chave, hash_audio, texto, segmentos, len(texto.encode('utf-8')) + len(segmentos), agora, agora)
+            )
+        self._aplicar_limite()
+
+    def _aplicar_limite(self):
+        """Remove as transcrições acessadas há mais tempo até caber no tamanho máximo"""
+        limite = self.tamanho_max_mb * 1024 * 1024
+        with self._conectar() as conexao:
+            total = conexao.execute("SELECT COALESCE(SUM(tamanho), 0) FROM transcricoes").fetchone()[0]
+            if total <= limite:
+                return
+            linhas = conexao.execute("SELECT chave, tamanho FROM transcricoes ORDER BY ultimo_acesso").fetchall()
+            removidas = []
+            for chave, tamanho in linhas:
+                if total <= limite:
+                    break
+                removidas.append((chave,))
+                total -= tamanho
+            conexao.executemany("DELETE FROM transcricoes WHERE chave = ?", removidas)
+            conexao.executemany("DELETE FROM saidas WHERE chave = ?", removidas)
+        with self._lock:
+            self.removidos += len(removidas)
+        logging.info(f"Cache de transcrições: {len(removidas)} entrada(s) removida(s) para caber em "
+                     f"{self.tamanho_max_mb} MB")
+
+    # --- Saídas gravadas ---
+    @staticmethod
+    def _estilo(opcoes):
+        # Os timestamps não fazem parte da chave (a saída é gerada dos segmentos), mas mudam o arquivo
+        return f"{opcoes.formato_saida}+timestamps" if opcoes.incluir_timestamps else opcoes.formato_saida
+
+    def obter_saida(self, chave, caminho_audio, opcoes):
+        """Arquivo já gravado para este áudio, formato e pasta, se ainda existir em disco"""
+        with self._conectar() as conexao:
+            linha = conexao.execute(
+                "SELECT caminho_saida FROM saidas WHERE chave = ? AND caminho_audio = ? AND formato = ? "
+                "AND pasta_saida = ?",
+                (chave, os.path.abspath(caminho_audio), self._estilo(opcoes), opcoes.pasta_saida)
+            ).fetchone()
+        if linha and os.path.exists(linha[0]):
+            return linha[0]
+        return None
+
+    def registrar_saida(self, chave, caminho_audio, opcoes, caminho_saida):
+        with self._conectar() as conexao:
+            conexao.execute(
+                "INSERT OR REPLACE INTO saidas (chave, caminho_audio, formato, pasta_saida, caminho_saida) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (chave, os.path.abspath(caminho_audio), self._estilo(opcoes), opcoes.pasta_saida,
+                 os.path.abspath(caminho_saida))
+            )
+
+    # --- Idiomas detectados ---
+    def obter_idioma(self, hash_audio, modelo):
+        """(código, confiança) detectados antes para este áudio e modelo, ou None.
+
+        `modelo` é o identificador com backend e precisão (veja identificador_modelo), como na
+        chave das transcrições; no backend e precisão padrão ele é só o nome, como nas linhas antigas.
+        """
+        with self._conectar() as conexao:
+            linha = conexao.execute("SELECT idioma, confianca FROM idiomas WHERE hash_audio = ? AND modelo = ?",
+                                    (hash_audio, modelo)).fetchone()
+        return tuple(linha) if linha else None
+
+    def guardar_idioma(self, hash_audio, modelo, idioma, confianca):
+        with self._conectar() as conexao:
+            conexao.execute(
+                "INSERT OR REPLACE INTO idiomas (hash_audio, modelo, idioma, confianca) VALUES (?, ?, ?, ?)",
+                (hash_audio, modelo, idioma, confianca)
+            )
+
+    def limpar(self):
+        with self._conectar() as conexao:
+            conexao.execute("DELETE FROM transcricoes")
+            conexao.execute("DELETE FROM saidas")
+            conexao.execute("DELETE FROM hashes")
+            conexao.execute("DELETE FROM idiomas")
+
+    def resumo(self):
+        """Linhas de texto para a aba de estatísticas e para o log"""
+        with self._conectar() as conexao:
+            entradas, total = conexao.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM transcricoes").fetchone()
+        return [f"Entradas: {entradas} ({total / (1024 * 1024):.1f} de {self.tamanho_max_mb} MB)",
+                f"Acertos: {self.acertos} | Falhas: {self.falhas} | Removidas: {self.removidos}"]
@@ -0,0 +1,234 @@
+"""Linha de comando para o motor de transcrição, sem depender de Tkinter.
+
+Exemplos:
+    python -m cli_transcricao gravacao.mp3 --modelo small --idioma pt --formato txt
+    python -m cli_transcricao pasta/ --subpastas --processos 4 --json > progresso.jsonl
+    python -m cli_transcricao gravacao.mp3 --servico   # usa o serviço local com modelos já carregados
+    python -m cli_transcricao saida.segmentos.npz --reexportar --formato srt   # sem o modelo
+    python -m cli_transcricao pasta/ --metricas metricas.json --trace trace.json
+    python -m cli_transcricao pasta/ --modelo auto --prazo 90   # o modelo mais preciso que termina em 90 min
+
+Com --json, cada evento do motor é escrito em stdout como uma linha JSON (JSON Lines);
+sem ele, o andamento é mostrado em texto. O código de saída é 0 se não houve erros,
+1 se algum arquivo falhou e 2 se a execução foi cancelada (Ctrl+C).
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+
+from motor_transcricao import WhisperModel, IDIOMAS_WHISPER, FORMATOS_SAIDA, FFMPEG_DISPONIVEL, MODELO_AUTO, \
+    EXTENSOES_AUDIO, MotorTranscricao, OpcoesTranscricao, formatar_tempo, listar_arquivos_audio, reexportar
+from varredura_audio import varrer_arquivos_audio
+from backends_transcricao import BACKEND_PADRAO, BACKENDS
+from cache_audio import TAMANHO_CACHE_AUDIO_PADRAO_MB
+from instrumentacao_transcricao import INSTRUMENTACAO
+from quantizacao_transcricao import PRECISAO_PADRAO, PRECISOES
+from servico_transcricao import URL_PADRAO, ClienteServico
+
+
+def _criar_parser():
+    parser = argparse.ArgumentParser(prog="python -m cli_transcricao",
+                                     description="Transcreve arquivos de áudio com Whisper.")
+    parser.add_argument("entradas", nargs="+", help="Arquivos de áudio e/ou pastas (.segmentos.npz com --reexportar)")
+    parser.add_argument("--modelo", default=WhisperModel.TURBO.value,
+                        choices=[m.value for m in WhisperModel] + [MODELO_AUTO],
+                        help="Com 'auto', o modelo mais preciso que cumpre --prazo/--fator-alvo nesta máquina")
+    parser.add_argument("--prazo", type=float, default=0.0, metavar="MIN",
+                        help="Com --modelo auto, minutos para concluir o lote (reavaliado durante o lote)")
+    parser.add_argument("--fator-alvo", type=float, default=0.0,
+                        help="Com --modelo auto, segundos de processamento por segundo de áudio (padrão: 1.0)")
+    parser.add_argument("--precisao", default=PRECISAO_PADRAO, choices=PRECISOES,
+                        help="Precisão da inferência; int8 quantiza as camadas lineares (CPU)")
+    parser.add_argument("--backend", default=BACKEND_PADRAO, choices=list(BACKENDS),
+                        help="Biblioteca de inferência; ctranslate2 requer o pacote faster-whisper")
+    parser.add_argument("--idioma", default="auto", choices=list(IDIOMAS_WHISPER.keys()))
+    parser.add_argument("--temperatura", type=float, default=0.0)
+    parser.add_argument("--segmento", type=int, default=30, help="Duração do segmento em segundos")
+    parser.add_argument("--formato", default="docx", choices=FORMATOS_SAIDA)
+    parser.add_argument("--timestamps", action="store_true", help="Incluir timestamps na transcrição")
+    parser.add_argument("--pasta-saida", default="", help="Pasta de saída (padrão: a pasta do áudio)")
+    parser.add_argument("--subpastas", action="store_true", help="Incluir subpastas ao receber uma pasta")
+    parser.add_argument("--streaming", action="store_true", help="Decodificação em streaming (memória constante)")
+    parser.add_argument("--vad", action="store_true",
+                        help="Descartar silêncio antes da inferência e cortar os segmentos nas pausas")
+    parser.add_argument("--tamanho-lote", type=int, default=1,
+                        help="Janelas de 30 s decodificadas juntas, inclusive de arquivos diferentes (1 = sequencial)")
+    parser.add_argument("--agrupar-idioma", action="store_true",
+                        help="Com --idioma auto, detectar o idioma de cada arquivo antes e agrupar o lote por idioma")
+    parser.add_argument("--processos", type=int, default=1,
+                        help="Processos paralelos: um arquivo por processo no lote; com um só arquivo, "
+                             "faixas de tempo dele em paralelo")
+    parser.add_argument("--retomar", action="store_true",
+                        help="Continuar uma execução interrompida a partir dos checkpoints gravados")
+    parser.add_argument("--sem-cache", action="store_true",
+                        help="Ignorar o cache de transcrições e transcrever tudo novamente")
+    parser.add_argument("--cache-audio", action="store_true",
+                        help="Guardar o áudio decodificado em disco e reutilizá-lo nas próximas execuções")
+    parser.add_argument("--cache-audio-mb", type=int, default=TAMANHO_CACHE_AUDIO_PADRAO_MB,
+                        help="Tamanho máximo do cache de áudio decodificado")
+    parser.add_argument("--reexportar", action="store_true",
+                        help="Gerar --formato/--timestamps a partir de arquivos .segmentos.npz, sem transcrever")
+    parser.add_argument("--json", action="store_true", help="Emitir o andamento como JSON Lines em stdout")
+    parser.add_argument("--metricas", metavar="ARQUIVO",
+                        help="Gravar ao final o tempo por etapa, o fator de tempo real e o pico de memória (JSON)")
+    parser.add_argument("--trace", metavar="ARQUIVO",
+                        help="Gravar ao final as etapas medidas no formato de trace do Chrome (chrome://tracing)")
+    parser.add_argument("--servico", nargs="?", const=URL_PADRAO, default=None, metavar="URL",
+                        help=f"Enviar o trabalho ao serviço local (padrão: {URL_PADRAO})")
+    return parser
+
+
+def _expandir_entradas(entradas, incluir_subpastas):
+    arquivos_audio = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            arquivos_audio.extend(listar_arquivos_audio(entrada, incluir_subpastas))
+        else:
+            arquivos_audio.append(os.path.abspath(entrada))
+    return arquivos_audio
+
+
+def _imprimir_json(evento):
+    print(json.dumps(evento, ensure_ascii=False, default=str), flush=True)
+
+
+def _imprimir_texto(evento):
+    tipo = evento['tipo']
+    if tipo == 'detalhe':
+        print(evento['mensagem'], file=sys.stderr, flush=True)
+    elif tipo == 'segmento' and evento['progresso'] is not None:
+        print(f"\r{os.path.basename(evento['caminho'])}: {evento['progresso']:.0f}%", end="",
+              file=sys.stderr, flush=True)
+    elif tipo == 'arquivo_fim':
+        descricao = evento['saida'] if evento['status'] == 'sucesso' else (evento['erro'] or evento['status'])
+        print(f"\r[{evento['status']}] {os.path.basename(evento['caminho'])} "
+              f"({formatar_tempo(evento['tempo'])}): {descricao}", file=sys.stderr, flush=True)
+    elif tipo == 'job_fim' and evento['erro']:
+        print(f"Erro no serviço: {evento['erro']}", file=sys.stderr, flush=True)
+    elif tipo == 'lote_fim':
+        print(f"Concluído em {formatar_tempo(evento['tempo_total'])}: "
+              f"{evento['sucessos']} sucessos, {evento['erros']} erros", file=sys.stderr, flush=True)
+        for falha in evento.get('falhas') or []:
+            print(f"  falha: {falha['caminho']}: {falha['erro']}", file=sys.stderr, flush=True)
+
+
+def _reexportar(args):
+    """Regrava transcrições a partir dos segmentos guardados ao lado delas"""
+    erros = 0
+    for caminho_npz in args.entradas:
+        try:
+            caminho_saida = reexportar(caminho_npz, args.formato, args.timestamps, args.pasta_saida)
+        except Exception as e:
+            erros += 1
+            print(f"[erro] {caminho_npz}: {e}", file=sys.stderr, flush=True)
+            continue
+        print(f"[sucesso] {caminho_npz}: {caminho_saida}", file=sys.stderr, flush=True)
+    return 1 if erros else 0
+
+
+def _executar_no_servico(url, arquivos_audio, opcoes, ao_evento):
+    """Submete o trabalho ao serviço local e acompanha os eventos até o fim"""
+    cliente = ClienteServico(url)
+    job_id = cliente.submeter(arquivos_audio, opcoes)
+    try:
+        fim = cliente.acompanhar(job_id, ao_evento)
+    except KeyboardInterrupt:
+        cliente.cancelar(job_id)
+        return 2
+
+    if fim['estado'] == 'cancelado':
+        return 2
+    if fim['estado'] == 'erro' or (fim['resumo'] and fim['resumo']['erros']):
+        return 1
+    return 0
+
+
+def _exportar_instrumentacao(args):
+    destinos = ((args.metricas, INSTRUMENTACAO.exportar_json), (args.trace, INSTRUMENTACAO.exportar_trace))
+    for caminho, exportar in destinos:
+        if caminho:
+            try:
+                exportar(caminho)
+            except OSError as e:
+                print(f"Não foi possível gravar '{caminho}': {e}", file=sys.stderr)
+
+
+def main(argv=None):
+    args = _criar_parser().parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.reexportar:
+        return _reexportar(args)
+
+    if not FFMPEG_DISPONIVEL and not args.servico:
+        print("O executável 'ffmpeg' não foi encontrado no PATH do sistema.", file=sys.stderr)
+        return 1
+
+    pasta = args.entradas[0] if len(args.entradas) == 1 and os.path.isdir(args.entradas[0]) else None
+    if pasta is not None and not args.servico:
+        # Uma única pasta: a transcrição começa enquanto ela ainda está sendo varrida
+        arquivos_audio = None
+        encontrou = next(varrer_arquivos_audio(pasta, EXTENSOES_AUDIO, args.subpastas), None) is not None
+    else:
+        arquivos_audio = _expandir_entradas(args.entradas, args.subpastas)
+        encontrou = bool(arquivos_audio)
+    if not encontrou:
+        print("Nenhum arquivo de áudio encontrado.", file=sys.stderr)
+        return 1
+
+    opcoes = OpcoesTranscricao(
+        modelo=args.modelo,
+        idioma=args.idioma,
+        temperatura=args.temperatura,
+        segmento_duracao=args.segmento,
+        formato_saida=args.formato,
+        incluir_timestamps=args.timestamps,
+        pasta_saida=args.pasta_saida,
+        decodificacao_streaming=args.streaming,
+        num_processos=args.processos,
+        cache_transcricoes=not args.sem_cache,
+        cache_audio=args.cache_audio,
+        tamanho_cache_audio_mb=args.cache_audio_mb,
+        retomar=args.retomar,
+        vad=args.vad,
+        tamanho_lote=args.tamanho_lote,
+        agrupar_por_idioma=args.agrupar_idioma,
+        prazo_min=args.prazo,
+        fator_tempo_real_alvo=args.fator_alvo,
+        precisao=args.precisao,
+        backend=args.backend
+    )
+    ao_evento = _imprimir_json if args.json else _imprimir_texto
+
+    if args.servico:
+        try:
+            return _executar_no_servico(args.servico, arquivos_audio, opcoes, ao_evento)
+        except OSError as e:
+            print(f"Não foi possível falar com o serviço em {args.servico}: {e}", file=sys.stderr)
+            return 1
+
+    motor = MotorTranscricao(opcoes, ao_evento=ao_evento)
+
+    try:
+        if arquivos_audio is None:
+            resumo = motor.processar_pasta(pasta, args.subpastas)
+        else:
+            resumo = motor.processar_lote(arquivos_audio)
+    except KeyboardInterrupt:
+        motor.cancelar()
+        return 2
+    except Exception as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    finally:
+        _exportar_instrumentacao(args)
+
+    if resumo['cancelado']:
+        return 2
+    return 1 if resumo['erros'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
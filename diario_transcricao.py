@@ -0,0 +1,153 @@
+"""Diário de checkpoints por arquivo, para retomar transcrições interrompidas.
+
+Cada arquivo de áudio tem um diário JSON Lines: um cabeçalho com os parâmetros da execução,
+o idioma detectado (com idioma "auto"), um registro por segmento concluído (início, fim,
+texto bruto do Whisper e os segmentos internos com suas métricas) e, depois da gravação, um
+registro de conclusão com o arquivo de saída. Cada segmento é gravado com fsync assim que
+termina, então uma queda do processo perde no máximo o segmento em curso.
+"""
+import hashlib
+import json
+import logging
+import os
+
+from backends_transcricao import BACKEND_PADRAO
+from quantizacao_transcricao import PRECISAO_PADRAO
+
+PASTA_DIARIOS_PADRAO = "diarios_transcricao"
+
+
+def chave_entrada(caminho_audio):
+    """SHA-1 do caminho absoluto: identifica o arquivo de entrada no diário e nos nomes de saída"""
+    return hashlib.sha1(os.path.abspath(caminho_audio).encode('utf-8')).hexdigest()
+
+
+class DiarioTranscricao:
+    """Checkpoints de um arquivo; pode ser enviado a outro processo antes de iniciar()"""
+
+    def __init__(self, caminho_audio, opcoes, pasta=PASTA_DIARIOS_PADRAO):
+        self.caminho_audio = os.path.abspath(caminho_audio)
+        self.caminho = os.path.join(os.path.abspath(pasta), f"{chave_entrada(self.caminho_audio)}.jsonl")
+        info = os.stat(self.caminho_audio)
+        self.parametros = {
+            'caminho': self.caminho_audio,
+            'tamanho': info.st_size,
+            'mtime': info.st_mtime,
+            'modelo': opcoes.modelo,
+            'idioma': opcoes.idioma,
+            'temperatura': float(opcoes.temperatura),
+            'segmento_duracao': int(opcoes.segmento_duracao),
+        }
+        if opcoes.precisao != PRECISAO_PADRAO:
+            self.parametros['precisao'] = opcoes.precisao
+        if opcoes.backend != BACKEND_PADRAO:
+            self.parametros['backend'] = opcoes.backend
+        # Como no cache de transcrições: VAD e lote mudam os cortes e o texto; só fora do padrão,
+        # para que diários já gravados sem eles continuem válidos
+        if opcoes.vad:
+            self.parametros['vad'] = True
+        if opcoes.tamanho_lote > 1:
+            self.parametros['em_lote'] = True
+        self.trechos = []  # (inicio, fim, texto) dos segmentos já transcritos
+        self.detalhes = []  # Segmentos do Whisper de cada trecho (veja ArmazemSegmentos), ou None
+        self.idioma = None  # (código, confiança) fixado para o arquivo, ao retomar usa-se o mesmo
+        self.saida = None
+        self._arquivo = None
+
+    @property
+    def concluido(self):
+        return self.saida is not None
+
+    @property
+    def retomar_em(self):
+        """Segundo do áudio a partir do qual ainda não há checkpoint"""
+        return self.trechos[-1][1] if self.trechos else 0.0
+
+    def carregar(self):
+        """Lê um diário anterior com os mesmos parâmetros; retorna True se havia algo a retomar"""
+        if not os.path.exists(self.caminho):
+            return False
+
+        trechos, detalhes, idioma, saida = [], [], None, None
+        with open(self.caminho, 'r', encoding='utf-8') as arquivo:
+            for numero, linha in enumerate(arquivo):
+                try:
+                    registro = json.loads(linha)
+                except json.JSONDecodeError:
+                    break  # Última linha truncada por uma queda no meio da gravação
+                if numero == 0:
+                    if registro.get('parametros') != self.parametros:
+                        logging.info(f"Diário de '{self.caminho_audio}' descartado: parâmetros ou arquivo mudaram")
+                        return False
+                elif registro['tipo'] == 'idioma':
+                    idioma = (registro['idioma'], registro['confianca'])
+                elif registro['tipo'] == 'segmento':
+                    trechos.append((registro['inicio'], registro['fim'], registro['texto']))
+                    detalhes.append(registro.get('segmentos'))
+                elif registro['tipo'] == 'concluido':
+                    saida = registro['saida']
+
+        self.trechos, self.detalhes, self.idioma, self.saida = trechos, detalhes, idioma, saida
+        return bool(trechos) or saida is not None
+
+    def iniciar(self):
+        """Regrava o diário com o cabeçalho e os trechos válidos e o mantém aberto para acréscimos"""
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+        self._arquivo = open(self.caminho, 'w', encoding='utf-8')
+        self._escrever({'tipo': 'cabecalho', 'parametros': self.parametros})
+        if self.idioma is not None:
+            self._escrever({'tipo': 'idioma', 'idioma': self.idioma[0], 'confianca': self.idioma[1]})
+        for (inicio, fim, texto), segmentos in zip(self.trechos, self.detalhes):
+            self._arquivo.write(json.dumps(self._registro_segmento(inicio, fim, texto, segmentos),
+                                           ensure_ascii=False) + "\n")
+        self._sincronizar()
+
+    def registrar_idioma(self, idioma, confianca):
+        self.idioma = (idioma, confianca)
+        self._escrever({'tipo': 'idioma', 'idioma': idioma, 'confianca': confianca})
+
+    def registrar_segmento(self, inicio, fim, texto, segmentos=None):
+        self.trechos.append((inicio, fim, texto))
+        self.detalhes.append(segmentos)
+        self._escrever(self._registro_segmento(inicio, fim, texto, segmentos))
+
+    @staticmethod
+    def _registro_segmento(inicio, fim, texto, segmentos):
+        registro = {'tipo': 'segmento', 'inicio': inicio, 'fim': fim, 'texto': texto}
+        if segmentos is not None:
+            registro['segmentos'] = [list(segmento) for segmento in segmentos]
+        return registro
+
+    def concluir(self, caminho_saida):
+        """Marca o arquivo como gravado; pode ser chamado em outro processo que não o da inferência"""
+        self.saida = caminho_saida
+        if self._arquivo is None:
+            self._arquivo = open(self.caminho, 'a', encoding='utf-8')
+        self._escrever({'tipo': 'concluido', 'saida': caminho_saida})
+        self.fechar()
+
+    def fechar(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+    def remover(self):
+        self.fechar()
+        try:
+            os.remove(self.caminho)
+        except FileNotFoundError:
+            pass
+
+    def _escrever(self, registro):
+        self._arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        self._sincronizar()
+
+    def _sincronizar(self):
+        self._arquivo.flush()
+        os.fsync(self._arquivo.fileno())
+
+    def __getstate__(self):
+        # O arquivo aberto fica no processo que o abriu
+        estado = self.__dict__.copy()
+        estado['_arquivo'] = None
+        return estado
@@ -0,0 +1,177 @@
+"""Histórico de desempenho por máquina, para escolher o modelo pelo prazo do lote.
+
+Cada arquivo transcrito acrescenta uma linha com o backend, o modelo, a precisão, o idioma, a
+duração do segmento, os processos usados, os segundos de áudio e os segundos de processamento efetivos
+(o tempo do arquivo dividido pelos arquivos transcritos ao mesmo tempo). O fator de tempo real de uma
+combinação é a razão entre as somas das execuções mais recentes; quando a combinação exata
+nunca rodou nesta máquina, os critérios são relaxados um a um e, por último, o fator é
+extrapolado de outro modelo já medido pelo custo relativo publicado do Whisper.
+"""
+import logging
+import socket
+import sqlite3
+import threading
+import time
+
+from backends_transcricao import BACKEND_PADRAO
+from quantizacao_transcricao import PRECISAO_PADRAO
+
+BANCO_HISTORICO_PADRAO = "historico_desempenho.db"
+EXECUCOES_RECENTES = 200  # Linhas mais recentes consideradas em cada estimativa
+AUDIO_MINIMO = 60.0  # Segundos de áudio para que uma combinação conte como medida
+MARGEM_SEGURANCA = 0.85  # A estimativa precisa ficar abaixo desta fração do fator exigido
+
+# Do mais preciso para o mais rápido
+MODELOS_POR_PRECISAO = ("large", "turbo", "medium", "small", "base", "tiny")
+MODELO_SEM_HISTORICO = "base"  # Usado até haver alguma medida nesta máquina
+
+# Custo de inferência relativo ao large (tabela de velocidades do Whisper), para extrapolar
+CUSTO_RELATIVO = {"tiny": 0.1, "base": 0.14, "small": 0.25, "medium": 0.5, "turbo": 0.125, "large": 1.0}
+
+
+def escolher_modelo(estimativas, fator_exigido, margem=MARGEM_SEGURANCA):
+    """O modelo mais preciso cujo fator estimado cabe em `fator_exigido`; o mais rápido se nenhum couber.
+
+    `estimativas` mapeia modelo -> fator de tempo real estimado (None se desconhecido). Sem
+    nenhuma estimativa, retorna MODELO_SEM_HISTORICO, cuja primeira parte calibra as demais.
+    """
+    if not any(fator is not None for fator in estimativas.values()):
+        return MODELO_SEM_HISTORICO
+    for modelo in MODELOS_POR_PRECISAO:
+        fator = estimativas.get(modelo)
+        if fator is not None and fator <= fator_exigido * margem:
+            return modelo
+    return MODELOS_POR_PRECISAO[-1]
+
+
+class HistoricoDesempenho:
+    """Fator de tempo real medido nesta máquina por backend, modelo, precisão, idioma, segmento e processos"""
+
+    def __init__(self, caminho_banco=BANCO_HISTORICO_PADRAO, host=None):
+        self.caminho_banco = caminho_banco
+        self.host = host or socket.gethostname()
+        self._lock = threading.Lock()
+        self._inicializar_banco()
+
+    # --- Persistência ---
+    def _conectar(self):
+        return sqlite3.connect(self.caminho_banco, timeout=30)
+
+    def _inicializar_banco(self):
+        with self._conectar() as conexao:
+            conexao.execute("""
+                CREATE TABLE IF NOT EXISTS execucoes (
+                    host TEXT NOT NULL,
+                    modelo TEXT NOT NULL,
+                    idioma TEXT NOT NULL,
+                    segmento INTEGER NOT NULL,
+                    processos INTEGER NOT NULL,
+                    audio REAL NOT NULL,
+                    tempo REAL NOT NULL,
+                    criado_em REAL NOT NULL
+                )
+            """)
+            colunas = {linha[1] for linha in conexao.execute("PRAGMA table_info(execucoes)")}
+            if 'precisao' not in colunas:
+                conexao.execute(f"ALTER TABLE execucoes ADD COLUMN precisao TEXT NOT NULL DEFAULT '{PRECISAO_PADRAO}'")
+            if 'backend' not in colunas:
+                conexao.execute(f"ALTER TABLE execucoes ADD COLUMN backend TEXT NOT NULL DEFAULT '{BACKEND_PADRAO}'")
+            conexao.execute("CREATE INDEX IF NOT EXISTS idx_execucoes_modelo ON execucoes (host, modelo, criado_em)")
+
+    def registrar(self, modelo, idioma, segmento, processos, segundos_audio, segundos_processamento,
+                  precisao=PRECISAO_PADRAO, backend=BACKEND_PADRAO):
+        if segundos_audio <= 0 or segundos_processamento <= 0:
+            return
+        with self._lock, self._conectar() as conexao:
+            conexao.execute(
+                "INSERT INTO execucoes (host, backend, modelo, precisao, idioma, segmento, processos, audio, tempo, "
+                "criado_em) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.host, backend, modelo, precisao, idioma or "auto", int(segmento), int(processos),
+                 float(segundos_audio), float(segundos_processamento), time.time()))
+
+    # --- Consulta ---
+    def _fator_medido(self, modelo, criterios):
+        filtros = "".join(f" AND {coluna} = ?" for coluna in criterios)
+        with self._lock, self._conectar() as conexao:
+            audio, tempo = conexao.execute(
+                f"SELECT SUM(audio), SUM(tempo) FROM ("
+                f"SELECT audio, tempo FROM execucoes WHERE host = ? AND modelo = ?{filtros} "
+                f"ORDER BY criado_em DESC LIMIT ?)",
+                (self.host, modelo, *criterios.values(), EXECUCOES_RECENTES)).fetchone()
+        if not audio or audio < AUDIO_MINIMO:
+            return None
+        return tempo / audio
+
+    def fator_tempo_real(self, modelo, idioma=None, segmento=None, processos=None, precisao=None, backend=None):
+        """Fator medido do modelo (None sem medidas).
+
+        Os critérios são relaxados na ordem processos, segmento, idioma, precisão e backend.
+        """
+        criterios = {'backend': backend, 'precisao': precisao, 'idioma': idioma, 'segmento': segmento,
+                     'processos': processos}
+        criterios = {coluna: valor for coluna, valor in criterios.items() if valor is not None}
+        while True:
+            fator = self._fator_medido(modelo, criterios)
+            if fator is not None or not criterios:
+                return fator
+            criterios.pop(list(criterios)[-1])
+
+    def estimar(self, modelos, idioma=None, segmento=None, processos=None, observados=None, precisao=None,
+                backend=None):
+        """Fator estimado de cada modelo: o observado no lote atual, o histórico ou a extrapolação.
+
+        `observados` mapeia modelo -> fator medido na execução em curso, que prevalece sobre o
+        histórico por refletir a carga atual da máquina.
+        """
+        observados = observados or {}
+        estimativas = {modelo: observados.get(modelo) or self.fator_tempo_real(modelo, idioma, segmento, processos,
+                                                                               precisao, backend)
+                       for modelo in modelos}
+        referencias = {modelo: fator for modelo, fator in estimativas.items()
+                       if fator is not None and modelo in CUSTO_RELATIVO}
+        if referencias:
+            # Fator por unidade de custo, média das referências, aplicado aos modelos sem medida
+            por_custo = sum(fator / CUSTO_RELATIVO[modelo] for modelo, fator in referencias.items()) / len(referencias)
+            for modelo, fator in estimativas.items():
+                if fator is None and modelo in CUSTO_RELATIVO:
+                    estimativas[modelo] = por_custo * CUSTO_RELATIVO[modelo]
+        return estimativas
+
+    def resumo(self):
+        """Linhas para a aba Estatísticas: fator medido de cada modelo nesta máquina"""
+        try:
+            with self._lock, self._conectar() as conexao:
+                linhas = conexao.execute(
+                    "SELECT backend, modelo, precisao, COUNT(*), SUM(audio), SUM(tempo) FROM execucoes "
+                    "WHERE host = ? GROUP BY backend, modelo, precisao ORDER BY SUM(tempo) / SUM(audio)",
+                    (self.host,)).fetchall()
+        except sqlite3.Error as e:
+            logging.warning(f"Não foi possível consultar o histórico de desempenho: {e}")
+            return []
+        return [f"{modelo} ({backend}, {precisao}): fator {tempo / audio:.3f} ({audio / tempo:.1f}x tempo real) "
+                f"em {quantidade} arquivo(s)"
+                for backend, modelo, precisao, quantidade, audio, tempo in linhas]
+
+    def comparar_precisoes(self):
+        """Linhas com a aceleração de cada precisão sobre fp32, para os modelos medidos nas duas no mesmo backend"""
+        fatores = {}
+        try:
+            with self._lock, self._conectar() as conexao:
+                for backend, modelo, precisao, audio, tempo in conexao.execute(
+                        "SELECT backend, modelo, precisao, SUM(audio), SUM(tempo) FROM execucoes WHERE host = ? "
+                        "GROUP BY backend, modelo, precisao", (self.host,)):
+                    fatores[(backend, modelo, precisao)] = tempo / audio
+        except sqlite3.Error as e:
+            logging.warning(f"Não foi possível consultar o histórico de desempenho: {e}")
+            return []
+        linhas = []
+        for (backend, modelo, precisao), fator in sorted(fatores.items()):
+            referencia = fatores.get((backend, modelo, PRECISAO_PADRAO))
+            if precisao != PRECISAO_PADRAO and referencia:
+                linhas.append(f"{modelo} ({backend}): {precisao} {referencia / fator:.1f}x mais rápido que "
+                              f"{PRECISAO_PADRAO} (fator {fator:.3f} contra {referencia:.3f})")
+        return linhas
+
+    def limpar(self):
+        with self._lock, self._conectar() as conexao:
+            conexao.execute("DELETE FROM execucoes WHERE host = ?", (self.host,))
@@ -0,0 +1,87 @@
+"""Detecção do idioma uma única vez por arquivo, antes da transcrição.
+
+Com idioma "auto", passar language=None a cada segmento faz o Whisper detectar o idioma de
+novo em cada chamada: uma passada extra do encoder por segmento, e o idioma pode trocar no
+meio do arquivo. Aqui algumas janelas de 30 s com fala do início do arquivo são analisadas
+em uma única chamada, as probabilidades são somadas e o idioma mais provável é fixado para
+todos os segmentos. Os segmentos lidos para a sondagem são devolvidos à frente do iterador,
+então nada é decodificado duas vezes.
+"""
+import itertools
+
+from instrumentacao_transcricao import INSTRUMENTACAO
+from vad_transcricao import detectar_fala
+
+JANELAS_SONDAGEM = 3  # Janelas de 30 s com fala analisadas por arquivo
+SEGMENTOS_MAXIMOS_SONDAGEM = 8  # Segmentos lidos no máximo à procura de fala (limita a memória retida)
+FALA_MINIMA_JANELA = 0.3  # Fração dos quadros com fala para a janela contar na sondagem
+
+
+def nome_idioma(codigo, nomes=None):
+    """Nome legível do idioma; `nomes` tem prioridade sobre a lista do Whisper (em inglês)"""
+    if nomes and codigo in nomes:
+        return nomes[codigo]
+    # Importar o pacote whisper carrega o PyTorch; só quando o nome não está em `nomes`
+    from whisper.tokenizer import LANGUAGES
+
+    return LANGUAGES.get(codigo, codigo).title()
+
+
+def _fracao_fala(janela, taxa):
+    trechos, energia_db, _ = detectar_fala(janela, taxa)
+    if len(energia_db) == 0:
+        return 0.0
+    return sum(fim - inicio for inicio, fim in trechos) / len(energia_db)
+
+
+def escolher_janelas(segmentos, taxa):
+    """Lê segmentos até achar JANELAS_SONDAGEM janelas com fala.
+
+    Retorna (janelas escolhidas, segmentos lidos). Se nenhuma janela tiver fala suficiente,
+    a primeira janela não vazia é usada, como faria o transcribe() do Whisper.
+    """
+    amostras_janela = 30 * taxa
+    janelas, lidos, reserva = [], [], None
+    for inicio_seg, segmento in itertools.islice(segmentos, SEGMENTOS_MAXIMOS_SONDAGEM):
+        lidos.append((inicio_seg, segmento))
+        for inicio_amostra in range(0, len(segmento), amostras_janela):
+            janela = segmento[inicio_amostra:inicio_amostra + amostras_janela]
+            if reserva is None and len(janela):
+                reserva = janela
+            if _fracao_fala(janela, taxa) >= FALA_MINIMA_JANELA:
+                janelas.append(janela)
+                if len(janelas) == JANELAS_SONDAGEM:
+                    return janelas, lidos
+    if not janelas and reserva is not None:
+        janelas.append(reserva)
+    return janelas, lidos
+
+
+def detectar_idioma(modelo, janelas):
+    """Retorna (código, probabilidade média) das janelas, analisadas em uma única chamada do backend"""
+    if not modelo.multilingue:
+        return "en", 1.0
+
+    probabilidades = modelo.probabilidades_idioma(janelas)
+
+    soma = {}
+    for distribuicao in probabilidades:
+        for codigo, probabilidade in distribuicao.items():
+            soma[codigo] = soma.get(codigo, 0.0) + probabilidade
+    idioma = max(soma, key=soma.get)
+    return idioma, soma[idioma] / len(probabilidades)
+
+
+def fixar_idioma(modelo, segmentos, taxa):
+    """Sonda o início de `segmentos` e retorna (idioma, confiança, iterador com todos os segmentos).
+
+    O idioma é None quando não há áudio a analisar; nesse caso o Whisper decide por segmento.
+    """
+    segmentos = iter(segmentos)
+    with INSTRUMENTACAO.medir('idioma'):
+        janelas, lidos = escolher_janelas(segmentos, taxa)
+        restantes = itertools.chain(lidos, segmentos)
+        if not janelas:
+            return None, 0.0, restantes
+        idioma, confianca = detectar_idioma(modelo, janelas)
+    return idioma, confianca, restantes
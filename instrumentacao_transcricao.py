@@ -0,0 +1,214 @@
+"""Instrumentação do caminho quente: tempo por etapa, fator de tempo real e memória.
+
+Cada etapa medida (decodificação, segmentação, detecção de idioma, inferência, checkpoint,
+gravação, carga do modelo, atualização da interface) vira um intervalo com início, duração,
+processo e thread. Os intervalos alimentam os totais por etapa mostrados na aba Estatísticas
+e podem ser exportados em JSON ou no formato de eventos de trace do Chrome (chrome://tracing,
+Perfetto). Os processos do pool medem com a própria instância e devolvem os intervalos junto
+com o resultado de cada tarefa, para que o processo principal os incorpore.
+
+Também fica aqui o log por fila: o FileHandler síncrono roda em uma thread própria, e quem
+registra (inclusive a thread de inferência) só enfileira o registro.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+MAX_INTERVALOS = 100_000  # Intervalos guardados para o trace; os totais por etapa não têm limite
+MAX_ARQUIVOS = 10_000  # Arquivos guardados com seu fator de tempo real
+
+
+def pico_rss_mb():
+    """Pico de memória residente deste processo, em MB (None se a plataforma não informar)"""
+    try:
+        import resource
+    except ImportError:
+        return _pico_rss_windows_mb()
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024  # Bytes no macOS, KB no Linux
+
+
+def _pico_rss_windows_mb():
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class _ContadoresMemoria(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (nome, ctypes.c_size_t) for nome in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+
+        contadores = _ContadoresMemoria()
+        contadores.cb = ctypes.sizeof(contadores)
+        kernel32, psapi = ctypes.windll.kernel32, ctypes.windll.psapi
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.c_void_p, wintypes.DWORD]
+        if not psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(contadores), contadores.cb):
+            return None
+        return contadores.PeakWorkingSetSize / (1024 * 1024)
+    except (OSError, AttributeError):
+        return None
+
+
+class Instrumentacao:
+    """Intervalos e totais por etapa de um processo; segura para uso entre threads"""
+
+    def __init__(self, max_intervalos=MAX_INTERVALOS):
+        self._lock = threading.Lock()
+        self._max_intervalos = max_intervalos
+        self.limpar()
+
+    def limpar(self):
+        with self._lock:
+            # (etapa, início em µs desde a época, duração em µs, pid, tid, argumentos)
+            self._intervalos = deque(maxlen=self._max_intervalos)
+            self._etapas = {}  # etapa -> [contagem, total (s), máximo (s)]
+            self._arquivos = deque(maxlen=MAX_ARQUIVOS)
+            self._modelos = {}  # modelo -> [segundos de áudio, segundos de processamento]
+            self._cargas = {}  # modelo -> segundos da última carga
+            self._picos_rss = {}  # pid -> MB, dos processos do pool
+            self._threads = {}  # (pid, tid) -> nome da thread, para o trace
+
+    @contextmanager
+    def medir(self, etapa, **argumentos):
+        inicio_us = time.time_ns() // 1000
+        inicio = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.registrar(etapa, inicio_us, (time.perf_counter_ns() - inicio) // 1000, argumentos=argumentos)
+
+    def registrar(self, etapa, inicio_us, duracao_us, pid=None, tid=None, argumentos=None):
+        if pid is None:
+            thread = threading.current_thread()
+            pid, tid = os.getpid(), thread.ident
+            nome_thread = thread.name
+        else:
+            nome_thread = None
+        segundos = duracao_us / 1e6
+        with self._lock:
+            self._intervalos.append((etapa, inicio_us, duracao_us, pid, tid, argumentos or None))
+            if nome_thread is not None:
+                self._threads[(pid, tid)] = nome_thread
+            totais = self._etapas.setdefault(etapa, [0, 0.0, 0.0])
+            totais[0] += 1
+            totais[1] += segundos
+            totais[2] = max(totais[2], segundos)
+
+    def registrar_arquivo(self, caminho_audio, modelo, segundos_audio, segundos_processamento):
+        """Fator de tempo real de um arquivo: segundos de processamento por segundo de áudio"""
+        fator = segundos_processamento / segundos_audio if segundos_audio > 0 else None
+        with self._lock:
+            self._arquivos.append({'arquivo': caminho_audio, 'modelo': modelo, 'audio': segundos_audio,
+                                   'tempo': segundos_processamento, 'fator_tempo_real': fator})
+            acumulado = self._modelos.setdefault(modelo, [0.0, 0.0])
+            acumulado[0] += segundos_audio
+            acumulado[1] += segundos_processamento
+
+    def registrar_carga_modelo(self, modelo, segundos):
+        with self._lock:
+            self._cargas[modelo] = segundos
+
+    # --- Processos do pool ---
+    def drenar(self):
+        """Retira os intervalos registrados até aqui, para enviá-los ao processo principal"""
+        with self._lock:
+            intervalos = list(self._intervalos)
+            self._intervalos.clear()
+            cargas = dict(self._cargas)
+        return {'pid': os.getpid(), 'intervalos': intervalos, 'cargas': cargas, 'pico_rss_mb': pico_rss_mb()}
+
+    def incorporar(self, drenado):
+        """Acrescenta o que um processo do pool devolveu com drenar()"""
+        if not drenado:
+            return
+        for etapa, inicio_us, duracao_us, pid, tid, argumentos in drenado['intervalos']:
+            self.registrar(etapa, inicio_us, duracao_us, pid, tid, argumentos)
+        with self._lock:
+            self._cargas.update(drenado['cargas'])
+            if drenado['pico_rss_mb'] is not None:
+                self._picos_rss[drenado['pid']] = max(self._picos_rss.get(drenado['pid'], 0.0),
+                                                      drenado['pico_rss_mb'])
+
+    # --- Consulta e exportação ---
+    def para_dict(self):
+        with self._lock:
+            etapas = {etapa: {'contagem': contagem, 'total': total, 'media': total / contagem, 'maximo': maximo}
+                      for etapa, (contagem, total, maximo) in self._etapas.items()}
+            modelos = {modelo: {'audio': audio, 'tempo': tempo, 'fator_tempo_real': tempo / audio if audio else None}
+                       for modelo, (audio, tempo) in self._modelos.items()}
+            return {
+                'etapas': etapas,
+                'modelos': modelos,
+                'arquivos': list(self._arquivos),
+                'carga_modelos': dict(self._cargas),
+                'pico_rss_mb': pico_rss_mb(),
+                'pico_rss_processos_mb': {str(pid): mb for pid, mb in self._picos_rss.items()},
+            }
+
+    def resumo(self):
+        """Linhas para a aba Estatísticas, das etapas mais caras para as mais baratas"""
+        dados = self.para_dict()
+        linhas = [f"{etapa}: {totais['total']:.1f}s em {totais['contagem']} chamada(s) "
+                  f"(média {totais['media'] * 1000:.0f} ms, máx. {totais['maximo'] * 1000:.0f} ms)"
+                  for etapa, totais in sorted(dados['etapas'].items(), key=lambda item: -item[1]['total'])]
+        for modelo, acumulado in dados['modelos'].items():
+            fator = acumulado['fator_tempo_real']
+            if fator:
+                linhas.append(f"Fator de tempo real ({modelo}): {fator:.3f} ({1 / fator:.1f}x tempo real)")
+        for modelo, segundos in dados['carga_modelos'].items():
+            linhas.append(f"Carga do modelo {modelo}: {segundos:.1f}s")
+        if dados['pico_rss_mb'] is not None:
+            linhas.append(f"Pico de memória (RSS): {dados['pico_rss_mb']:.0f} MB")
+        if dados['pico_rss_processos_mb']:
+            linhas.append(f"Pico de memória por processo do pool: "
+                          f"{max(dados['pico_rss_processos_mb'].values()):.0f} MB")
+        return linhas
+
+    def exportar_json(self, caminho):
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            json.dump(self.para_dict(), arquivo, ensure_ascii=False, indent=2)
+
+    def exportar_trace(self, caminho):
+        """Grava os intervalos como eventos "X" do Trace Event Format (chrome://tracing, Perfetto)"""
+        with self._lock:
+            intervalos = list(self._intervalos)
+            threads = dict(self._threads)
+        eventos = [{'name': etapa, 'cat': 'transcricao', 'ph': 'X', 'ts': inicio_us, 'dur': duracao_us,
+                    'pid': pid, 'tid': tid, 'args': argumentos or {}}
+                   for etapa, inicio_us, duracao_us, pid, tid, argumentos in intervalos]
+        eventos += [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': nome}}
+                    for (pid, tid), nome in threads.items()]
+        eventos += [{'name': 'process_name', 'ph': 'M', 'pid': pid,
+                     'args': {'name': "principal" if pid == os.getpid() else f"pool {pid}"}}
+                    for pid in {intervalo[3] for intervalo in intervalos}]
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            json.dump({'traceEvents': eventos, 'displayTimeUnit': 'ms'}, arquivo, ensure_ascii=False)
+
+
+INSTRUMENTACAO = Instrumentacao()  # Instância do processo; cada processo do pool tem a sua
+
+
+def configurar_log_em_fila(*handlers, nivel=logging.INFO):
+    """Liga os `handlers` ao logger raiz por uma fila, atendida por uma thread própria.
+
+    Quem registra só enfileira o registro; a escrita no arquivo e no console acontece fora
+    da thread que o gerou. Retorna o QueueListener, que é parado ao sair do programa.
+    """
+    fila = queue.SimpleQueue()
+    ouvinte = logging.handlers.QueueListener(fila, *handlers, respect_handler_level=True)
+    raiz = logging.getLogger()
+    raiz.setLevel(nivel)
+    raiz.addHandler(logging.handlers.QueueHandler(fila))
+    ouvinte.start()
+    atexit.register(ouvinte.stop)
+    return ouvinte
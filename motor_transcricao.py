@@ -0,0 +1,2348 @@
+"""Motor de transcrição independente de interface gráfica.
+
+Concentra decodificação, segmentação, inferência, pipeline de lote e gravação das
+transcrições. A interface Tk (transcriber.py) e a linha de comando (cli_transcricao.py)
+são apenas clientes: configuram um MotorTranscricao com OpcoesTranscricao e recebem o
+andamento por meio do callback `ao_evento`, que recebe dicionários com a chave 'tipo'.
+"""
+import ctypes
+import gc
+import os
+import shutil
+import sqlite3
+import threading
+import logging
+import time
+import subprocess
+import sys
+import tempfile
+import queue
+import multiprocessing
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from enum import Enum
+from datetime import datetime
+
+from backends_transcricao import AMOSTRAS_JANELA, BACKEND_PADRAO, TAXA_AMOSTRAGEM, carregar_modelo_inferencia, \
+    identificador_modelo, separar_identificador
+from cache_audio import TAMANHO_CACHE_AUDIO_PADRAO_MB, CacheAudio
+from cache_transcricoes import TAMANHO_CACHE_PADRAO_MB, CacheTranscricoes
+from diario_transcricao import DiarioTranscricao, chave_entrada
+from historico_desempenho import AUDIO_MINIMO, MODELOS_POR_PRECISAO, HistoricoDesempenho, escolher_modelo
+from idioma_transcricao import fixar_idioma, nome_idioma
+from instrumentacao_transcricao import INSTRUMENTACAO
+from quantizacao_transcricao import PRECISAO_PADRAO
+from saida_transcricao import ESCRITORES, formatar_tempo
+from segmentos_transcricao import ArmazemSegmentos, caminho_segmentos
+from vad_transcricao import amostra_mais_silenciosa, iterar_segmentos_fala, segmentar_fala_em_fluxo
+from varredura_audio import ESPERA_ONDA, SondaDuracoes, VarreduraAudio, varrer_arquivos_audio
+
+FFMPEG_DISPONIVEL = shutil.which("ffmpeg") is not None
+
+
+# --- Enums para melhor organização ---
+class AudioExtension(Enum):
+    MP3 = '.mp3'
+    WAV = '.wav'
+    FLAC = '.flac'
+    M4A = '.m4a'
+    OGG = '.ogg'
+    MPEG = '.mpeg'
+    WEBM = '.webm'
+    AAC = '.aac'
+
+
+EXTENSOES_AUDIO = frozenset(ext.value for ext in AudioExtension)
+
+
+class WhisperModel(Enum):
+    TINY = "tiny"
+    BASE = "base"
+    SMALL = "small"
+    MEDIUM = "medium"
+    LARGE = "large"
+    TURBO = "turbo"
+
+
+MODELO_AUTO = "auto"  # Escolhe, a cada parte do lote, o modelo mais preciso que cumpre o prazo
+
+IDIOMAS_WHISPER = {
+    "auto": "Detectar automaticamente",
+    "pt": "Português",
+    "en": "Inglês",
+    "es": "Espanhol",
+    "fr": "Francês",
+    "de": "Alemão",
+    "it": "Italiano",
+    "ja": "Japonês",
+    "ko": "Coreano",
+    "zh": "Chinês",
+    "ru": "Russo",
+    "ar": "Árabe"
+}
+
+FORMATOS_SAIDA = ["docx", "txt", "markdown", "srt", "vtt", "jsonl"]
+DIGITOS_CHAVE_SAIDA = 8  # Dígitos da chave do caminho no nome dos arquivos de saída
+ORCAMENTO_MEMORIA_PADRAO_MB = 8192  # Memória para modelos residentes no cache
+TEMPO_OCIOSO_PADRAO_MIN = 10  # Minutos sem uso até descarregar um modelo
+FATOR_ALVO_PADRAO = 1.0  # Modelo "auto" sem prazo nem fator: acompanhar o tempo real
+PARTES_MODELO_AUTO = 8  # Partes do lote entre as quais o modelo "auto" é reavaliado
+
+
+@dataclass
+class OpcoesTranscricao:
+    """Parâmetros de uma execução; espelham as chaves de config_transcricao.json"""
+    modelo: str = WhisperModel.TURBO.value
+    idioma: str = "auto"
+    temperatura: float = 0.0
+    segmento_duracao: int = 30
+    formato_saida: str = "docx"
+    incluir_timestamps: bool = False
+    pasta_saida: str = ""
+    decodificacao_streaming: bool = False
+    num_processos: int = 1  # No lote, um arquivo por processo; com um só arquivo, faixas dele em paralelo
+    orcamento_memoria_mb: int = ORCAMENTO_MEMORIA_PADRAO_MB
+    tempo_ocioso_min: int = TEMPO_OCIOSO_PADRAO_MIN
+    cache_transcricoes: bool = True
+    tamanho_cache_mb: int = TAMANHO_CACHE_PADRAO_MB
+    cache_audio: bool = False  # Guarda o PCM decodificado em disco e o mapeia em memória nas próximas execuções
+    tamanho_cache_audio_mb: int = TAMANHO_CACHE_AUDIO_PADRAO_MB
+    retomar: bool = False  # Continua a partir dos checkpoints de uma execução interrompida
+    vad: bool = False  # Descarta silêncio e corta os segmentos nas pausas
+    tamanho_lote: int = 1  # Janelas de 30 s decodificadas por chamada; 1 usa transcribe() por segmento
+    agrupar_por_idioma: bool = False  # Com idioma "auto", ordena o lote pelo idioma detectado de cada arquivo
+    prazo_min: float = 0.0  # Modelo "auto": minutos para concluir o lote (0 = sem prazo)
+    fator_tempo_real_alvo: float = 0.0  # Modelo "auto": segundos de processamento por segundo de áudio (0 = livre)
+    precisao: str = PRECISAO_PADRAO  # "int8" quantiza as camadas lineares para inferência em CPU
+    backend: str = BACKEND_PADRAO  # "whisper" (PyTorch), "ctranslate2" (faster-whisper) ou "stub"
+
+    @property
+    def idioma_whisper(self):
+        return None if self.idioma == "auto" else self.idioma
+
+    @property
+    def identificador_modelo(self):
+        """Nome do modelo no cache de modelos e nos processos, com backend e precisão quando não são os padrão"""
+        return identificador_modelo(self.modelo, self.precisao, self.backend)
+
+
+# --- Decodificação de áudio em memória ---
+
+def carregar_audio_pcm(caminho_audio, taxa=TAXA_AMOSTRAGEM):
+    """Decodifica o arquivo uma única vez em um buffer float32 mono (16 kHz) via ffmpeg"""
+    if not os.path.exists(caminho_audio):
+        raise FileNotFoundError(caminho_audio)
+
+    comando = [
+        "ffmpeg", "-nostdin", "-threads", "0", "-i", caminho_audio,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(taxa), "-"
+    ]
+    try:
+        saida = subprocess.run(comando, capture_output=True, check=True).stdout
+    except FileNotFoundError as e:
+        raise RuntimeError("O executável 'ffmpeg' não foi encontrado no PATH do sistema.") from e
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Falha ao decodificar o áudio: {e.stderr.decode(errors='ignore').strip()}") from e
+
+    audio = np.frombuffer(saida, np.int16).astype(np.float32)
+    audio /= 32768.0
+    return audio
+
+
+def iterar_segmentos_memoria(audio, segundos_por_segmento, taxa=TAXA_AMOSTRAGEM, inicio=0.0):
+    """Gera (inicio_seg, view) sobre um buffer já decodificado, sem copiar amostras"""
+    amostras_segmento = int(segundos_por_segmento * taxa)
+    for inicio_amostra in range(int(round(inicio * taxa)), len(audio), amostras_segmento):
+        yield inicio_amostra / taxa, audio[inicio_amostra:inicio_amostra + amostras_segmento]
+
+
+def obter_duracao_audio(caminho_audio):
+    """Consulta a duração (em segundos) via ffprobe, sem decodificar o áudio"""
+    comando = [
+        "ffprobe", "-v", "error", "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1", caminho_audio
+    ]
+    try:
+        saida = subprocess.run(comando, capture_output=True, check=True, text=True).stdout
+        return float(saida.strip())
+    except (OSError, ValueError, subprocess.CalledProcessError) as e:
+        logging.warning(f"Não foi possível obter a duração de '{caminho_audio}' via ffprobe: {e}")
+        return None
+
+
+def decodificar_audio_em_blocos(caminho_audio, segundos_por_bloco, taxa=TAXA_AMOSTRAGEM, inicio=0.0, fim=None):
+    """Gera blocos (inicio_seg, array float32) lidos de um único pipe do ffmpeg.
+
+    A memória usada é proporcional ao tamanho do bloco, não à duração do arquivo, e o
+    primeiro bloco fica disponível assim que o ffmpeg o decodifica. Com `inicio`, o ffmpeg
+    busca direto a posição (-ss) e os tempos gerados continuam relativos ao início do arquivo;
+    com `fim`, a decodificação para nesse segundo (-t), sem ler o restante.
+    """
+    if not os.path.exists(caminho_audio):
+        raise FileNotFoundError(caminho_audio)
+
+    busca = ["-ss", f"{inicio:.3f}"] if inicio > 0 else []
+    if fim is not None:
+        busca += ["-t", f"{max(0.0, fim - inicio):.3f}"]
+    comando = [
+        "ffmpeg", "-nostdin", "-v", "error", "-threads", "0", *busca, "-i", caminho_audio,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(taxa), "-"
+    ]
+    bytes_por_bloco = int(segundos_por_bloco * taxa) * 2  # s16le = 2 bytes por amostra
+    buffer = bytearray(bytes_por_bloco)
+    visao = memoryview(buffer)
+
+    # stderr vai para um arquivo temporário para que mensagens longas não travem o pipe
+    with tempfile.TemporaryFile() as erros:
+        try:
+            processo = subprocess.Popen(comando, stdout=subprocess.PIPE, stderr=erros)
+        except FileNotFoundError as e:
+            raise RuntimeError("O executável 'ffmpeg' não foi encontrado no PATH do sistema.") from e
+
+        try:
+            amostras_lidas = 0
+            while True:
+                lidos = 0
+                while lidos < bytes_por_bloco:
+                    n = processo.stdout.readinto(visao[lidos:])
+                    if not n:
+                        break
+                    lidos += n
+                lidos -= lidos % 2
+                if lidos == 0:
+                    break
+
+                bloco = np.frombuffer(buffer, np.int16, count=lidos // 2).astype(np.float32)
+                bloco /= 32768.0
+                yield inicio + amostras_lidas / taxa, bloco
+                amostras_lidas += len(bloco)
+
+                if lidos < bytes_por_bloco:
+                    break
+
+            processo.stdout.close()
+            if processo.wait() != 0:
+                erros.seek(0)
+                mensagem = erros.read().decode(errors='ignore').strip()
+                raise RuntimeError(f"Falha ao decodificar o áudio: {mensagem}")
+        finally:
+            # Encerrar o ffmpeg se o consumidor parar antes do fim (cancelamento, erro)
+            if processo.poll() is None:
+                processo.kill()
+                processo.wait()
+
+
+def preparar_segmentos(caminho_audio, segment_duration, streaming=False, inicio=0.0, vad=False, fim=None,
+                       cache_audio=None):
+    """Retorna (duração em segundos ou None, iterador de (inicio_seg, array) por segmento).
+
+    `inicio` pula o trecho já transcrito ao retomar a partir de um checkpoint. Com `vad`, só
+    os trechos com fala são entregues, com segmentos de até `segment_duration` cortados em pausas.
+    `fim` limita a decodificação a uma faixa do arquivo e exige `streaming`. Com um `cache_audio`
+    (CacheAudio), um arquivo já decodificado é lido do cache, mapeado em memória, sem o ffmpeg.
+    """
+    with INSTRUMENTACAO.medir('decodificacao', arquivo=os.path.basename(caminho_audio), streaming=streaming):
+        return _preparar_segmentos(caminho_audio, segment_duration, streaming, inicio, vad, fim, cache_audio)
+
+
+def _obter_do_cache_audio(cache_audio, caminho_audio):
+    if cache_audio is None:
+        return None
+    try:
+        return cache_audio.obter(caminho_audio)
+    except (OSError, sqlite3.Error) as e:
+        logging.warning(f"Cache de áudio indisponível para '{caminho_audio}': {e}")
+        return None
+
+
+def _gravar_no_cache_audio(blocos, gravacao):
+    """Repassa os blocos do ffmpeg e os grava no cache; a entrada só vale se o arquivo for lido até o fim"""
+    concluido = False
+    try:
+        for bloco in blocos:
+            gravacao.escrever(bloco[1])
+            yield bloco
+        concluido = True
+    finally:
+        try:
+            if concluido:
+                gravacao.concluir()
+            else:
+                gravacao.descartar()
+        except (OSError, sqlite3.Error) as e:
+            logging.warning(f"Não foi possível guardar o áudio decodificado no cache: {e}")
+
+
+def _preparar_segmentos(caminho_audio, segment_duration, streaming, inicio, vad, fim, cache_audio):
+    audio = _obter_do_cache_audio(cache_audio, caminho_audio)
+    if streaming and audio is None:
+        # Um único ffmpeg de longa duração; a transcrição começa antes do fim da decodificação
+        duracao = obter_duracao_audio(caminho_audio)
+        blocos = decodificar_audio_em_blocos(caminho_audio, segment_duration, inicio=inicio, fim=fim)
+        if cache_audio is not None and inicio == 0 and fim is None:
+            try:
+                blocos = _gravar_no_cache_audio(blocos, cache_audio.gravador(caminho_audio))
+            except (OSError, sqlite3.Error) as e:
+                logging.warning(f"Não foi possível guardar '{caminho_audio}' no cache de áudio: {e}")
+        if vad:
+            return duracao, segmentar_fala_em_fluxo(blocos, segment_duration, TAXA_AMOSTRAGEM)
+        return duracao, blocos
+    if streaming:
+        # Do cache: o mapeamento lê só as páginas de cada segmento, com memória constante como no streaming
+        duracao = len(audio) / TAXA_AMOSTRAGEM
+        if fim is not None:
+            audio = audio[:int(round(fim * TAXA_AMOSTRAGEM))]
+        blocos = iterar_segmentos_memoria(audio, segment_duration, inicio=inicio)
+        if vad:
+            return duracao, segmentar_fala_em_fluxo(blocos, segment_duration, TAXA_AMOSTRAGEM)
+        return duracao, blocos
+
+    if audio is None:
+        # Decodifica uma única vez; cada segmento é apenas uma view (sem cópia) deste buffer
+        audio = carregar_audio_pcm(caminho_audio)
+        if cache_audio is not None:
+            try:
+                cache_audio.guardar(caminho_audio, audio)
+            except (OSError, sqlite3.Error) as e:
+                logging.warning(f"Não foi possível guardar '{caminho_audio}' no cache de áudio: {e}")
+    if vad:
+        return len(audio) / TAXA_AMOSTRAGEM, iterar_segmentos_fala(audio, segment_duration, TAXA_AMOSTRAGEM, inicio)
+    return len(audio) / TAXA_AMOSTRAGEM, iterar_segmentos_memoria(audio, segment_duration, inicio=inicio)
+
+
+def listar_arquivos_audio(pasta, incluir_subpastas=False):
+    """Lista completa e ordenada; para começar antes do fim da varredura, veja MotorTranscricao.processar_pasta"""
+    return sorted(varrer_arquivos_audio(pasta, EXTENSOES_AUDIO, incluir_subpastas))
+
+
+# --- Inferência em lote ---
+def dividir_em_janelas(inicio_seg, audio):
+    """Divide um segmento em janelas de até 30 s, o máximo que uma linha do lote comporta"""
+    for inicio_amostra in range(0, len(audio), AMOSTRAS_JANELA):
+        janela = audio[inicio_amostra:inicio_amostra + AMOSTRAS_JANELA]
+        inicio_janela = inicio_seg + inicio_amostra / TAXA_AMOSTRAGEM
+        yield inicio_janela, inicio_janela + len(janela) / TAXA_AMOSTRAGEM, janela
+
+
+def deslocar_segmentos(segmentos, deslocamento):
+    """Segmentos devolvidos pelo backend, com os tempos relativos ao início do áudio"""
+    return [(deslocamento + inicio, deslocamento + fim, texto, avg_logprob, no_speech_prob, tokens)
+            for inicio, fim, texto, avg_logprob, no_speech_prob, tokens in segmentos]
+
+
+def armazem_do_diario(diario):
+    """Armazém com os trechos já transcritos, ou vazio sem diário"""
+    armazem = ArmazemSegmentos()
+    if diario:
+        for (inicio, fim, texto), segmentos in zip(diario.trechos, diario.detalhes):
+            armazem.adicionar(inicio, fim, texto, segmentos)
+    return armazem
+
+
+def _registrar_trecho(armazem, diario, escritor, inicio, fim, texto, segmentos):
+    """Leva um trecho concluído ao armazém, ao diário de checkpoints e ao arquivo de saída parcial"""
+    with INSTRUMENTACAO.medir('checkpoint'):
+        armazem.adicionar(inicio, fim, texto, segmentos)
+        if diario:
+            diario.registrar_segmento(inicio, fim, texto, segmentos)
+        if escritor:
+            escritor.escrever_segmento(inicio, fim, texto, segmentos)
+
+
+def _medir_iteracao(iteravel, etapa):
+    """Repassa os itens de `iteravel` medindo cada next() como `etapa`.
+
+    Nos segmentos, é onde acontecem o fatiamento do buffer, o VAD e, em streaming, a própria
+    decodificação pelo ffmpeg.
+    """
+    iterador = iter(iteravel)
+    while True:
+        with INSTRUMENTACAO.medir(etapa):
+            item = next(iterador, None)
+        if item is None:
+            return
+        yield item
+
+
+def transcrever_segmentos(modelo, segmentos, idioma, temperatura, cancel_event, liberado_event, ao_segmento=None,
+                          diario=None, tamanho_lote=1, escritor=None):
+    """Roda o Whisper em cada (inicio_seg, array) e retorna um ArmazemSegmentos, ou None se cancelado.
+
+    Com um `diario`, os trechos já registrados entram no resultado sem nova inferência e cada
+    segmento concluído é gravado como checkpoint antes de seguir para o próximo. Com um
+    `escritor` (já iniciado), cada segmento também é acrescentado ao arquivo de saída parcial.
+    Com `tamanho_lote` > 1, janelas de até 30 s são decodificadas em lotes desse tamanho.
+    """
+    if tamanho_lote > 1:
+        return _transcrever_segmentos_em_lote(modelo, segmentos, idioma, temperatura, cancel_event, liberado_event,
+                                              ao_segmento, diario, tamanho_lote, escritor)
+
+    armazem = armazem_do_diario(diario)
+    for i, (start_time_sec, segment) in enumerate(_medir_iteracao(segmentos, 'segmentacao'), start=len(armazem)):
+        liberado_event.wait()  # Bloqueia enquanto pausado; cancelar também libera a espera
+        if cancel_event.is_set():
+            return None
+
+        end_time_sec = start_time_sec + len(segment) / TAXA_AMOSTRAGEM
+
+        # Transcreve o segmento diretamente do array (sem WAV temporário nem novo ffmpeg)
+        with INSTRUMENTACAO.medir('inferencia', segundos=round(end_time_sec - start_time_sec, 3)):
+            texto, segmentos_segmento = modelo.transcrever(segment, idioma, temperatura)
+
+        _registrar_trecho(armazem, diario, escritor, start_time_sec, end_time_sec, texto,
+                          deslocar_segmentos(segmentos_segmento, start_time_sec))
+
+        if ao_segmento:
+            ao_segmento(i, start_time_sec, end_time_sec)
+
+    return armazem
+
+
+def _transcrever_segmentos_em_lote(modelo, segmentos, idioma, temperatura, cancel_event, liberado_event, ao_segmento,
+                                   diario, tamanho_lote, escritor):
+    armazem = armazem_do_diario(diario)
+    pendentes = []
+
+    def descarregar():
+        liberado_event.wait()
+        resultados = modelo.decodificar_janelas([janela for _, _, janela in pendentes], idioma, temperatura)
+        for (inicio, fim, _), (texto, avg_logprob, no_speech_prob, tokens) in zip(pendentes, resultados):
+            indice = len(armazem)
+            _registrar_trecho(armazem, diario, escritor, inicio, fim, texto,
+                              [(inicio, fim, texto, avg_logprob, no_speech_prob, tokens)])
+            if ao_segmento:
+                ao_segmento(indice, inicio, fim)
+        pendentes.clear()
+
+    for start_time_sec, segment in _medir_iteracao(segmentos, 'segmentacao'):
+        if cancel_event.is_set():
+            return None
+        pendentes.extend(dividir_em_janelas(start_time_sec, segment))
+        while len(pendentes) >= tamanho_lote:
+            excedente = pendentes[tamanho_lote:]
+            del pendentes[tamanho_lote:]
+            descarregar()
+            pendentes.extend(excedente)
+
+    if cancel_event.is_set():
+        return None
+    if pendentes:
+        descarregar()
+    return armazem
+
+
+def descrever_idioma(opcoes, idioma_detectado=None):
+    """Idioma para os cabeçalhos: o escolhido ou, com "auto", o detectado e sua confiança"""
+    if opcoes.idioma != "auto" or idioma_detectado is None:
+        return IDIOMAS_WHISPER.get(opcoes.idioma, 'Auto')
+    codigo, confianca = idioma_detectado
+    return f"{nome_idioma(codigo, IDIOMAS_WHISPER)} (detectado, confiança {confianca:.0%})"
+
+
+def criar_escritor(caminho_audio, opcoes):
+    """Escritor incremental do formato escolhido, ainda sem arquivo aberto (veja EscritorTranscricao.iniciar).
+
+    O parcial tem nome fixo por arquivo e modelo, então retomar uma execução o reescreve em vez
+    de deixar sobras; o nome final leva a data e hora, como antes. O início da chave do caminho
+    (a mesma do diário) distingue entradas de mesmo nome, como `a.mp3` e `a.wav`, que podem estar
+    em andamento ao mesmo tempo e, sem ela, dividiriam o parcial, o arquivo final e o .segmentos.npz.
+    """
+    # Determinar pasta de saída
+    if opcoes.pasta_saida:
+        pasta_saida = opcoes.pasta_saida
+    else:
+        pasta_saida = os.path.dirname(caminho_audio)
+
+    formato = opcoes.formato_saida
+    classe = ESCRITORES.get(formato, ESCRITORES['docx'])
+    nome_arquivo = os.path.splitext(os.path.basename(caminho_audio))[0]
+    chave = chave_entrada(caminho_audio)[:DIGITOS_CHAVE_SAIDA]
+    base = os.path.join(pasta_saida, f"{nome_arquivo}_{chave}_transcrito_{opcoes.modelo}")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # 'caminho' não aparece na saída; vai para o .segmentos.npz para que reexportar() recrie a mesma chave
+    cabecalho = {'arquivo': os.path.basename(caminho_audio), 'caminho': os.path.abspath(caminho_audio),
+                 'nome': nome_arquivo, 'modelo': opcoes.modelo, 'idioma': descrever_idioma(opcoes)}
+    return classe(f"{base}_{timestamp}.{formato}", f"{base}.parcial.{classe.extensao_parcial or formato}",
+                  cabecalho, opcoes.incluir_timestamps)
+
+
+def gravar_segmentos(armazem, escritor):
+    """Grava o armazém ao lado da transcrição publicada por `escritor`, com o cabeçalho dela.
+
+    Uma falha aqui não invalida a transcrição já publicada; só impede regravá-la sem o modelo.
+    """
+    try:
+        armazem.salvar(caminho_segmentos(escritor.caminho_saida), escritor.cabecalho)
+    except OSError as e:
+        logging.warning(f"Não foi possível gravar os segmentos de '{escritor.caminho_saida}': {e}")
+
+
+def _exportar(armazem, escritor, idioma):
+    try:
+        escritor.iniciar(armazem, idioma)
+        caminho_saida = escritor.concluir()
+    except Exception:
+        escritor.descartar()
+        raise
+    logging.info(f"Transcrição salva no arquivo: {caminho_saida}")
+    return caminho_saida
+
+
+def salvar_transcricao(armazem, caminho_audio, opcoes, idioma_detectado=None):
+    """Grava de uma vez uma transcrição já pronta (ex.: vinda do cache) e retorna o caminho gerado.
+
+    `idioma_detectado` é o par (código, confiança) fixado para o arquivo quando o idioma é "auto".
+    """
+    escritor = criar_escritor(caminho_audio, opcoes)
+    caminho_saida = _exportar(armazem, escritor, descrever_idioma(opcoes, idioma_detectado))
+    gravar_segmentos(armazem, escritor)
+    return caminho_saida
+
+
+def reexportar(caminho_npz, formato, incluir_timestamps, pasta_saida=""):
+    """Gera a transcrição em outro formato ou estilo de timestamps a partir do .segmentos.npz, sem o modelo.
+
+    Sem `pasta_saida`, o arquivo novo fica ao lado do .npz. Retorna o caminho gerado. O nome usa
+    a chave do caminho original do áudio; .npz gravados antes de ele ser guardado usam só o nome.
+    """
+    armazem, metadados = ArmazemSegmentos.carregar(caminho_npz)
+    opcoes = OpcoesTranscricao(modelo=metadados['modelo'], formato_saida=formato,
+                               incluir_timestamps=incluir_timestamps,
+                               pasta_saida=pasta_saida or os.path.dirname(os.path.abspath(caminho_npz)))
+    escritor = criar_escritor(metadados.get('caminho') or metadados['arquivo'], opcoes)
+    return _exportar(armazem, escritor, metadados['idioma'])
+
+
+# --- Pool de processos para transcrição em lote ---
+CONTEXTO_MP = multiprocessing.get_context("spawn")  # Seguro com torch e em todas as plataformas
+
+# Estado de cada processo do pool, definido uma única vez em _inicializar_worker
+_worker_modelo = None
+_worker_cancel_event = None
+_worker_liberado_event = None
+_worker_fila_eventos = None
+_worker_erro_carregamento = None
+_worker_cache_audio = None
+
+
+def _inicializar_worker(nome_modelo, threads_processo, cancel_event, liberado_event, fila_eventos):
+    """Carrega o modelo uma única vez por processo, com threads limitadas para não disputar núcleos"""
+    global _worker_modelo, _worker_cancel_event, _worker_liberado_event, _worker_fila_eventos, \
+        _worker_erro_carregamento
+    _worker_cancel_event = cancel_event
+    _worker_liberado_event = liberado_event
+    _worker_fila_eventos = fila_eventos
+    try:
+        inicio = time.time()
+        with INSTRUMENTACAO.medir('carga_modelo', modelo=nome_modelo):
+            # Cada backend aplica o limite de threads à sua própria biblioteca de inferência
+            _worker_modelo = carregar_modelo_inferencia(nome_modelo, threads_processo)
+        INSTRUMENTACAO.registrar_carga_modelo(nome_modelo, time.time() - inicio)
+    except Exception as e:
+        # Não propagar: uma exceção no initializer faria o Pool recriar o processo indefinidamente
+        logging.error(f"Erro ao carregar o modelo '{nome_modelo}' no processo {os.getpid()}: {e}")
+        _worker_erro_carregamento = str(e)
+
+
+def _cache_audio_worker(opcoes):
+    """CacheAudio do processo do pool, aberto na primeira tarefa que o usa (None se desativado)"""
+    global _worker_cache_audio
+    if not opcoes.cache_audio:
+        return None
+    if _worker_cache_audio is None:
+        try:
+            _worker_cache_audio = CacheAudio(tamanho_max_mb=opcoes.tamanho_cache_audio_mb)
+        except (OSError, sqlite3.Error) as e:
+            logging.warning(f"Cache de áudio indisponível no processo {os.getpid()}: {e}")
+            return None
+    return _worker_cache_audio
+
+
+def _transcrever_arquivo_worker(tarefa):
+    """Executa no processo do pool: decodifica e transcreve um arquivo, devolvendo um resumo"""
+    caminho_audio, opcoes, diario, idioma_conhecido, escritor = tarefa
+    inicio = time.time()
+    resultado = {'caminho': caminho_audio, 'armazem': None, 'erro': None, 'cancelado': False, 'tempo': 0.0,
+                 'audio': 0.0, 'silencio': 0.0, 'idioma': idioma_conhecido}
+
+    if _worker_cancel_event.is_set():
+        resultado['cancelado'] = True
+        return resultado
+    if _worker_modelo is None:
+        resultado['erro'] = f"Modelo não carregado: {_worker_erro_carregamento}"
+        return resultado
+
+    try:
+        _worker_fila_eventos.put(('inicio', caminho_audio, os.getpid()))
+        if diario:
+            diario.iniciar()
+        retomar_em = diario.retomar_em if diario else 0.0
+        duracao, segmentos = preparar_segmentos(caminho_audio, opcoes.segmento_duracao,
+                                                opcoes.decodificacao_streaming, retomar_em, opcoes.vad,
+                                                cache_audio=_cache_audio_worker(opcoes))
+        idioma = opcoes.idioma_whisper
+        if idioma is None:
+            resultado['idioma'] = resultado['idioma'] or (diario.idioma if diario else None)
+            if resultado['idioma'] is None:
+                codigo, confianca, segmentos = fixar_idioma(_worker_modelo, segmentos, TAXA_AMOSTRAGEM)
+                resultado['idioma'] = (codigo, confianca) if codigo else None
+            if resultado['idioma']:
+                idioma = resultado['idioma'][0]
+                if diario and diario.idioma is None:
+                    diario.registrar_idioma(*resultado['idioma'])
+        # O parcial é escrito aqui; o processo principal o publica ou descarta ao receber o resultado
+        escritor.iniciar(armazem_do_diario(diario), descrever_idioma(opcoes, resultado['idioma']))
+        voz = []
+
+        def ao_segmento(i, inicio_seg, fim):
+            voz.append(fim - inicio_seg)
+            _worker_fila_eventos.put(('segmento', caminho_audio, fim, duracao))
+
+        resultado['armazem'] = transcrever_segmentos(
+            _worker_modelo, segmentos, idioma, opcoes.temperatura, _worker_cancel_event, _worker_liberado_event,
+            ao_segmento, diario, opcoes.tamanho_lote, escritor
+        )
+        resultado['cancelado'] = resultado['armazem'] is None
+        if not resultado['cancelado'] and duracao:
+            resultado['audio'] = duracao - retomar_em
+            resultado['silencio'] = max(0.0, resultado['audio'] - sum(voz)) if opcoes.vad else 0.0
+    except Exception as e:
+        logging.error(f"Erro na transcrição de '{caminho_audio}' (processo {os.getpid()}): {e}", exc_info=True)
+        resultado['erro'] = str(e)
+    finally:
+        if diario:
+            diario.fechar()
+        escritor.fechar()
+
+    resultado['tempo'] = time.time() - inicio
+    resultado['instrumentacao'] = INSTRUMENTACAO.drenar()
+    # iniciar() completou o cabeçalho (idioma detectado, data) só na cópia deste processo
+    resultado['cabecalho'] = escritor.cabecalho
+    return resultado
+
+
+# --- Faixas paralelas de um único arquivo ---
+FAIXA_MINIMA = 120  # Segundos; faixas mais curtas não compensam carregar mais um modelo
+JANELA_BUSCA_CORTE = 20  # Segundos decodificados em torno de cada corte nominal para achar uma pausa
+
+
+def sondar_idioma_arquivo(modelo, caminho_audio, segundos_por_bloco):
+    """Detecta o idioma decodificando em streaming só o início do arquivo; retorna (código, confiança) ou None"""
+    blocos = decodificar_audio_em_blocos(caminho_audio, segundos_por_bloco)
+    try:
+        codigo, confianca, _ = fixar_idioma(modelo, blocos, TAXA_AMOSTRAGEM)
+    finally:
+        blocos.close()  # Encerra o ffmpeg sem decodificar o restante
+    return (codigo, confianca) if codigo else None
+
+
+def _cortar_em_pausa(caminho_audio, nominal, minimo):
+    """Posição (em segundos) da pausa mais silenciosa perto de `nominal`, sem voltar antes de `minimo`"""
+    inicio = max(minimo, nominal - JANELA_BUSCA_CORTE / 2)
+    blocos = [bloco for _, bloco in decodificar_audio_em_blocos(caminho_audio, JANELA_BUSCA_CORTE, inicio=inicio,
+                                                                 fim=inicio + JANELA_BUSCA_CORTE)]
+    if not blocos:
+        return nominal
+    return inicio + amostra_mais_silenciosa(np.concatenate(blocos), TAXA_AMOSTRAGEM) / TAXA_AMOSTRAGEM
+
+
+def planejar_faixas(caminho_audio, inicio, duracao, num_faixas):
+    """Divide [inicio, duracao) em até `num_faixas` faixas de tamanho parecido, cortadas em pausas.
+
+    Só as janelas em torno de cada corte são decodificadas, em paralelo.
+    """
+    num_faixas = max(1, min(num_faixas, int((duracao - inicio) // FAIXA_MINIMA)))
+    if num_faixas == 1:
+        return [(inicio, duracao)]
+    tamanho = (duracao - inicio) / num_faixas
+    nominais = [inicio + k * tamanho for k in range(1, num_faixas)]
+    with ThreadPoolExecutor(max_workers=len(nominais)) as executor:
+        cortes = list(executor.map(lambda nominal: _cortar_em_pausa(caminho_audio, nominal, inicio), nominais))
+    limites = [inicio] + sorted(cortes) + [duracao]
+    return [(a, b) for a, b in zip(limites, limites[1:]) if b > a]
+
+
+def _sondar_idioma_worker(caminho_audio, segundos_por_bloco):
+    if _worker_modelo is None:
+        return None
+    return sondar_idioma_arquivo(_worker_modelo, caminho_audio, segundos_por_bloco)
+
+
+def _transcrever_faixa_worker(tarefa):
+    """Executa no processo do pool: decodifica só a faixa [inicio, fim) do arquivo e a transcreve"""
+    caminho_audio, opcoes, indice_faixa, inicio, fim, idioma = tarefa
+    resultado = {'indice': indice_faixa, 'armazem': None, 'erro': None, 'cancelado': False}
+
+    if _worker_cancel_event.is_set():
+        resultado['cancelado'] = True
+        return resultado
+    if _worker_modelo is None:
+        resultado['erro'] = f"Modelo não carregado: {_worker_erro_carregamento}"
+        return resultado
+
+    try:
+        _, segmentos = preparar_segmentos(caminho_audio, opcoes.segmento_duracao, True, inicio, opcoes.vad, fim,
+                                          _cache_audio_worker(opcoes))
+
+        def ao_segmento(i, inicio_seg, fim_seg):
+            _worker_fila_eventos.put(('faixa', caminho_audio, indice_faixa, fim_seg))
+
+        # Sem diário: o processo principal grava os trechos das faixas em ordem
+        resultado['armazem'] = transcrever_segmentos(_worker_modelo, segmentos, idioma, opcoes.temperatura,
+                                                     _worker_cancel_event, _worker_liberado_event, ao_segmento,
+                                                     tamanho_lote=opcoes.tamanho_lote)
+        resultado['cancelado'] = resultado['armazem'] is None
+    except Exception as e:
+        logging.error(f"Erro na faixa {indice_faixa} de '{caminho_audio}' (processo {os.getpid()}): {e}",
+                      exc_info=True)
+        resultado['erro'] = str(e)
+    resultado['instrumentacao'] = INSTRUMENTACAO.drenar()
+    return resultado
+
+
+# --- Cache de modelos residentes ---
+# Memória aproximada de cada modelo em fp32, usada para abrir espaço antes do carregamento;
+# depois de carregado, o tamanho real é medido a partir dos parâmetros
+TAMANHO_ESTIMADO_MB = {
+    WhisperModel.TINY.value: 150,
+    WhisperModel.BASE.value: 290,
+    WhisperModel.SMALL.value: 970,
+    WhisperModel.MEDIUM.value: 3000,
+    WhisperModel.LARGE.value: 6200,
+    WhisperModel.TURBO.value: 3200,
+}
+
+
+def _tamanho_estimado_mb(identificador):
+    """Memória esperada antes da carga; a do fp32 no PyTorch, por excesso, para os outros casos"""
+    return TAMANHO_ESTIMADO_MB.get(separar_identificador(identificador)[1], 0)
+
+
+def _devolver_memoria_ao_sistema():
+    """Coleta o lixo e, quando possível, devolve ao sistema as páginas livres do heap"""
+    gc.collect()
+    # Só se o torch já estiver carregado: importá-lo aqui (backends ctranslate2 e stub) ocuparia memória
+    torch = sys.modules.get('torch')
+    if torch is not None:
+        try:
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except Exception:
+            pass
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass  # Fora do glibc não há malloc_trim
+
+
+class CacheModelos:
+    """Mantém vários modelos carregados dentro de um orçamento de memória.
+
+    Os modelos ficam em ordem de uso (LRU): ao faltar espaço, o menos usado recentemente é
+    descarregado. Modelos sem uso há mais de `tempo_ocioso` segundos também são descarregados
+    por uma thread de limpeza. Um modelo obtido com `usar()` nunca é descarregado enquanto
+    o bloco `with` estiver ativo. A carga acontece fora do lock: quem pede um modelo que outra
+    thread já está carregando espera essa mesma carga, e as consultas ao cache seguem livres.
+    Pelo mesmo motivo, a memória dos modelos removidos só é devolvida ao sistema depois de
+    soltar o lock (veja _devolver_removidos).
+    """
+    INTERVALO_LIMPEZA = 30  # Segundos entre verificações de ociosidade
+
+    def __init__(self, orcamento_mb=ORCAMENTO_MEMORIA_PADRAO_MB, tempo_ocioso=TEMPO_OCIOSO_PADRAO_MIN * 60):
+        self.orcamento_mb = orcamento_mb
+        self.tempo_ocioso = tempo_ocioso
+        self._modelos = OrderedDict()  # nome -> {'modelo', 'tamanho_mb', 'ultimo_uso', 'em_uso'}
+        self._cargas = {}  # nome -> Future da carga em andamento
+        self._lock = threading.RLock()
+        self._thread_limpeza = None
+        self.acertos = 0
+        self.falhas = 0
+        self.descarregados = 0
+        self.tempos_carregamento = {}  # nome -> segundos do último carregamento
+        self.tamanhos_medidos = {}  # nome -> MB medidos na carga, mantidos depois de descarregar
+
+    def configurar(self, orcamento_mb=None, tempo_ocioso=None):
+        with self._lock:
+            if orcamento_mb is not None:
+                self.orcamento_mb = orcamento_mb
+            if tempo_ocioso is not None:
+                self.tempo_ocioso = tempo_ocioso
+            removidos = self._liberar_espaco(0)
+        self._devolver_removidos(removidos)
+
+    @property
+    def nomes(self):
+        with self._lock:
+            return list(self._modelos)
+
+    @property
+    def memoria_usada_mb(self):
+        with self._lock:
+            return sum(entrada['tamanho_mb'] for entrada in self._modelos.values())
+
+    def contem(self, nome_modelo):
+        with self._lock:
+            return nome_modelo in self._modelos
+
+    def carregando(self, nome_modelo):
+        with self._lock:
+            return nome_modelo in self._cargas
+
+    def adicionar(self, nome_modelo, modelo, tamanho_mb=0.0):
+        """Coloca no cache um ModeloInferencia já construído, sem carregá-lo pelo backend (ex.: o dos benchmarks)"""
+        with self._lock:
+            self._modelos[nome_modelo] = {'modelo': modelo, 'tamanho_mb': tamanho_mb, 'ultimo_uso': time.time(),
+                                          'em_uso': 0}
+
+    def obter(self, nome_modelo, contar_acerto=True):
+        """Retorna o modelo residente ou o carrega; levanta a exceção original em caso de falha"""
+        while True:
+            with self._lock:
+                entrada = self._modelos.get(nome_modelo)
+                if entrada is not None:
+                    if contar_acerto:
+                        self.acertos += 1
+                    self._modelos.move_to_end(nome_modelo)
+                    entrada['ultimo_uso'] = time.time()
+                    return entrada['modelo']
+                carga = self._cargas.get(nome_modelo)
+                if carga is None:
+                    carga = self._cargas[nome_modelo] = Future()
+                    self.falhas += 1
+                    removidos = self._liberar_espaco(_tamanho_estimado_mb(nome_modelo))
+                    break
+            # Outra thread já carrega este modelo: espera por ela e o lê do cache
+            carga.result()
+        self._devolver_removidos(removidos)
+
+        try:
+            inicio = time.time()
+            with INSTRUMENTACAO.medir('carga_modelo', modelo=nome_modelo):
+                modelo = carregar_modelo_inferencia(nome_modelo)
+            tempo_carga = time.time() - inicio
+            tamanho_mb = modelo.tamanho_mb()
+            if tamanho_mb is None:
+                tamanho_mb = _tamanho_estimado_mb(nome_modelo)
+        except BaseException as e:
+            with self._lock:
+                del self._cargas[nome_modelo]
+            carga.set_exception(e)
+            raise
+        INSTRUMENTACAO.registrar_carga_modelo(nome_modelo, tempo_carga)
+
+        with self._lock:
+            self.tempos_carregamento[nome_modelo] = tempo_carga
+            self.tamanhos_medidos[nome_modelo] = tamanho_mb
+            self._modelos[nome_modelo] = {'modelo': modelo, 'tamanho_mb': tamanho_mb,
+                                          'ultimo_uso': time.time(), 'em_uso': 0}
+            del self._cargas[nome_modelo]
+            logging.info(f"Modelo '{nome_modelo}' em cache ({tamanho_mb:.0f} MB, {tempo_carga:.1f}s)")
+            removidos = self._liberar_espaco(0, preservar=nome_modelo)
+            self._iniciar_limpeza()
+        carga.set_result(modelo)
+        self._devolver_removidos(removidos)
+        return modelo
+
+    @contextmanager
+    def usar(self, nome_modelo):
+        """Obtém o modelo e o protege da remoção até o fim do bloco.
+
+        Quem chama já contabilizou o acesso com obter(); aqui só uma recarga conta como falha.
+        """
+        while True:
+            modelo = self.obter(nome_modelo, contar_acerto=False)
+            with self._lock:
+                entrada = self._modelos.get(nome_modelo)
+                # Descarregado entre a obtenção e a proteção: obtém de novo
+                if entrada is not None and entrada['modelo'] is modelo:
+                    entrada['em_uso'] += 1
+                    break
+        try:
+            yield modelo
+        finally:
+            with self._lock:
+                entrada = self._modelos.get(nome_modelo)
+                if entrada is not None:
+                    entrada['em_uso'] -= 1
+                    entrada['ultimo_uso'] = time.time()
+
+    def descarregar(self, nome_modelo, motivo="manual"):
+        with self._lock:
+            entrada = self._remover(nome_modelo, motivo)
+        if entrada is None:
+            return False
+        removidos, entrada = [entrada], None
+        self._devolver_removidos(removidos)
+        return True
+
+    def _remover(self, nome_modelo, motivo):
+        """Tira o modelo do cache, se estiver fora de uso, e retorna a entrada; chamado com o lock"""
+        entrada = self._modelos.get(nome_modelo)
+        if entrada is None or entrada['em_uso']:
+            return None
+        del self._modelos[nome_modelo]
+        self.descarregados += 1
+        logging.info(f"Modelo '{nome_modelo}' descarregado ({motivo}, {entrada['tamanho_mb']:.0f} MB)")
+        return entrada
+
+    @staticmethod
+    def _devolver_removidos(removidos):
+        """Solta as entradas removidas e devolve a memória ao sistema; chamado sem o lock"""
+        if removidos:
+            removidos.clear()  # Última referência aos modelos, antes da coleta
+            _devolver_memoria_ao_sistema()
+
+    def _liberar_espaco(self, necessario_mb, preservar=None):
+        """Remove modelos fora de uso, do menos recente ao mais recente, até caber `necessario_mb`.
+
+        Chamado com o lock; retorna as entradas removidas para _devolver_removidos(), fora dele.
+        """
+        removidos = []
+        for nome_modelo in list(self._modelos):
+            if self.memoria_usada_mb + necessario_mb <= self.orcamento_mb:
+                return removidos
+            if nome_modelo != preservar:
+                entrada = self._remover(nome_modelo, "orçamento de memória")
+                if entrada is not None:
+                    removidos.append(entrada)
+        if self.memoria_usada_mb + necessario_mb > self.orcamento_mb:
+            logging.warning(f"Orçamento de memória de {self.orcamento_mb} MB excedido: "
+                            f"{self.memoria_usada_mb:.0f} MB em cache, todos em uso ou indispensáveis")
+        return removidos
+
+    def _iniciar_limpeza(self):
+        if self._thread_limpeza is None or not self._thread_limpeza.is_alive():
+            self._thread_limpeza = threading.Thread(target=self._laco_limpeza, daemon=True)
+            self._thread_limpeza.start()
+
+    def _laco_limpeza(self):
+        while True:
+            time.sleep(self.INTERVALO_LIMPEZA)
+            with self._lock:
+                if not self._modelos:
+                    self._thread_limpeza = None
+                    return
+                if not self.tempo_ocioso:
+                    continue  # 0 desativa o descarregamento por ociosidade
+                limite = time.time() - self.tempo_ocioso
+                ociosos = [nome for nome, entrada in self._modelos.items()
+                           if not entrada['em_uso'] and entrada['ultimo_uso'] < limite]
+            for nome_modelo in ociosos:
+                self.descarregar(nome_modelo, "ociosidade")
+
+    def resumo(self):
+        """Linhas de texto para a aba de estatísticas e para o log"""
+        with self._lock:
+            linhas = [f"Em cache: {', '.join(self._modelos) or 'nenhum'} "
+                      f"({self.memoria_usada_mb:.0f} de {self.orcamento_mb} MB)"
+                      + (f", carregando: {', '.join(self._cargas)}" if self._cargas else ""),
+                      f"Acertos: {self.acertos} | Falhas: {self.falhas} | Descarregados: {self.descarregados}"]
+            linhas.extend(f"Carregamento de '{nome}': {segundos:.1f}s"
+                          for nome, segundos in self.tempos_carregamento.items())
+        return linhas
+
+    def comparar_precisoes(self):
+        """Memória de cada modelo carregado em outra precisão contra a do mesmo modelo em fp32"""
+        with self._lock:
+            tamanhos = dict(self.tamanhos_medidos)
+        linhas = []
+        for identificador, tamanho_mb in sorted(tamanhos.items()):
+            backend, nome_modelo, precisao = separar_identificador(identificador)
+            if precisao == PRECISAO_PADRAO:
+                continue
+            referencia = tamanhos.get(identificador_modelo(nome_modelo, PRECISAO_PADRAO, backend))
+            origem = "medido"
+            if referencia is None and backend == BACKEND_PADRAO:
+                referencia, origem = TAMANHO_ESTIMADO_MB.get(nome_modelo), "estimado"
+            if referencia:
+                linhas.append(f"{identificador_modelo(nome_modelo, backend=backend)}: {tamanho_mb:.0f} MB em "
+                              f"{precisao} contra {referencia:.0f} MB em {PRECISAO_PADRAO} ({origem}), "
+                              f"{tamanho_mb / referencia:.0%}")
+        return linhas
+
+
+# --- Métricas do pipeline de lote ---
+class MetricasEstagio:
+    """Contadores de um estágio do pipeline: itens, tempo ocioso/ativo e profundidade da fila"""
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.itens = 0
+        self.tempo_ocioso = 0.0
+        self.tempo_ativo = 0.0
+        self.profundidade_max = 0
+        self._soma_profundidade = 0
+        self._amostras_profundidade = 0
+
+    def registrar_profundidade(self, fila):
+        profundidade = fila.qsize()
+        self.profundidade_max = max(self.profundidade_max, profundidade)
+        self._soma_profundidade += profundidade
+        self._amostras_profundidade += 1
+
+    @property
+    def profundidade_media(self):
+        if not self._amostras_profundidade:
+            return 0.0
+        return self._soma_profundidade / self._amostras_profundidade
+
+    def resumo(self):
+        return (f"{self.nome}: {self.itens} item(ns) | ativo {self.tempo_ativo:.1f}s | "
+                f"ocioso {self.tempo_ocioso:.1f}s | fila média {self.profundidade_media:.1f} "
+                f"(máx. {self.profundidade_max})")
+
+
+class MotorTranscricao:
+    """Executa transcrições individuais e em lote, reportando o andamento por eventos.
+
+    Eventos emitidos (sempre com a chave 'tipo'):
+      modelo          estado ('carregando', 'carregado', 'erro'), modelo, cache (já residente), erro
+      detalhe         mensagem
+      arquivo_inicio  caminho, indice, total, tamanho_mb
+      arquivo_info    caminho, duracao, segmentos (None se desconhecidos)
+      idioma          caminho, idioma, confianca (idioma "auto", uma vez por arquivo)
+      segmento        caminho, indice_segmento, segmentos, inicio, fim, progresso, eta
+      arquivo_fim     caminho, status ('sucesso', 'erro', 'cancelado', 'vazio'), saida, tempo, erro
+      progresso_lote  indice, total, percentual (de segundos de áudio), decorrido, eta
+      lote_inicio     total (None se a pasta ainda está sendo varrida), processos
+      lote_fim        sucessos, erros, tempo_total, cancelado, audio_processado, silencio_descartado, vazao,
+                      metricas, falhas (caminho e erro de cada arquivo com status 'erro')
+    """
+    PROFUNDIDADE_PREFETCH = 1  # Arquivos decodificados à frente do que está em inferência
+    PROFUNDIDADE_ESCRITA = 2  # Transcrições aguardando gravação em disco
+    ESCRITORES_PARALELOS = 2  # Threads do estágio de escrita (montagem do DOCX, publicação, cache e diário)
+
+    def __init__(self, opcoes=None, ao_evento=None, cache_modelos=None, cache_transcricoes=None,
+                 historico_desempenho=None):
+        self.opcoes = opcoes or OpcoesTranscricao()
+        self.ao_evento = ao_evento
+        # O cache pode ser compartilhado entre motores (o serviço local usa um único cache);
+        # nesse caso o orçamento é definido por quem o criou, não pelas opções de cada execução
+        self._cache_proprio = cache_modelos is None
+        self.cache_modelos = cache_modelos or CacheModelos()
+        self._cache_transcricoes = cache_transcricoes
+        self._cache_audio = None
+        self._historico_desempenho = historico_desempenho
+        self._fatores_lote = {}  # modelo -> [segundos de áudio, segundos efetivos] medidos nesta execução
+        self._chaves_cache = {}  # caminho do áudio -> (hash do conteúdo, chave no cache)
+        self._armazens_repetidos = {}  # chave -> ArmazemSegmentos, para os arquivos repetidos no lote
+        self._diarios = {}  # caminho do áudio -> DiarioTranscricao da execução atual
+        self._idiomas = {}  # caminho do áudio -> (código, confiança) detectados nesta execução
+        # Eventos do contexto "spawn" para que cancelar/pausar também alcancem o pool de processos.
+        # liberado_event fica ativo enquanto a execução pode seguir; pausar o limpa e quem espera
+        # bloqueia em wait() em vez de consultar o estado em laço
+        self.cancel_event = CONTEXTO_MP.Event()
+        self.liberado_event = CONTEXTO_MP.Event()
+        self.liberado_event.set()
+        self.modelo_carregado_nome = None
+        self._duracoes = SondaDuracoes(obter_duracao_audio)  # Durações do lote, para progresso e ETA
+        self._audio_concluido = 0.0  # Segundos de áudio dos arquivos já concluídos no lote
+        self._audio_por_arquivo = {}  # caminho do áudio -> segundos transcritos, até o arquivo ser finalizado
+        self._falhas_lote = []  # {'caminho', 'erro'} dos arquivos que falharam na execução atual
+        # Os escritores do pipeline concluem arquivos em paralelo; a contabilidade passa por este lock
+        self._lock_conclusao = threading.Lock()
+        self.start_time = 0
+        self.estatisticas = {
+            'arquivos_processados': 0,
+            'tempo_total_processamento': 0,
+            'audio_processado': 0.0,  # Segundos de áudio percorridos
+            'silencio_descartado': 0.0,  # Segundos que o VAD não enviou ao modelo
+            'erros': 0,
+            'sucessos': 0
+        }
+        self._estatisticas_antes_do_lote = dict(self.estatisticas)
+        self.metricas_pipeline = []
+
+    def _emitir(self, tipo, **dados):
+        if tipo == 'arquivo_fim' and dados.get('status') == 'erro':
+            self._falhas_lote.append({'caminho': dados['caminho'], 'erro': dados.get('erro')})
+        if self.ao_evento is None:
+            return
+        try:
+            self.ao_evento({'tipo': tipo, **dados})
+        except Exception as e:
+            # Um erro no cliente (interface, CLI) não deve interromper a transcrição
+            logging.error(f"Erro ao tratar evento '{tipo}': {e}", exc_info=True)
+
+    def _detalhe(self, mensagem):
+        self._emitir('detalhe', mensagem=mensagem)
+
+    # --- Controle ---
+    @property
+    def pausado(self):
+        return not self.liberado_event.is_set()
+
+    def cancelar(self):
+        self.cancel_event.set()
+        self.liberado_event.set()  # Acorda quem está pausado para que veja o cancelamento
+        logging.info("Sinal de cancelamento enviado para o processo de transcrição.")
+
+    def pausar(self):
+        self.liberado_event.clear()
+        logging.info("Processo de transcrição pausado.")
+
+    def retomar(self):
+        self.liberado_event.set()
+        logging.info("Processo de transcrição retomado.")
+
+    def _reiniciar_controle(self, arquivos_audio=()):
+        self.cancel_event.clear()
+        self.liberado_event.set()
+        self._duracoes.encerrar()
+        self._duracoes = SondaDuracoes(obter_duracao_audio)
+        self._duracoes.sondar(arquivos_audio)
+        self._audio_concluido = 0.0
+        self._audio_por_arquivo = {}
+        self._falhas_lote = []
+        self._fatores_lote = {}
+        self.start_time = time.time()
+        self._chaves_cache = {}
+        self._diarios = {}
+        self._idiomas = {}
+        # `estatisticas` acumula a sessão inteira; o resumo do lote é a diferença para esta cópia
+        self._estatisticas_antes_do_lote = dict(self.estatisticas)
+
+    # --- Modelo ---
+    def carregar_modelo(self, nome_modelo=None):
+        """Obtém o modelo do cache (carregando-o se preciso); levanta a exceção original em caso de falha"""
+        modelo_selecionado = nome_modelo or self.opcoes.modelo
+        if modelo_selecionado == MODELO_AUTO:
+            modelo_selecionado = self._escolher_modelo_auto(())
+        modelo_selecionado = identificador_modelo(modelo_selecionado, self.opcoes.precisao, self.opcoes.backend)
+        if self._cache_proprio:
+            self.cache_modelos.configurar(self.opcoes.orcamento_memoria_mb, self.opcoes.tempo_ocioso_min * 60)
+
+        if self.cache_modelos.contem(modelo_selecionado):
+            modelo = self.cache_modelos.obter(modelo_selecionado)
+            self.modelo_carregado_nome = modelo_selecionado
+            self._emitir('modelo', estado='carregado', modelo=modelo_selecionado, cache=True)
+            return modelo
+
+        if self.cache_modelos.carregando(modelo_selecionado):
+            # Ex.: o pré-carregamento da interface; obter() espera essa carga em vez de repeti-la
+            self._detalhe(f"⏳ Aguardando a carga em andamento do modelo: {modelo_selecionado}...")
+        else:
+            logging.info(f"Carregando o modelo '{modelo_selecionado}'...")
+            self._detalhe(f"🔄 Carregando modelo: {modelo_selecionado}...")
+        self._emitir('modelo', estado='carregando', modelo=modelo_selecionado)
+
+        try:
+            modelo = self.cache_modelos.obter(modelo_selecionado)
+        except Exception as e:
+            logging.error(f"Erro ao carregar o modelo '{modelo_selecionado}': {e}")
+            self._detalhe(f"❌ Falha ao carregar modelo: {modelo_selecionado} - {e}")
+            self._emitir('modelo', estado='erro', modelo=modelo_selecionado, erro=str(e))
+            raise
+
+        self.modelo_carregado_nome = modelo_selecionado
+        self._detalhe(f"✅ Modelo carregado com sucesso: {modelo_selecionado}")
+        self._emitir('modelo', estado='carregado', modelo=modelo_selecionado, cache=False)
+        return modelo
+
+    @contextmanager
+    def _usar_modelo(self):
+        """Mantém o modelo protegido no cache durante a execução, sem guardar referência depois dela"""
+        self.carregar_modelo()
+        with self.cache_modelos.usar(self.opcoes.identificador_modelo) as modelo:
+            yield modelo
+
+    # --- Modelo automático ---
+    @property
+    def historico_desempenho(self):
+        """Fatores de tempo real medidos nesta máquina, abertos no primeiro uso"""
+        if self._historico_desempenho is None:
+            self._historico_desempenho = HistoricoDesempenho()
+        return self._historico_desempenho
+
+    def _registrar_desempenho(self, caminho_audio, segundos_audio, tempo_arquivo, paralelos=1, tempo_efetivo=None):
+        """Acrescenta o arquivo ao histórico da máquina e ao fator observado nesta execução.
+
+        `tempo_efetivo`, quando informado, é o tempo de máquina já atribuído ao arquivo (lotes
+        com janelas de vários arquivos); senão, o tempo do arquivo é dividido por `paralelos`.
+        """
+        if segundos_audio <= 0:
+            return
+        if tempo_efetivo is None:
+            # Com vários arquivos ao mesmo tempo, cada um ocupa a máquina só por uma fração do seu tempo
+            tempo_efetivo = tempo_arquivo / paralelos
+        acumulado = self._fatores_lote.setdefault(self.opcoes.modelo, [0.0, 0.0])
+        acumulado[0] += segundos_audio
+        acumulado[1] += tempo_efetivo
+        idioma = self.opcoes.idioma_whisper or (self._idiomas.get(caminho_audio) or (None,))[0]
+        try:
+            self.historico_desempenho.registrar(self.opcoes.modelo, idioma, self.opcoes.segmento_duracao,
+                                                self.opcoes.num_processos, segundos_audio, tempo_efetivo,
+                                                self.opcoes.precisao, self.opcoes.backend)
+        except Exception as e:
+            logging.warning(f"Não foi possível registrar o desempenho de '{caminho_audio}': {e}")
+
+    def _escolher_modelo_auto(self, proximos):
+        """Modelo mais preciso cujo fator de tempo real estimado cumpre o prazo para o áudio restante.
+
+        O fator exigido é o menor entre o alvo das opções e o tempo que resta do prazo dividido
+        pelo áudio ainda não concluído; sem nenhum dos dois, acompanhar o tempo real. Os fatores
+        observados nesta execução prevalecem sobre o histórico, então uma parte mais lenta que
+        o previsto faz as seguintes caírem para um modelo mais rápido.
+        """
+        for caminho_audio in proximos:
+            self._duracoes.aguardar(caminho_audio)
+        opcoes = self.opcoes
+        restante = max(0.0, self._duracoes.total_estimado() - self._audio_concluido)
+        exigidos = []
+        if opcoes.fator_tempo_real_alvo > 0:
+            exigidos.append(opcoes.fator_tempo_real_alvo)
+        if opcoes.prazo_min > 0 and restante > 0:
+            exigidos.append(max(0.0, opcoes.prazo_min * 60 - (time.time() - self.start_time)) / restante)
+        fator_exigido = min(exigidos) if exigidos else FATOR_ALVO_PADRAO
+
+        observados = {modelo: tempo / audio for modelo, (audio, tempo) in self._fatores_lote.items()
+                      if audio >= AUDIO_MINIMO}
+        try:
+            estimativas = self.historico_desempenho.estimar(MODELOS_POR_PRECISAO, opcoes.idioma_whisper,
+                                                            opcoes.segmento_duracao, opcoes.num_processos,
+                                                            observados, opcoes.precisao, opcoes.backend)
+        except Exception as e:
+            logging.warning(f"Não foi possível consultar o histórico de desempenho: {e}")
+            estimativas = dict.fromkeys(MODELOS_POR_PRECISAO)
+            estimativas.update(observados)
+        modelo = escolher_modelo(estimativas, fator_exigido)
+        estimado = estimativas.get(modelo)
+        descricao = f"fator exigido {fator_exigido:.2f}, estimado " + (
+            "desconhecido" if estimado is None else f"{estimado:.2f}")
+        logging.info(f"Modelo automático: {modelo} ({descricao}, áudio restante {restante:.0f}s)")
+        self._detalhe(f"🤖 Modelo automático: {modelo} ({descricao}; falta {formatar_tempo(restante)} de áudio)")
+        return modelo
+
+    @contextmanager
+    def _com_modelo(self, nome_modelo):
+        """Executa com `nome_modelo` no lugar do modelo "auto" das opções"""
+        opcoes = self.opcoes
+        self.opcoes = replace(opcoes, modelo=nome_modelo)
+        try:
+            yield
+        finally:
+            self.opcoes = opcoes
+
+    def _processar_grupo_auto(self, arquivos_audio, anteriores=0):
+        """Divide o grupo em partes e escolhe o modelo "auto" de novo antes de cada uma"""
+        tamanho_parte = -(-len(arquivos_audio) // PARTES_MODELO_AUTO)
+        if self.opcoes.num_processos > 1:
+            # Cada parte abre um pool que carrega o modelo em todos os processos; partes menores não compensam
+            tamanho_parte = max(tamanho_parte, 2 * self.opcoes.num_processos)
+        for inicio in range(0, len(arquivos_audio), tamanho_parte):
+            if self.cancel_event.is_set():
+                break
+            parte = arquivos_audio[inicio:inicio + tamanho_parte]
+            with self._com_modelo(self._escolher_modelo_auto(parte)):
+                self._processar_grupo(parte, anteriores + inicio)
+
+    # --- Cache de transcrições ---
+    @property
+    def cache_transcricoes(self):
+        """Cache de transcrições, aberto no primeiro uso (None se desativado nas opções)"""
+        if not self.opcoes.cache_transcricoes:
+            return None
+        if self._cache_transcricoes is None:
+            self._cache_transcricoes = CacheTranscricoes(tamanho_max_mb=self.opcoes.tamanho_cache_mb)
+        return self._cache_transcricoes
+
+    @property
+    def cache_audio(self):
+        """Cache do áudio decodificado, aberto no primeiro uso (None se desativado nas opções)"""
+        if not self.opcoes.cache_audio:
+            return None
+        if self._cache_audio is None:
+            try:
+                self._cache_audio = CacheAudio(tamanho_max_mb=self.opcoes.tamanho_cache_audio_mb)
+            except (OSError, sqlite3.Error) as e:
+                logging.warning(f"Cache de áudio indisponível: {e}")
+                return None
+        self._cache_audio.tamanho_max_mb = self.opcoes.tamanho_cache_audio_mb
+        return self._cache_audio
+
+    def _calcular_chave_cache(self, caminho_audio):
+        cache = self.cache_transcricoes
+        try:
+            hash_audio = cache.hash_audio(caminho_audio)
+        except Exception as e:
+            # Arquivo inacessível: a transcrição normal reporta o erro
+            logging.warning(f"Não foi possível calcular o hash de '{caminho_audio}': {e}")
+            return None
+        chave = (hash_audio, cache.chave(hash_audio, self.opcoes))
+        self._chaves_cache[caminho_audio] = chave
+        return chave
+
+    def _entregar_do_cache(self, armazem, caminho_audio, indice, total):
+        """Conclui um arquivo com a transcrição já conhecida, sem decodificar nem carregar modelo"""
+        tamanho_mb = os.path.getsize(caminho_audio) / (1024 * 1024)
+        self._emitir('arquivo_inicio', caminho=caminho_audio, indice=indice, total=total, tamanho_mb=tamanho_mb)
+        self._detalhe(f"♻️ {os.path.basename(caminho_audio)}: transcrição reaproveitada do cache")
+        status = self._finalizar_arquivo(armazem, caminho_audio, indice, total, 0.0, do_cache=True)
+        self.estatisticas['arquivos_processados'] += 1
+        return status
+
+    def _separar_cache(self, arquivos_audio, anteriores=0):
+        """Entrega os acertos de cache e separa os arquivos que ainda precisam de inferência.
+
+        Retorna (pendentes, repetidos): arquivos com conteúdo inédito e, para os que repetem o
+        conteúdo de outro arquivo do grupo, pares (caminho, chave) resolvidos ao final.
+        `anteriores` são os arquivos do lote já concluídos antes deste grupo.
+        """
+        if self.cache_transcricoes is None:
+            return list(arquivos_audio), []
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            chaves = list(executor.map(self._calcular_chave_cache, arquivos_audio))
+
+        total = anteriores + len(arquivos_audio)
+        pendentes, repetidos, vistas = [], [], set()
+        concluidos = anteriores
+        for caminho_audio, chave in zip(arquivos_audio, chaves):
+            if self.cancel_event.is_set():
+                break
+            if chave is None:
+                pendentes.append(caminho_audio)
+                continue
+            if chave[1] in vistas:
+                repetidos.append((caminho_audio, chave[1]))
+                continue
+            vistas.add(chave[1])
+
+            armazem = self.cache_transcricoes.obter(chave[1])
+            if armazem is None:
+                pendentes.append(caminho_audio)
+            else:
+                concluidos += 1
+                self._entregar_do_cache(armazem, caminho_audio, concluidos, total)
+
+        self._armazens_repetidos = {chave: None for _, chave in repetidos}
+        if concluidos > anteriores or repetidos:
+            self._detalhe(f"♻️ Cache: {concluidos - anteriores} arquivo(s) reaproveitado(s), "
+                          f"{len(repetidos)} repetido(s) no lote")
+        return pendentes, repetidos
+
+    def _entregar_repetidos(self, repetidos, total):
+        for indice, (caminho_audio, chave) in enumerate(repetidos, start=total - len(repetidos) + 1):
+            armazem = self._armazens_repetidos.get(chave)
+            if armazem is None and self.cache_transcricoes is not None:
+                armazem = self.cache_transcricoes.obter(chave)
+            if armazem is not None:
+                self._entregar_do_cache(armazem, caminho_audio, indice, total)
+                continue
+            status = 'cancelado' if self.cancel_event.is_set() else 'erro'
+            self._emitir('arquivo_fim', caminho=caminho_audio, status=status, saida=None, tempo=0.0,
+                         erro=None if status == 'cancelado' else "O arquivo idêntico do lote não foi transcrito")
+            if status == 'erro':
+                self.estatisticas['erros'] += 1
+            self.estatisticas['arquivos_processados'] += 1
+        self._armazens_repetidos = {}
+
+    # --- Checkpoints ---
+    def _obter_diario(self, caminho_audio):
+        """Diário do arquivo nesta execução; no modo retomar, já com os checkpoints anteriores"""
+        diario = self._diarios.get(caminho_audio)
+        if diario is None:
+            try:
+                diario = DiarioTranscricao(caminho_audio, self.opcoes)
+                if self.opcoes.retomar:
+                    diario.carregar()
+            except Exception as e:
+                # Sem diário a transcrição segue normalmente; um arquivo ausente é reportado por ela
+                logging.warning(f"Diário de checkpoints indisponível para '{caminho_audio}': {e}")
+                return None
+            self._diarios[caminho_audio] = diario
+        return diario
+
+    def _separar_retomados(self, arquivos_audio, total, ja_concluidos):
+        """No modo retomar, conclui os arquivos cujo diário já registra a saída gravada"""
+        if not self.opcoes.retomar:
+            return arquivos_audio
+
+        pendentes, parciais = [], 0
+        for caminho_audio in arquivos_audio:
+            diario = self._obter_diario(caminho_audio)
+            if diario is None or not diario.concluido or not os.path.exists(diario.saida):
+                pendentes.append(caminho_audio)
+                parciais += bool(diario and diario.trechos)
+                continue
+
+            ja_concluidos += 1
+            self._emitir('arquivo_inicio', caminho=caminho_audio, indice=ja_concluidos, total=total,
+                         tamanho_mb=os.path.getsize(caminho_audio) / (1024 * 1024))
+            self._audio_concluido += self._duracoes.estimada(caminho_audio)
+            self.estatisticas['sucessos'] += 1
+            self.estatisticas['arquivos_processados'] += 1
+            self._emitir('arquivo_fim', caminho=caminho_audio, status='sucesso', saida=diario.saida, tempo=0.0,
+                         erro=None)
+            self._atualizar_progresso(ja_concluidos, total)
+
+        self._detalhe(f"⏯️ Retomando: {len(arquivos_audio) - len(pendentes)} arquivo(s) já concluído(s), "
+                      f"{parciais} parcialmente transcrito(s)")
+        return pendentes
+
+    def _remover_diarios_concluidos(self):
+        """Ao fim de uma execução não cancelada, descarta os diários dos arquivos gravados"""
+        if self.cancel_event.is_set():
+            return
+        for diario in self._diarios.values():
+            if diario.concluido:
+                diario.remover()
+
+    # --- Idioma ---
+    def _idioma_conhecido(self, caminho_audio, diario=None):
+        """(código, confiança) já detectados para o arquivo: nesta execução, no diário ou no cache"""
+        idioma = self._idiomas.get(caminho_audio) or (diario.idioma if diario else None)
+        cache = self.cache_transcricoes
+        if idioma is None and cache is not None and caminho_audio in self._chaves_cache:
+            try:
+                idioma = cache.obter_idioma(self._chaves_cache[caminho_audio][0], self.opcoes.identificador_modelo)
+            except Exception as e:
+                logging.warning(f"Não foi possível consultar o idioma de '{caminho_audio}' no cache: {e}")
+        if idioma is not None:
+            self._idiomas[caminho_audio] = idioma
+        return idioma
+
+    def _registrar_idioma(self, caminho_audio, idioma, confianca):
+        self._idiomas[caminho_audio] = (idioma, confianca)
+        cache = self.cache_transcricoes
+        if cache is not None and caminho_audio in self._chaves_cache:
+            try:
+                cache.guardar_idioma(self._chaves_cache[caminho_audio][0], self.opcoes.identificador_modelo, idioma,
+                                     confianca)
+            except Exception as e:
+                logging.error(f"Erro ao guardar o idioma de '{caminho_audio}' no cache: {e}")
+        self._emitir('idioma', caminho=caminho_audio, idioma=idioma, confianca=confianca)
+        self._detalhe(f"🌐 {os.path.basename(caminho_audio)}: idioma detectado "
+                      f"{nome_idioma(idioma, IDIOMAS_WHISPER)} ({confianca:.0%})")
+
+    def _fixar_idioma(self, modelo, caminho_audio, segmentos, diario=None):
+        """Retorna (idioma, segmentos): com "auto", detecta o idioma uma vez e o usa em todo o arquivo.
+
+        Os segmentos lidos na sondagem voltam à frente do iterador devolvido. O idioma é None se
+        o arquivo não tiver áudio a analisar.
+        """
+        if self.opcoes.idioma_whisper is not None:
+            return self.opcoes.idioma_whisper, segmentos
+        idioma = self._idioma_conhecido(caminho_audio, diario)
+        if idioma is None:
+            codigo, confianca, segmentos = fixar_idioma(modelo, segmentos, TAXA_AMOSTRAGEM)
+            if codigo is None:
+                return None, segmentos
+            idioma = (codigo, confianca)
+            self._registrar_idioma(caminho_audio, codigo, confianca)
+        if diario and diario.idioma is None:
+            diario.registrar_idioma(*idioma)
+        return idioma[0], segmentos
+
+    def _agrupar_por_idioma(self, modelo, arquivos_audio):
+        """Detecta o idioma de cada arquivo e reordena o lote para que os de mesmo idioma fiquem juntos.
+
+        A sondagem decodifica em streaming só o início de cada arquivo; o idioma fica guardado e
+        não é detectado de novo na transcrição. Com inferência em lote, isso mantém as janelas de
+        uma mesma chamada no mesmo idioma.
+        """
+        idiomas = {}
+        for caminho_audio in arquivos_audio:
+            if self.cancel_event.is_set():
+                return arquivos_audio
+            idioma = self._idioma_conhecido(caminho_audio, self._diarios.get(caminho_audio))
+            if idioma is None:
+                try:
+                    idioma = sondar_idioma_arquivo(modelo, caminho_audio, self.opcoes.segmento_duracao)
+                except Exception as e:
+                    # O erro volta a aparecer, e é reportado, na transcrição do arquivo
+                    logging.warning(f"Não foi possível detectar o idioma de '{caminho_audio}': {e}")
+                if idioma is not None:
+                    self._registrar_idioma(caminho_audio, *idioma)
+            idiomas[caminho_audio] = idioma[0] if idioma else ""
+
+        ordenados = sorted(arquivos_audio, key=lambda caminho_audio: idiomas[caminho_audio])
+        contagem = {}
+        for caminho_audio in ordenados:
+            contagem[idiomas[caminho_audio]] = contagem.get(idiomas[caminho_audio], 0) + 1
+        self._detalhe("🌐 Lote agrupado por idioma: " + ", ".join(
+            f"{codigo or 'desconhecido'} ({quantidade})" for codigo, quantidade in contagem.items()))
+        return ordenados
+
+    # --- Transcrição individual ---
+    def transcrever(self, caminho_audio):
+        """Transcreve um único arquivo, do carregamento do modelo à gravação.
+
+        Com `num_processos` > 1, o arquivo é dividido em faixas transcritas em paralelo.
+        """
+        self._reiniciar_controle([caminho_audio])
+        if self.opcoes.modelo == MODELO_AUTO:
+            with self._com_modelo(self._escolher_modelo_auto([caminho_audio])):
+                return self._transcrever_unico(caminho_audio)
+        return self._transcrever_unico(caminho_audio)
+
+    def _transcrever_unico(self, caminho_audio):
+        if self.cache_transcricoes is not None:
+            chave = self._calcular_chave_cache(caminho_audio)
+            armazem = self.cache_transcricoes.obter(chave[1]) if chave else None
+            if armazem is not None:
+                return self._entregar_do_cache(armazem, caminho_audio, 1, 1)
+        if not self._separar_retomados([caminho_audio], 1, 0):
+            return 'sucesso'
+        if self.opcoes.num_processos > 1:
+            status = self._transcrever_em_faixas(caminho_audio, 1, 1)
+        else:
+            with self._usar_modelo() as modelo:
+                status = self.transcrever_arquivo(modelo, caminho_audio, 1, 1)
+        self._remover_diarios_concluidos()
+        return status
+
+    def transcrever_arquivo(self, modelo, caminho_audio, indice, total, preparado=None, fila_saida=None):
+        """Transcreve um arquivo e retorna o status ('sucesso', 'erro', 'cancelado', 'vazio').
+
+        No lote, `preparado` traz (duração, segmentos) ou a exceção já obtidos pelo estágio de
+        decodificação, e `fila_saida` delega a gravação ao estágio de escrita. Os segmentos
+        partem do último checkpoint do diário do arquivo (início do áudio fora do modo retomar).
+        """
+        opcoes = self.opcoes
+        arquivo_nome = os.path.basename(caminho_audio)
+        segment_duration = opcoes.segmento_duracao
+        armazem = None
+        arquivo_inicio = time.time()
+        status = 'vazio'
+        diario = self._obter_diario(caminho_audio)
+        escritor = None
+
+        try:
+            # Informações do arquivo
+            tamanho_mb = os.path.getsize(caminho_audio) / (1024 * 1024)
+            self._emitir('arquivo_inicio', caminho=caminho_audio, indice=indice, total=total, tamanho_mb=tamanho_mb)
+
+            if preparado is None:
+                preparado = preparar_segmentos(caminho_audio, segment_duration, opcoes.decodificacao_streaming,
+                                               diario.retomar_em if diario else 0.0, opcoes.vad,
+                                               cache_audio=self.cache_audio)
+            elif isinstance(preparado, Exception):
+                raise preparado
+            if diario:
+                if diario.trechos:
+                    self._detalhe(f"⏯️ {arquivo_nome}: retomando de {formatar_tempo(diario.retomar_em)} "
+                                  f"({len(diario.trechos)} segmento(s) já transcrito(s))")
+                diario.iniciar()
+            duration, segmentos = preparado
+            idioma, segmentos = self._fixar_idioma(modelo, caminho_audio, segmentos, diario)
+            escritor = self._abrir_escritor(caminho_audio, diario)
+            # Com VAD, a quantidade de segmentos depende das pausas e só é conhecida ao final
+            segments_count = None
+            if duration and not opcoes.vad:
+                segments_count = max(1, int(-(-duration // segment_duration)))
+            self._emitir('arquivo_info', caminho=caminho_audio, duracao=duration, segmentos=segments_count)
+            retomar_em = diario.retomar_em if diario else 0.0
+            voz = []
+
+            def ao_segmento(i, start_time_sec, end_time_sec):
+                voz.append(end_time_sec - start_time_sec)
+                progresso, eta = None, None
+                if duration:
+                    # Progresso pela posição no áudio, válido também quando o VAD pula trechos
+                    progresso = min(100, end_time_sec / duration * 100)
+                    # Calcular ETA
+                    elapsed = time.time() - arquivo_inicio
+                    if i > 0 and end_time_sec > retomar_em:
+                        eta = elapsed / (end_time_sec - retomar_em) * max(0.0, duration - end_time_sec)
+                self._emitir('segmento', caminho=caminho_audio, indice_segmento=i, segmentos=segments_count,
+                             inicio=start_time_sec, fim=end_time_sec, progresso=progresso, eta=eta)
+
+            armazem = transcrever_segmentos(
+                modelo, segmentos, idioma, opcoes.temperatura, self.cancel_event, self.liberado_event,
+                ao_segmento, diario, opcoes.tamanho_lote, escritor
+            )
+            if armazem is None:
+                status = 'cancelado'
+                self._emitir('arquivo_fim', caminho=caminho_audio, status=status, saida=None,
+                             tempo=time.time() - arquivo_inicio, erro=None)
+                return status
+            if duration:
+                self._registrar_audio(caminho_audio, duration - retomar_em,
+                                      duration - retomar_em - sum(voz) if opcoes.vad else 0.0)
+
+        except FileNotFoundError:
+            logging.error(f"Arquivo não encontrado: {caminho_audio}")
+            status = 'erro'
+            with self._lock_conclusao:
+                self.estatisticas['erros'] += 1
+                self._emitir('arquivo_fim', caminho=caminho_audio, status=status, saida=None,
+                             tempo=time.time() - arquivo_inicio, erro=f"Arquivo não encontrado: {arquivo_nome}")
+        except Exception as e:
+            logging.error(f"Erro na transcrição de '{caminho_audio}': {e}", exc_info=True)
+            status = 'erro'
+            with self._lock_conclusao:
+                self.estatisticas['erros'] += 1
+                self._emitir('arquivo_fim', caminho=caminho_audio, status=status, saida=None,
+                             tempo=time.time() - arquivo_inicio, erro=str(e))
+        finally:
+            # Fechar antes de entregar à escrita, que registra a conclusão no mesmo diário
+            if diario:
+                diario.fechar()
+            if not self.cancel_event.is_set() and status != 'erro' and armazem is not None and not armazem.vazio:
+                tempo_arquivo = time.time() - arquivo_inicio
+                saida = (armazem, caminho_audio, indice, total, tempo_arquivo, escritor)
+                if fila_saida is not None:
+                    fila_saida.put(saida)
+                else:
+                    status = self._finalizar_arquivo(*saida)
+            else:
+                if not self.cancel_event.is_set() and status != 'erro':
+                    self._emitir('arquivo_fim', caminho=caminho_audio, status='vazio', saida=None,
+                                 tempo=time.time() - arquivo_inicio, erro=None)
+                self._abandonar_escritor(escritor)
+
+            self.estatisticas['arquivos_processados'] += 1
+
+        return status
+
+    def _finalizar_arquivo(self, armazem, caminho_audio, indice, total, tempo_arquivo, escritor=None,
+                           do_cache=False, paralelos=1, tempo_efetivo=None):
+        """Grava a transcrição (ou reaproveita a saída já gravada) e contabiliza o arquivo como concluído.
+
+        Com um `escritor`, a transcrição já está no arquivo parcial e só falta publicá-la; os
+        segmentos vão para um .segmentos.npz ao lado dela, de onde outros formatos são gerados.
+        `paralelos` é o número de arquivos transcritos ao mesmo tempo que este, para o histórico;
+        `tempo_efetivo`, se informado, substitui essa divisão (veja _registrar_desempenho).
+        """
+        with INSTRUMENTACAO.medir('gravacao', arquivo=os.path.basename(caminho_audio)):
+            caminho_saida = self._gravar_arquivo(armazem, caminho_audio, tempo_arquivo, escritor, do_cache)
+        if caminho_saida is None:
+            return 'erro'
+
+        with self._lock_conclusao:
+            segundos_audio = self._audio_por_arquivo.pop(caminho_audio, 0.0)
+            if not do_cache:
+                INSTRUMENTACAO.registrar_arquivo(caminho_audio, self.opcoes.identificador_modelo, segundos_audio,
+                                                 tempo_arquivo)
+                self._registrar_desempenho(caminho_audio, segundos_audio, tempo_arquivo, paralelos, tempo_efetivo)
+            self._audio_concluido += self._duracoes.estimada(caminho_audio)
+            self.estatisticas['sucessos'] += 1
+            self.estatisticas['tempo_total_processamento'] += tempo_arquivo
+            self._emitir('arquivo_fim', caminho=caminho_audio, status='sucesso', saida=caminho_saida,
+                         tempo=tempo_arquivo, erro=None)
+            self._atualizar_progresso(indice, total)
+        return 'sucesso'
+
+    def _gravar_arquivo(self, armazem, caminho_audio, tempo_arquivo, escritor, do_cache):
+        """Publica ou reaproveita a saída, registra diário e cache; retorna o caminho gravado ou None"""
+        cache = self.cache_transcricoes
+        hash_audio, chave = self._chaves_cache.get(caminho_audio, (None, None))
+        try:
+            caminho_saida = cache.obter_saida(chave, caminho_audio, self.opcoes) if cache and chave else None
+            if caminho_saida is not None:
+                self._abandonar_escritor(escritor)
+            else:
+                if escritor is not None:
+                    caminho_saida = escritor.concluir()
+                    logging.info(f"Transcrição salva no arquivo: {caminho_saida}")
+                    gravar_segmentos(armazem, escritor)
+                else:
+                    idioma = self._idioma_conhecido(caminho_audio) if self.opcoes.idioma_whisper is None else None
+                    caminho_saida = salvar_transcricao(armazem, caminho_audio, self.opcoes, idioma)
+                if cache and chave:
+                    cache.registrar_saida(chave, caminho_audio, self.opcoes, caminho_saida)
+        except Exception as e:
+            logging.error(f"Erro ao salvar transcrição para '{caminho_audio}': {e}")
+            with self._lock_conclusao:
+                self.estatisticas['erros'] += 1
+                self._emitir('arquivo_fim', caminho=caminho_audio, status='erro', saida=None, tempo=tempo_arquivo,
+                             erro=f"Não foi possível salvar a transcrição: {e}")
+            return None
+
+        diario = self._diarios.get(caminho_audio)
+        if diario and not do_cache:
+            try:
+                diario.concluir(caminho_saida)
+            except Exception as e:
+                logging.error(f"Erro ao registrar a conclusão de '{caminho_audio}' no diário: {e}")
+
+        if cache and chave and not do_cache:
+            try:
+                cache.guardar(chave, hash_audio, armazem, self.opcoes.incluir_timestamps)
+            except Exception as e:
+                logging.error(f"Erro ao guardar a transcrição de '{caminho_audio}' no cache: {e}")
+            if chave in self._armazens_repetidos:
+                self._armazens_repetidos[chave] = armazem
+        return caminho_saida
+
+    def _abrir_escritor(self, caminho_audio, diario=None):
+        """Cria o arquivo de saída parcial, já com os trechos dos checkpoints do diário"""
+        escritor = criar_escritor(caminho_audio, self.opcoes)
+        idioma = self._idioma_conhecido(caminho_audio, diario) if self.opcoes.idioma_whisper is None else None
+        escritor.iniciar(armazem_do_diario(diario), descrever_idioma(self.opcoes, idioma))
+        return escritor
+
+    def _abandonar_escritor(self, escritor):
+        """Encerra um parcial que não será publicado: cancelado, fica para leitura; senão, é removido"""
+        if escritor is None:
+            return
+        try:
+            if self.cancel_event.is_set():
+                escritor.fechar()
+            else:
+                escritor.descartar()
+        except OSError as e:
+            logging.warning(f"Não foi possível encerrar o arquivo parcial '{escritor.caminho_parcial}': {e}")
+
+    def _registrar_audio(self, caminho_audio, segundos_audio, segundos_silencio):
+        self._audio_por_arquivo[caminho_audio] = segundos_audio  # Para o fator de tempo real, ao finalizar
+        self.estatisticas['audio_processado'] += segundos_audio
+        self.estatisticas['silencio_descartado'] += max(0.0, segundos_silencio)
+        if segundos_silencio >= 1:
+            percentual = segundos_silencio / segundos_audio * 100 if segundos_audio else 0.0
+            self._detalhe(f"🔇 {os.path.basename(caminho_audio)}: VAD descartou {formatar_tempo(segundos_silencio)} "
+                          f"de silêncio ({percentual:.0f}% do áudio)")
+
+    def _atualizar_progresso(self, indice, total):
+        """Percentual e ETA medidos em segundos de áudio, não em bytes nem em número de arquivos.
+
+        Durante uma varredura, `total` passa a ser o número de arquivos encontrados até agora e
+        as durações ainda não consultadas entram pela média das conhecidas.
+        """
+        elapsed_time = time.time() - self.start_time
+        total = max(total, len(self._duracoes))
+        audio_total = max(self._duracoes.total_estimado(), self._audio_concluido)
+        progresso_percentual = self._audio_concluido / audio_total * 100 if audio_total > 0 else 0
+
+        # ETA para processamento em lote
+        eta_restante = None
+        if self._audio_concluido > 0 and total > 1:
+            eta_restante = elapsed_time / self._audio_concluido * (audio_total - self._audio_concluido)
+
+        self._emitir('progresso_lote', indice=indice, total=total, percentual=progresso_percentual,
+                     decorrido=elapsed_time, eta=eta_restante)
+
+    # --- Lote ---
+    def processar_lote(self, arquivos_audio):
+        """Transcreve uma lista de arquivos e retorna o resumo emitido em 'lote_fim'"""
+        self._reiniciar_controle(arquivos_audio)
+        inicio_lote = time.time()
+        self.metricas_pipeline = []
+        multiprocesso = self.opcoes.num_processos > 1
+        self._emitir('lote_inicio', total=len(arquivos_audio),
+                     processos=self.opcoes.num_processos if multiprocesso else 1)
+        try:
+            self._processar_grupo(arquivos_audio)
+            self._remover_diarios_concluidos()
+            return self._resumir_lote(inicio_lote)
+        finally:
+            self._duracoes.encerrar()
+
+    def processar_pasta(self, pasta, incluir_subpastas=False):
+        """Transcreve os áudios de uma pasta enquanto ela ainda está sendo varrida.
+
+        A varredura roda em uma thread e os arquivos seguem em ondas: a primeira parte assim que
+        algo é encontrado, e cada onda seguinte leva o que apareceu enquanto a anterior era
+        transcrita. Com vários processos, espera-se a varredura inteira, pois a distribuição
+        do mais longo para o mais curto precisa do lote completo. Retorna o resumo de 'lote_fim'.
+        """
+        self._reiniciar_controle()
+        inicio_lote = time.time()
+        self.metricas_pipeline = []
+        multiprocesso = self.opcoes.num_processos > 1
+        varredura = VarreduraAudio(pasta, EXTENSOES_AUDIO, incluir_subpastas,
+                                   ao_encontrar=lambda caminho: self._duracoes.sondar([caminho])).iniciar()
+        self._emitir('lote_inicio', total=None, processos=self.opcoes.num_processos if multiprocesso else 1)
+        try:
+            anteriores = 0
+            while not self.cancel_event.is_set():
+                onda = varredura.proximos(anteriores, espera=None if multiprocesso else ESPERA_ONDA)
+                if varredura.erro is not None:
+                    raise varredura.erro
+                if not onda:
+                    break
+                self._processar_grupo(onda, anteriores)
+                anteriores += len(onda)
+            self._remover_diarios_concluidos()
+            return self._resumir_lote(inicio_lote)
+        finally:
+            varredura.cancelar()
+            self._duracoes.encerrar()
+
+    def _processar_grupo(self, arquivos_audio, anteriores=0):
+        """Cache, retomada e transcrição de um grupo de arquivos (o lote inteiro ou uma onda da varredura)"""
+        if self.opcoes.modelo == MODELO_AUTO:
+            return self._processar_grupo_auto(arquivos_audio, anteriores)
+        total = anteriores + len(arquivos_audio)
+        multiprocesso = self.opcoes.num_processos > 1
+
+        # Acertos de cache são entregues antes de qualquer carregamento de modelo
+        pendentes, repetidos = self._separar_cache(arquivos_audio, anteriores)
+        ja_concluidos = total - len(pendentes) - len(repetidos)
+        pendentes = self._separar_retomados(pendentes, total, ja_concluidos)
+        ja_concluidos = total - len(pendentes) - len(repetidos)
+        if pendentes and not self.cancel_event.is_set():
+            if multiprocesso and len(pendentes) > 1:
+                self._processar_lote_multiprocesso(pendentes, total, ja_concluidos)
+            elif multiprocesso:
+                # Um único arquivo pendente: os processos dividem o próprio arquivo
+                self._transcrever_em_faixas(pendentes[0], ja_concluidos + 1, total)
+            else:
+                with self._usar_modelo() as modelo:
+                    if self.opcoes.agrupar_por_idioma and self.opcoes.idioma_whisper is None and len(pendentes) > 1:
+                        pendentes = self._agrupar_por_idioma(modelo, pendentes)
+                    self._processar_lote_pipeline(modelo, pendentes, total, ja_concluidos)
+        self._entregar_repetidos(repetidos, total)
+
+    def _resumir_lote(self, inicio_lote):
+        tempo_total = time.time() - inicio_lote
+        antes = self._estatisticas_antes_do_lote
+        audio_lote = self.estatisticas['audio_processado'] - antes['audio_processado']
+        resumo = {
+            'sucessos': self.estatisticas['sucessos'] - antes['sucessos'],
+            'erros': self.estatisticas['erros'] - antes['erros'],
+            'tempo_total': tempo_total,
+            'cancelado': self.cancel_event.is_set(),
+            'audio_processado': audio_lote,
+            'silencio_descartado': self.estatisticas['silencio_descartado'] - antes['silencio_descartado'],
+            'vazao': audio_lote / tempo_total if tempo_total > 0 else 0.0,  # Segundos de áudio por segundo
+            'metricas': [metricas.resumo() for metricas in self.metricas_pipeline],
+            'falhas': list(self._falhas_lote)
+        }
+        if audio_lote > 0:
+            self._detalhe(f"⚡ Vazão do lote: {resumo['vazao']:.1f}x tempo real "
+                          f"(lote de inferência: {self.opcoes.tamanho_lote})")
+        for linha in resumo['metricas']:
+            logging.info(f"Pipeline de lote - {linha}")
+        self._emitir('lote_fim', **resumo)
+        return resumo
+
+    def _processar_lote_pipeline(self, modelo, arquivos_audio, total, ja_concluidos=0):
+        """Pipeline em três estágios: decodificação (N+1) → inferência (N) → escrita (N-1).
+
+        As filas são limitadas, então no máximo PROFUNDIDADE_PREFETCH arquivos ficam
+        decodificados à frente da inferência e PROFUNDIDADE_ESCRITA aguardam gravação.
+        Com `tamanho_lote` > 1, a inferência junta janelas de vários arquivos no mesmo lote.
+        A escrita tem ESCRITORES_PARALELOS threads, então um DOCX grande ou um disco lento
+        não seguram a inferência; uma falha de gravação vira status 'erro' e segue no resumo.
+        """
+        self._detalhe(f"🚀 Iniciando processamento em lote de {len(arquivos_audio)} arquivo(s)")
+
+        segment_duration = self.opcoes.segmento_duracao
+        streaming = self.opcoes.decodificacao_streaming
+        fila_decodificados = queue.Queue()
+        fila_saida = queue.Queue(maxsize=self.PROFUNDIDADE_ESCRITA)
+        # O semáforo reserva a vaga antes de decodificar, limitando os buffers de áudio em memória
+        # aos arquivos em inferência (até um por linha do lote) mais os PROFUNDIDADE_PREFETCH pré-carregados
+        em_inferencia = max(1, self.opcoes.tamanho_lote)
+        vagas_decodificacao = threading.Semaphore(self.PROFUNDIDADE_PREFETCH + em_inferencia)
+
+        metricas_decodificacao = MetricasEstagio("Decodificação")
+        metricas_inferencia = MetricasEstagio("Inferência")
+        metricas_escrita = MetricasEstagio("Escrita")
+        self.metricas_pipeline = [metricas_decodificacao, metricas_inferencia, metricas_escrita]
+
+        def estagio_decodificacao():
+            for caminho_audio in arquivos_audio:
+                inicio_espera = time.perf_counter()
+                while not vagas_decodificacao.acquire(timeout=0.2):
+                    if self.cancel_event.is_set():
+                        break
+                metricas_decodificacao.tempo_ocioso += time.perf_counter() - inicio_espera
+                if self.cancel_event.is_set():
+                    break
+
+                inicio = time.perf_counter()
+                try:
+                    diario = self._obter_diario(caminho_audio)
+                    preparado = preparar_segmentos(caminho_audio, segment_duration, streaming,
+                                                   diario.retomar_em if diario else 0.0, self.opcoes.vad,
+                                                   cache_audio=self.cache_audio)
+                except Exception as e:
+                    preparado = e
+                metricas_decodificacao.tempo_ativo += time.perf_counter() - inicio
+                metricas_decodificacao.itens += 1
+
+                fila_decodificados.put((caminho_audio, preparado))
+                metricas_decodificacao.registrar_profundidade(fila_decodificados)
+            fila_decodificados.put(None)
+
+        lock_metricas_escrita = threading.Lock()
+
+        def estagio_escrita():
+            while True:
+                inicio_espera = time.perf_counter()
+                item = fila_saida.get()
+                ocioso = time.perf_counter() - inicio_espera
+                if item is None:
+                    break
+                with lock_metricas_escrita:
+                    metricas_escrita.tempo_ocioso += ocioso
+                    metricas_escrita.registrar_profundidade(fila_saida)
+
+                inicio = time.perf_counter()
+                try:
+                    self._finalizar_arquivo(*item)
+                except Exception as e:
+                    # Uma falha inesperada não pode derrubar o escritor: os seguintes ficariam sem gravação
+                    logging.error(f"Erro ao finalizar '{item[1]}': {e}", exc_info=True)
+                    with self._lock_conclusao:
+                        self.estatisticas['erros'] += 1
+                        self._emitir('arquivo_fim', caminho=item[1], status='erro', saida=None, tempo=item[4],
+                                     erro=str(e))
+                with lock_metricas_escrita:
+                    metricas_escrita.tempo_ativo += time.perf_counter() - inicio
+                    metricas_escrita.itens += 1
+
+        thread_decodificacao = threading.Thread(target=estagio_decodificacao, daemon=True)
+        threads_escrita = [threading.Thread(target=estagio_escrita, name=f"escrita-{numero}", daemon=True)
+                           for numero in range(self.ESCRITORES_PARALELOS)]
+        thread_decodificacao.start()
+        for thread_escrita in threads_escrita:
+            thread_escrita.start()
+
+        if self.opcoes.tamanho_lote > 1:
+            self._inferir_entre_arquivos(modelo, fila_decodificados, vagas_decodificacao, fila_saida,
+                                         metricas_inferencia, total, ja_concluidos)
+        else:
+            self._inferir_por_arquivo(modelo, fila_decodificados, vagas_decodificacao, fila_saida,
+                                      metricas_inferencia, total, ja_concluidos)
+
+        for _ in threads_escrita:
+            fila_saida.put(None)
+        for thread_escrita in threads_escrita:
+            thread_escrita.join()
+        thread_decodificacao.join()
+
+    def _inferir_por_arquivo(self, modelo, fila_decodificados, vagas_decodificacao, fila_saida, metricas_inferencia,
+                             total, index):
+        """Estágio de inferência sequencial: um arquivo por vez, um segmento por chamada"""
+        while True:
+            inicio_espera = time.perf_counter()
+            item = fila_decodificados.get()
+            metricas_inferencia.tempo_ocioso += time.perf_counter() - inicio_espera
+            if item is None:
+                break
+            metricas_inferencia.registrar_profundidade(fila_decodificados)
+            caminho_audio, preparado = item
+
+            if self.cancel_event.is_set():
+                vagas_decodificacao.release()
+                continue
+
+            self.liberado_event.wait()
+
+            index += 1
+            inicio = time.perf_counter()
+            self.transcrever_arquivo(modelo, caminho_audio, index, total, preparado=preparado,
+                                     fila_saida=fila_saida)
+            preparado = item = None  # Libera o buffer decodificado antes de abrir vaga para o próximo
+            vagas_decodificacao.release()
+            metricas_inferencia.tempo_ativo += time.perf_counter() - inicio
+            metricas_inferencia.itens += 1
+
+    def _inferir_entre_arquivos(self, modelo, fila_decodificados, vagas_decodificacao, fila_saida,
+                                metricas_inferencia, total, indice):
+        """Estágio de inferência que junta janelas de vários arquivos no mesmo lote.
+
+        Cada arquivo fica em andamento até a última de suas janelas ser decodificada; então o
+        texto segue para a escrita e a vaga de decodificação do arquivo é liberada. Como o tempo
+        de parede de um arquivo inclui a decodificação das janelas dos outros, o histórico de
+        desempenho recebe o tempo efetivo: o da preparação e da segmentação do próprio arquivo e,
+        de cada chamada de inferência, a fração proporcional ao áudio dele no lote.
+        """
+        opcoes = self.opcoes
+        tamanho_lote = opcoes.tamanho_lote
+        lote = []  # (arquivo, inicio, fim, janela)
+        em_andamento = []
+
+        def abrir(caminho_audio, preparado):
+            nonlocal indice
+            indice += 1
+            inicio_abertura = time.perf_counter()
+            diario = self._obter_diario(caminho_audio)
+            arquivo = {'caminho': caminho_audio, 'indice': indice, 'inicio': time.time(), 'diario': diario,
+                       'duracao': None, 'segmentos': None, 'armazem': None, 'pendentes': 0, 'esgotado': False,
+                       'voz': 0.0, 'contador': 0, 'retomar_em': diario.retomar_em if diario else 0.0,
+                       'idioma': None, 'escritor': None, 'erro': None, 'tempo_efetivo': 0.0}
+            em_andamento.append(arquivo)
+            try:
+                tamanho_mb = os.path.getsize(caminho_audio) / (1024 * 1024)
+                self._emitir('arquivo_inicio', caminho=caminho_audio, indice=indice, total=total,
+                             tamanho_mb=tamanho_mb)
+                if isinstance(preparado, Exception):
+                    raise preparado
+                arquivo['duracao'], arquivo['segmentos'] = preparado
+                if diario:
+                    if diario.trechos:
+                        self._detalhe(f"⏯️ {os.path.basename(caminho_audio)}: retomando de "
+                                      f"{formatar_tempo(diario.retomar_em)} "
+                                      f"({len(diario.trechos)} segmento(s) já transcrito(s))")
+                    arquivo['contador'] = len(diario.trechos)
+                    diario.iniciar()
+                arquivo['armazem'] = armazem_do_diario(diario)
+                arquivo['idioma'], arquivo['segmentos'] = self._fixar_idioma(modelo, caminho_audio,
+                                                                             arquivo['segmentos'], diario)
+                arquivo['escritor'] = self._abrir_escritor(caminho_audio, diario)
+                self._emitir('arquivo_info', caminho=caminho_audio, duracao=arquivo['duracao'], segmentos=None)
+            except FileNotFoundError:
+                logging.error(f"Arquivo não encontrado: {caminho_audio}")
+                arquivo['erro'] = f"Arquivo não encontrado: {os.path.basename(caminho_audio)}"
+            except Exception as e:
+                logging.error(f"Erro na transcrição de '{caminho_audio}': {e}", exc_info=True)
+                arquivo['erro'] = str(e)
+            arquivo['tempo_efetivo'] += time.perf_counter() - inicio_abertura
+            return arquivo
+
+        def concluir(arquivo):
+            if arquivo not in em_andamento:
+                return
+            em_andamento.remove(arquivo)
+            caminho_audio = arquivo['caminho']
+            tempo_arquivo = time.time() - arquivo['inicio']
+            if arquivo['diario']:
+                arquivo['diario'].fechar()
+
+            if arquivo['erro'] is not None:
+                with self._lock_conclusao:
+                    self.estatisticas['erros'] += 1
+                    self._emitir('arquivo_fim', caminho=caminho_audio, status='erro', saida=None,
+                                 tempo=tempo_arquivo, erro=arquivo['erro'])
+            elif self.cancel_event.is_set():
+                self._emitir('arquivo_fim', caminho=caminho_audio, status='cancelado', saida=None,
+                             tempo=tempo_arquivo, erro=None)
+            else:
+                duracao = arquivo['duracao']
+                if duracao:
+                    audio = duracao - arquivo['retomar_em']
+                    self._registrar_audio(caminho_audio, audio, audio - arquivo['voz'] if opcoes.vad else 0.0)
+                if arquivo['armazem'] is not None and not arquivo['armazem'].vazio:
+                    fila_saida.put((arquivo['armazem'], caminho_audio, arquivo['indice'], total, tempo_arquivo,
+                                    arquivo['escritor'], False, 1, arquivo['tempo_efetivo']))
+                    arquivo['escritor'] = None
+                else:
+                    self._emitir('arquivo_fim', caminho=caminho_audio, status='vazio', saida=None,
+                                 tempo=tempo_arquivo, erro=None)
+            self._abandonar_escritor(arquivo['escritor'])
+
+            arquivo['segmentos'] = arquivo['armazem'] = None  # Libera o buffer decodificado
+            self.estatisticas['arquivos_processados'] += 1
+            metricas_inferencia.itens += 1
+            vagas_decodificacao.release()
+
+        def descarregar(quantidade):
+            """Decodifica as primeiras `quantidade` janelas do lote; retorna os arquivos que falharam"""
+            self.liberado_event.wait()
+            itens = lote[:quantidade]
+            del lote[:quantidade]
+            afetados = []
+            for arquivo, _, _, _ in itens:
+                if arquivo not in afetados:
+                    afetados.append(arquivo)
+
+            # Uma chamada por idioma: cada arquivo é decodificado no idioma fixado para ele
+            por_idioma = {}
+            for posicao, (arquivo, _, _, _) in enumerate(itens):
+                por_idioma.setdefault(arquivo['idioma'], []).append(posicao)
+            resultados = [None] * len(itens)
+            try:
+                for idioma, posicoes in por_idioma.items():
+                    inicio_chamada = time.perf_counter()
+                    decodificados = modelo.decodificar_janelas([itens[posicao][3] for posicao in posicoes], idioma,
+                                                               opcoes.temperatura)
+                    tempo_chamada = time.perf_counter() - inicio_chamada
+                    audio_chamada = sum(itens[posicao][2] - itens[posicao][1] for posicao in posicoes)
+                    for posicao, resultado in zip(posicoes, decodificados):
+                        resultados[posicao] = resultado
+                        arquivo, inicio_janela, fim_janela, _ = itens[posicao]
+                        parcela = ((fim_janela - inicio_janela) / audio_chamada if audio_chamada > 0
+                                   else 1 / len(posicoes))
+                        arquivo['tempo_efetivo'] += tempo_chamada * parcela
+            except Exception as e:
+                logging.error(f"Erro na inferência em lote: {e}", exc_info=True)
+                for arquivo in afetados:
+                    arquivo['erro'] = str(e)
+                    lote[:] = [item for item in lote if item[0] is not arquivo]
+                    concluir(arquivo)
+                return afetados
+
+            for (arquivo, inicio_seg, fim_seg, _), resultado in zip(itens, resultados):
+                texto, avg_logprob, no_speech_prob, tokens = resultado
+                _registrar_trecho(arquivo['armazem'], arquivo['diario'], arquivo['escritor'], inicio_seg, fim_seg,
+                                  texto, [(inicio_seg, fim_seg, texto, avg_logprob, no_speech_prob, tokens)])
+                arquivo['voz'] += fim_seg - inicio_seg
+                arquivo['pendentes'] -= 1
+
+                duracao = arquivo['duracao']
+                progresso, eta = None, None
+                if duracao:
+                    progresso = min(100, fim_seg / duracao * 100)
+                    decorrido = time.time() - arquivo['inicio']
+                    if fim_seg > arquivo['retomar_em']:
+                        eta = decorrido / (fim_seg - arquivo['retomar_em']) * max(0.0, duracao - fim_seg)
+                self._emitir('segmento', caminho=arquivo['caminho'], indice_segmento=arquivo['contador'],
+                             segmentos=None, inicio=inicio_seg, fim=fim_seg, progresso=progresso, eta=eta)
+                arquivo['contador'] += 1
+
+            for arquivo in afetados:
+                if arquivo['esgotado'] and arquivo['pendentes'] == 0:
+                    concluir(arquivo)
+            return []
+
+        atual = None
+        fim_da_fila = False
+        while not self.cancel_event.is_set():
+            if atual is None:
+                if fim_da_fila:
+                    break
+                inicio_espera = time.perf_counter()
+                item = fila_decodificados.get()
+                metricas_inferencia.tempo_ocioso += time.perf_counter() - inicio_espera
+                if item is None:
+                    fim_da_fila = True
+                    continue
+                metricas_inferencia.registrar_profundidade(fila_decodificados)
+                atual = abrir(*item)
+                item = None
+                if atual['erro'] is not None:
+                    concluir(atual)
+                    atual = None
+                continue
+
+            inicio = time.perf_counter()
+            try:
+                inicio_seg, segmento = next(atual['segmentos'])
+            except StopIteration:
+                atual['esgotado'] = True
+                if atual['pendentes'] == 0:
+                    concluir(atual)
+                atual = None
+                continue
+            except Exception as e:
+                # Falha na decodificação em streaming: as janelas do arquivo saem do lote
+                logging.error(f"Erro na transcrição de '{atual['caminho']}': {e}", exc_info=True)
+                atual['erro'] = str(e)
+                lote[:] = [item for item in lote if item[0] is not atual]
+                concluir(atual)
+                atual = None
+                continue
+
+            for inicio_janela, fim_janela, janela in dividir_em_janelas(inicio_seg, segmento):
+                lote.append((atual, inicio_janela, fim_janela, janela))
+                atual['pendentes'] += 1
+            atual['tempo_efetivo'] += time.perf_counter() - inicio
+            while len(lote) >= tamanho_lote:
+                if atual in descarregar(tamanho_lote):
+                    atual = None
+                    break
+            metricas_inferencia.tempo_ativo += time.perf_counter() - inicio
+
+        if lote and not self.cancel_event.is_set():
+            inicio = time.perf_counter()
+            descarregar(len(lote))
+            metricas_inferencia.tempo_ativo += time.perf_counter() - inicio
+
+        # Cancelamento: arquivos em andamento ficam com os checkpoints já gravados
+        for arquivo in list(em_andamento):
+            concluir(arquivo)
+        while not fim_da_fila:
+            if fila_decodificados.get() is None:
+                break
+            vagas_decodificacao.release()
+
+    @contextmanager
+    def _pool_processos(self, num_processos, threads_processo, tratar_evento):
+        """Pool com um modelo carregado por processo e uma thread que repassa as mensagens deles.
+
+        `tratar_evento` recebe, na thread do motor, cada tupla que os processos põem na fila de eventos.
+        """
+        fila_eventos = CONTEXTO_MP.Queue()
+
+        def consumir_eventos():
+            while True:
+                evento = fila_eventos.get()
+                if evento is None:
+                    break
+                tratar_evento(evento)
+
+        thread_eventos = threading.Thread(target=consumir_eventos, daemon=True)
+        thread_eventos.start()
+
+        pool = CONTEXTO_MP.Pool(num_processos, initializer=_inicializar_worker,
+                                initargs=(self.opcoes.identificador_modelo, threads_processo, self.cancel_event,
+                                          self.liberado_event, fila_eventos))
+        try:
+            yield pool
+        finally:
+            if self.cancel_event.is_set():
+                pool.terminate()
+            else:
+                pool.close()
+            pool.join()
+            fila_eventos.put(None)
+            thread_eventos.join()
+
+    def _processar_lote_multiprocesso(self, arquivos_audio, total, ja_concluidos=0):
+        """Distribui o lote entre N processos, cada um com seu próprio modelo carregado.
+
+        Os arquivos são ordenados do mais longo para o mais curto (LPT) e entregues um a um ao
+        primeiro processo livre, o que minimiza o tempo até o último processo terminar.
+        """
+        num_processos = max(1, min(self.opcoes.num_processos, len(arquivos_audio)))
+        threads_processo = max(1, (os.cpu_count() or 1) // num_processos)
+        self._detalhe(f"🚀 Iniciando lote de {len(arquivos_audio)} arquivo(s) em {num_processos} processo(s) "
+                      f"com {threads_processo} thread(s) cada | Modelo: {self.opcoes.identificador_modelo}")
+
+        duracoes = [self._duracoes.aguardar(caminho_audio) for caminho_audio in arquivos_audio]
+        ordenados = sorted(zip(arquivos_audio, duracoes), key=lambda item: item[1] or 0, reverse=True)
+        tarefas, escritores = [], {}
+        for caminho_audio, _ in ordenados:
+            diario = self._obter_diario(caminho_audio)
+            escritores[caminho_audio] = criar_escritor(caminho_audio, self.opcoes)
+            tarefas.append((caminho_audio, self.opcoes, diario, self._idioma_conhecido(caminho_audio, diario),
+                            escritores[caminho_audio]))
+        indices = {caminho_audio: indice
+                   for indice, (caminho_audio, _) in enumerate(ordenados, start=ja_concluidos + 1)}
+
+        def tratar_evento(evento):
+            # Traduz as mensagens enviadas pelos processos em eventos do motor
+            tipo, caminho_audio = evento[0], evento[1]
+            if tipo == 'inicio':
+                tamanho_mb = os.path.getsize(caminho_audio) / (1024 * 1024)
+                self._emitir('arquivo_inicio', caminho=caminho_audio, indice=indices[caminho_audio],
+                             total=total, tamanho_mb=tamanho_mb)
+                self._detalhe(f"⚙️ {os.path.basename(caminho_audio)} no processo {evento[2]}")
+            elif tipo == 'segmento':
+                fim, duracao = evento[2], evento[3]
+                progresso = min(100, fim / duracao * 100) if duracao else None
+                self._emitir('segmento', caminho=caminho_audio, indice_segmento=None, segmentos=None,
+                             inicio=None, fim=fim, progresso=progresso, eta=None)
+
+        with self._pool_processos(num_processos, threads_processo, tratar_evento) as pool:
+            resultados = pool.imap_unordered(_transcrever_arquivo_worker, tarefas, chunksize=1)
+            for concluidos, resultado in enumerate(resultados, start=ja_concluidos + 1):
+                caminho_audio = resultado['caminho']
+                escritor = escritores.pop(caminho_audio)
+                escritor.cabecalho.update(resultado.get('cabecalho') or {})
+                INSTRUMENTACAO.incorporar(resultado.get('instrumentacao'))
+
+                if resultado['erro']:
+                    self.estatisticas['erros'] += 1
+                    self._emitir('arquivo_fim', caminho=caminho_audio, status='erro', saida=None,
+                                 tempo=resultado['tempo'], erro=resultado['erro'])
+                elif resultado['cancelado']:
+                    self._emitir('arquivo_fim', caminho=caminho_audio, status='cancelado', saida=None,
+                                 tempo=resultado['tempo'], erro=None)
+                elif resultado['armazem'] is not None and not resultado['armazem'].vazio:
+                    if resultado['idioma'] and caminho_audio not in self._idiomas:
+                        self._registrar_idioma(caminho_audio, *resultado['idioma'])
+                    self._registrar_audio(caminho_audio, resultado['audio'], resultado['silencio'])
+                    self._finalizar_arquivo(resultado['armazem'], caminho_audio, concluidos, total,
+                                            resultado['tempo'], escritor, paralelos=num_processos)
+                    escritor = None
+                else:
+                    self._emitir('arquivo_fim', caminho=caminho_audio, status='vazio', saida=None,
+                                 tempo=resultado['tempo'], erro=None)
+                self._abandonar_escritor(escritor)
+
+                self.estatisticas['arquivos_processados'] += 1
+
+    def _transcrever_em_faixas(self, caminho_audio, indice, total):
+        """Transcreve um único arquivo longo em faixas de tempo paralelas, uma por processo.
+
+        Os cortes caem em pausas e cada processo decodifica só a sua faixa (ffmpeg -ss/-t). Os
+        trechos voltam com o tempo relativo ao início do arquivo e são gravados no diário na
+        ordem das faixas, então o checkpoint continua contínuo e o modo retomar funciona igual.
+        Arquivos curtos demais para duas faixas seguem pelo caminho sequencial.
+        """
+        opcoes = self.opcoes
+        arquivo_nome = os.path.basename(caminho_audio)
+        diario = self._obter_diario(caminho_audio)
+        retomar_em = diario.retomar_em if diario else 0.0
+        duracao = self._duracoes.aguardar(caminho_audio) if os.path.exists(caminho_audio) else None
+        faixas = planejar_faixas(caminho_audio, retomar_em, duracao, opcoes.num_processos) if duracao else []
+        if len(faixas) < 2:
+            with self._usar_modelo() as modelo:
+                return self.transcrever_arquivo(modelo, caminho_audio, indice, total)
+
+        arquivo_inicio = time.time()
+        tamanho_mb = os.path.getsize(caminho_audio) / (1024 * 1024)
+        self._emitir('arquivo_inicio', caminho=caminho_audio, indice=indice, total=total, tamanho_mb=tamanho_mb)
+        self._emitir('arquivo_info', caminho=caminho_audio, duracao=duracao, segmentos=None)
+        threads_processo = max(1, (os.cpu_count() or 1) // len(faixas))
+        self._detalhe(f"🧩 {arquivo_nome}: {len(faixas)} faixas em paralelo "
+                      f"({', '.join(f'{formatar_tempo(a)}-{formatar_tempo(b)}' for a, b in faixas)}) "
+                      f"com {threads_processo} thread(s) por processo")
+        if diario:
+            if diario.trechos:
+                self._detalhe(f"⏯️ {arquivo_nome}: retomando de {formatar_tempo(retomar_em)} "
+                              f"({len(diario.trechos)} segmento(s) já transcrito(s))")
+            diario.iniciar()
+
+        armazem = armazem_do_diario(diario)
+        feito = [0.0] * len(faixas)
+        audio_total = duracao - retomar_em
+        voz, erro, cancelado, escritor = 0.0, None, False, None
+
+        def tratar_evento(evento):
+            # Progresso pela soma do áudio já transcrito em todas as faixas
+            _, _, indice_faixa, fim_seg = evento
+            feito[indice_faixa] = fim_seg - faixas[indice_faixa][0]
+            concluido = sum(feito)
+            eta = (time.time() - arquivo_inicio) / concluido * max(0.0, audio_total - concluido) if concluido else None
+            self._emitir('segmento', caminho=caminho_audio, indice_segmento=None, segmentos=None, inicio=None,
+                         fim=fim_seg, progresso=min(100, concluido / audio_total * 100), eta=eta)
+
+        try:
+            with self._pool_processos(len(faixas), threads_processo, tratar_evento) as pool:
+                idioma = opcoes.idioma_whisper
+                if idioma is None:
+                    # Um único idioma para todas as faixas, detectado no início do arquivo
+                    detectado = self._idioma_conhecido(caminho_audio, diario)
+                    if detectado is None:
+                        detectado = pool.apply(_sondar_idioma_worker, (caminho_audio, opcoes.segmento_duracao))
+                        if detectado:
+                            self._registrar_idioma(caminho_audio, *detectado)
+                    if detectado:
+                        idioma = detectado[0]
+                        if diario and diario.idioma is None:
+                            diario.registrar_idioma(*detectado)
+                escritor = self._abrir_escritor(caminho_audio, diario)
+
+                tarefas = [(caminho_audio, opcoes, i, inicio, fim, idioma) for i, (inicio, fim) in enumerate(faixas)]
+                recebidos, proxima = {}, 0
+                for resultado in pool.imap_unordered(_transcrever_faixa_worker, tarefas, chunksize=1):
+                    INSTRUMENTACAO.incorporar(resultado.get('instrumentacao'))
+                    if resultado['erro'] or resultado['cancelado']:
+                        erro, cancelado = resultado['erro'], resultado['cancelado']
+                        pool.terminate()  # Sem esta faixa, as outras não têm mais utilidade
+                        break
+                    recebidos[resultado['indice']] = resultado['armazem']
+                    # Costura em ordem: uma faixa só entra depois de todas as anteriores
+                    while proxima in recebidos:
+                        for inicio, fim, texto, segmentos in recebidos.pop(proxima).trechos():
+                            _registrar_trecho(armazem, diario, escritor, inicio, fim, texto, segmentos)
+                            voz += fim - inicio
+                        proxima += 1
+        except Exception as e:
+            logging.error(f"Erro na transcrição em faixas de '{caminho_audio}': {e}", exc_info=True)
+            erro = str(e)
+        finally:
+            if diario:
+                diario.fechar()
+        self.estatisticas['arquivos_processados'] += 1
+
+        tempo_arquivo = time.time() - arquivo_inicio
+        if erro or cancelado or self.cancel_event.is_set():
+            self._abandonar_escritor(escritor)
+        if erro:
+            self.estatisticas['erros'] += 1
+            self._emitir('arquivo_fim', caminho=caminho_audio, status='erro', saida=None, tempo=tempo_arquivo,
+                         erro=erro)
+            return 'erro'
+        if cancelado or self.cancel_event.is_set():
+            self._emitir('arquivo_fim', caminho=caminho_audio, status='cancelado', saida=None, tempo=tempo_arquivo,
+                         erro=None)
+            return 'cancelado'
+
+        self._registrar_audio(caminho_audio, audio_total, audio_total - voz if opcoes.vad else 0.0)
+        if armazem.vazio:
+            self._abandonar_escritor(escritor)
+            self._emitir('arquivo_fim', caminho=caminho_audio, status='vazio', saida=None, tempo=tempo_arquivo,
+                         erro=None)
+            return 'vazio'
+        return self._finalizar_arquivo(armazem, caminho_audio, indice, total, tempo_arquivo, escritor)
@@ -0,0 +1,67 @@
+"""Precisão de inferência dos modelos Whisper em CPU.
+
+Em "int8", as camadas lineares (que concentram quase todo o custo do encoder e do decoder)
+passam por quantização dinâmica do PyTorch: os pesos ficam em int8 e as ativações são
+quantizadas a cada chamada. Convoluções, embeddings e normalizações continuam em fp32. O
+modelo quantizado é gravado em disco na primeira carga, então as seguintes não repetem a
+carga em fp32 nem a quantização. A quantização dinâmica só existe em CPU: em "int8" o
+modelo é carregado na CPU mesmo com uma GPU disponível.
+"""
+import logging
+import os
+
+PRECISAO_PADRAO = "fp32"
+PRECISOES = (PRECISAO_PADRAO, "int8")
+PASTA_MODELOS_QUANTIZADOS = "modelos_quantizados"
+
+
+def caminho_quantizado(nome_modelo, precisao, pasta=PASTA_MODELOS_QUANTIZADOS):
+    import torch
+
+    # Módulos quantizados serializados não são garantidos entre versões do PyTorch
+    return os.path.join(pasta, f"{nome_modelo}-{precisao}-torch{torch.__version__}.pt")
+
+
+def quantizar_modelo(modelo):
+    """Quantização dinâmica int8 das camadas lineares de um modelo Whisper em CPU"""
+    import torch
+    from whisper.model import Linear as LinearWhisper
+
+    for modulo in modelo.modules():
+        if type(modulo) is LinearWhisper:
+            # A subclasse do Whisper só converte o peso para o dtype da entrada, sempre fp32 em CPU;
+            # quantize_dynamic só reconhece a classe exata nn.Linear
+            modulo.__class__ = torch.nn.Linear
+    return torch.quantization.quantize_dynamic(modelo.eval(), {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def carregar_modelo_whisper(nome_modelo, precisao=PRECISAO_PADRAO, pasta=PASTA_MODELOS_QUANTIZADOS):
+    """Carrega o modelo openai-whisper na `precisao`, reaproveitando a versão quantizada em disco"""
+    import whisper
+
+    if precisao == PRECISAO_PADRAO:
+        return whisper.load_model(nome_modelo)
+    if precisao not in PRECISOES:
+        raise ValueError(f"Precisão desconhecida: '{precisao}' (use {', '.join(PRECISOES)})")
+
+    import torch
+
+    caminho = caminho_quantizado(nome_modelo, precisao, pasta)
+    if os.path.exists(caminho):
+        try:
+            # Arquivo gravado por este programa; contém módulos, não só tensores
+            return torch.load(caminho, map_location="cpu", weights_only=False)
+        except Exception as e:
+            logging.warning(f"Modelo quantizado ilegível em '{caminho}', quantizando de novo: {e}")
+
+    logging.info(f"Quantizando o modelo '{nome_modelo}' para {precisao} (só na primeira carga)...")
+    modelo = quantizar_modelo(whisper.load_model(nome_modelo, device="cpu"))
+    try:
+        os.makedirs(pasta, exist_ok=True)
+        temporario = caminho + ".tmp"
+        torch.save(modelo, temporario)
+        os.replace(temporario, caminho)
+        logging.info(f"Modelo quantizado salvo em '{caminho}'")
+    except OSError as e:
+        logging.warning(f"Não foi possível salvar o modelo quantizado em '{caminho}': {e}")
+    return modelo
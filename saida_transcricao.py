@@ -0,0 +1,227 @@
+"""Gravação incremental das transcrições.
+
+Cada formato tem um escritor que acrescenta os segmentos a um arquivo parcial
+(`<nome>_<chave>_transcrito_<modelo>.parcial.<extensão>`) assim que eles terminam, então a transcrição
+em andamento pode ser lida e uma queda não perde o que já foi escrito. Ao concluir, o parcial
+é sincronizado com o disco e renomeado atomicamente (os.replace) para o nome final. O DOCX não
+pode ser escrito aos poucos: os segmentos vão para um JSONL intermediário e o documento é
+montado a partir dele no fim.
+"""
+import json
+import math
+import os
+from datetime import datetime
+
+
+def formatar_tempo(segundos):
+    horas, resto = divmod(int(segundos), 3600)
+    minutos, segs = divmod(resto, 60)
+    return f"{horas:02d}:{minutos:02d}:{segs:02d}"
+
+
+def formatar_trecho(inicio, fim, texto, incluir_timestamps):
+    if incluir_timestamps:
+        return f"[{formatar_tempo(inicio)} -> {formatar_tempo(fim)}] " + texto + "\n\n"
+    return texto + " "
+
+
+def _tempo_legenda(segundos, separador):
+    milissegundos = int(round(segundos * 1000))
+    horas, resto = divmod(milissegundos, 3600 * 1000)
+    minutos, resto = divmod(resto, 60 * 1000)
+    segs, milissegundos = divmod(resto, 1000)
+    return f"{horas:02d}:{minutos:02d}:{segs:02d}{separador}{milissegundos:03d}"
+
+
+def _legendas(inicio, fim, texto, segmentos):
+    """(inicio, fim, texto) de cada legenda: os segmentos do Whisper ou, sem eles, o trecho inteiro"""
+    for segmento in segmentos if segmentos is not None else [(inicio, fim, texto)]:
+        if segmento[2].strip():
+            yield segmento[0], segmento[1], segmento[2].strip()
+
+
+class EscritorTranscricao:
+    """Base dos escritores: acrescenta ao arquivo parcial e o publica no caminho final.
+
+    Pode ser enviado a outro processo antes de iniciar(); o arquivo aberto fica no processo
+    que o abriu, e quem concluir só precisa do caminho do parcial.
+    """
+    extensao_parcial = None  # None usa a extensão do arquivo final
+
+    def __init__(self, caminho_saida, caminho_parcial, cabecalho, incluir_timestamps):
+        self.caminho_saida = caminho_saida
+        self.caminho_parcial = caminho_parcial
+        self.cabecalho = cabecalho  # 'arquivo', 'caminho', 'nome', 'modelo', 'idioma'
+        self.incluir_timestamps = incluir_timestamps
+        self._arquivo = None
+
+    def iniciar(self, armazem=None, idioma=None):
+        """Cria o parcial com o cabeçalho e os trechos já conhecidos (checkpoints, ao retomar)"""
+        if idioma is not None:
+            self.cabecalho['idioma'] = idioma
+        self.cabecalho['data'] = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+        os.makedirs(os.path.dirname(self.caminho_parcial) or ".", exist_ok=True)
+        self._arquivo = open(self.caminho_parcial, 'w', encoding='utf-8')
+        self._arquivo.write(self._abertura())
+        for inicio, fim, texto, segmentos in armazem.trechos() if armazem is not None else ():
+            self._arquivo.write(self._formatar(inicio, fim, texto, segmentos))
+        self._arquivo.flush()
+
+    def escrever_segmento(self, inicio, fim, texto, segmentos=None):
+        """Acrescenta um trecho; `segmentos` são os segmentos do Whisper dentro dele (veja ArmazemSegmentos)"""
+        self._arquivo.write(self._formatar(inicio, fim, texto, segmentos))
+        self._arquivo.flush()  # Visível para quem lê o parcial durante a execução
+
+    def fechar(self):
+        if self._arquivo is not None:
+            self._arquivo.flush()
+            os.fsync(self._arquivo.fileno())
+            self._arquivo.close()
+            self._arquivo = None
+
+    def concluir(self):
+        """Fecha o parcial, publica o arquivo final e retorna o caminho dele"""
+        self.fechar()
+        self._publicar()
+        return self.caminho_saida
+
+    def descartar(self):
+        self.fechar()
+        try:
+            os.remove(self.caminho_parcial)
+        except FileNotFoundError:
+            pass
+
+    def _publicar(self):
+        os.replace(self.caminho_parcial, self.caminho_saida)
+
+    def _abertura(self):
+        return ""
+
+    def _formatar(self, inicio, fim, texto, segmentos):
+        return formatar_trecho(inicio, fim, texto, self.incluir_timestamps)
+
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        estado['_arquivo'] = None
+        return estado
+
+
+class EscritorTxt(EscritorTranscricao):
+    def _abertura(self):
+        cabecalho = self.cabecalho
+        return (f"=== TRANSCRIÇÃO DE ÁUDIO ===\n"
+                f"Arquivo: {cabecalho['arquivo']}\n"
+                f"Modelo: {cabecalho['modelo']}\n"
+                f"Data: {cabecalho['data']}\n"
+                f"Idioma: {cabecalho['idioma']}\n" + "=" * 50 + "\n\n")
+
+
+class EscritorMarkdown(EscritorTranscricao):
+    def _abertura(self):
+        cabecalho = self.cabecalho
+        return (f"# Transcrição de {cabecalho['nome']}\n\n"
+                f"**Modelo:** {cabecalho['modelo']}  \n"
+                f"**Data:** {cabecalho['data']}  \n"
+                f"**Idioma:** {cabecalho['idioma']}  \n\n"
+                "---\n\n## Conteúdo\n\n")
+
+
+class EscritorSrt(EscritorTranscricao):
+    """Uma legenda por segmento do Whisper, com os tempos reais; segmentos sem texto não geram legenda"""
+
+    def iniciar(self, armazem=None, idioma=None):
+        self._legendas = 0
+        super().iniciar(armazem, idioma)
+
+    def _formatar(self, inicio, fim, texto, segmentos):
+        partes = []
+        for inicio_legenda, fim_legenda, texto_legenda in _legendas(inicio, fim, texto, segmentos):
+            self._legendas += 1
+            partes.append(f"{self._legendas}\n{_tempo_legenda(inicio_legenda, ',')} --> "
+                          f"{_tempo_legenda(fim_legenda, ',')}\n{texto_legenda}\n\n")
+        return "".join(partes)
+
+
+class EscritorVtt(EscritorTranscricao):
+    def _abertura(self):
+        return "WEBVTT\n\n"
+
+    def _formatar(self, inicio, fim, texto, segmentos):
+        return "".join(f"{_tempo_legenda(inicio_legenda, '.')} --> {_tempo_legenda(fim_legenda, '.')}\n"
+                       f"{texto_legenda}\n\n"
+                       for inicio_legenda, fim_legenda, texto_legenda in _legendas(inicio, fim, texto, segmentos))
+
+
+class EscritorJsonl(EscritorTranscricao):
+    """Um objeto JSON por segmento do Whisper, com tempos, texto, avg_logprob, no_speech_prob e tokens"""
+
+    def _formatar(self, inicio, fim, texto, segmentos):
+        if segmentos is None:
+            segmentos = [(inicio, fim, texto, math.nan, math.nan, [])]
+        linhas = []
+        for inicio_seg, fim_seg, texto_seg, avg_logprob, no_speech_prob, tokens in segmentos:
+            linhas.append(json.dumps({
+                'inicio': inicio_seg, 'fim': fim_seg, 'texto': texto_seg,
+                'avg_logprob': None if math.isnan(avg_logprob) else avg_logprob,  # NaN não é JSON válido
+                'no_speech_prob': None if math.isnan(no_speech_prob) else no_speech_prob,
+                'tokens': list(tokens),
+            }, ensure_ascii=False) + "\n")
+        return "".join(linhas)
+
+
+class EscritorDocx(EscritorTranscricao):
+    """Grava os trechos em um JSONL intermediário e monta o DOCX a partir dele ao concluir"""
+    extensao_parcial = "jsonl"
+
+    def _abertura(self):
+        # O cabeçalho vai no próprio intermediário: quem conclui pode ser outro processo
+        return json.dumps({'cabecalho': self.cabecalho}, ensure_ascii=False) + "\n"
+
+    def _formatar(self, inicio, fim, texto, segmentos):
+        return json.dumps({'inicio': inicio, 'fim': fim, 'texto': texto}, ensure_ascii=False) + "\n"
+
+    def _publicar(self):
+        from docx import Document  # python-docx só é importado quando um DOCX é gerado
+
+        cabecalho, partes = self.cabecalho, []
+        with open(self.caminho_parcial, 'r', encoding='utf-8') as arquivo:
+            for linha in arquivo:
+                registro = json.loads(linha)
+                if 'cabecalho' in registro:
+                    cabecalho = registro['cabecalho']
+                else:
+                    partes.append(formatar_trecho(registro['inicio'], registro['fim'], registro['texto'],
+                                                  self.incluir_timestamps))
+
+        doc = Document()
+        doc.add_heading(f"Transcrição de {cabecalho['nome']}", level=1)
+
+        # Adicionar metadados
+        info_table = doc.add_table(rows=4, cols=2)
+        info_table.style = 'Table Grid'
+        linhas = [("Modelo Whisper", cabecalho['modelo']), ("Data da Transcrição", cabecalho['data']),
+                  ("Idioma", cabecalho['idioma']), ("Arquivo Original", cabecalho['arquivo'])]
+        for row, (rotulo, valor) in zip(info_table.rows, linhas):
+            row.cells[0].text = rotulo
+            row.cells[1].text = valor
+
+        doc.add_paragraph("")  # Espaço
+        doc.add_heading("Conteúdo da Transcrição", level=2)
+        doc.add_paragraph("".join(partes))
+
+        # Salvar ao lado e renomear, para que o DOCX final nunca fique pela metade
+        temporario = self.caminho_saida + ".tmp"
+        doc.save(temporario)
+        os.replace(temporario, self.caminho_saida)
+        os.remove(self.caminho_parcial)
+
+
+ESCRITORES = {
+    'txt': EscritorTxt,
+    'markdown': EscritorMarkdown,
+    'srt': EscritorSrt,
+    'vtt': EscritorVtt,
+    'jsonl': EscritorJsonl,
+    'docx': EscritorDocx,
+}
@@ -0,0 +1,142 @@
+"""Resultado estruturado de uma transcrição, para regravar em qualquer formato sem o modelo.
+
+Um trecho é o resultado de uma chamada do modelo (um segmento de áudio ou uma janela da
+inferência em lote), com o texto exato devolvido pelo Whisper. Dentro de cada trecho ficam os
+segmentos do próprio Whisper, com tempos absolutos, avg_logprob, no_speech_prob e tokens. Tudo
+é guardado em arrays compactos (módulo array), sem um objeto Python por segmento, e gravado em
+um .npz ao lado da transcrição e no cache; trocar o formato ou o estilo de timestamps é então
+só uma leitura desse arquivo.
+"""
+import io
+import json
+import os
+from array import array
+
+import numpy as np
+
+from saida_transcricao import formatar_trecho
+
+
+class _Textos:
+    """Sequência de strings guardada como um único buffer UTF-8 e os deslocamentos de cada uma"""
+
+    def __init__(self):
+        self.dados = bytearray()
+        self.fins = array('q')
+
+    def append(self, texto):
+        self.dados += texto.encode('utf-8')
+        self.fins.append(len(self.dados))
+
+    def __getitem__(self, indice):
+        inicio = self.fins[indice - 1] if indice > 0 else 0
+        return self.dados[inicio:self.fins[indice]].decode('utf-8')
+
+    def __len__(self):
+        return len(self.fins)
+
+
+class ArmazemSegmentos:
+    """Trechos transcritos de um arquivo e os segmentos do Whisper dentro de cada um.
+
+    Segmentos são tuplas (inicio, fim, texto, avg_logprob, no_speech_prob, tokens); métricas
+    desconhecidas ficam como NaN.
+    """
+    CAMPOS = ('trecho_inicio', 'trecho_fim', 'fim_segmentos', 'inicio', 'fim', 'avg_logprob', 'no_speech_prob',
+              'fim_tokens', 'tokens')
+
+    def __init__(self):
+        self.trecho_inicio = array('d')
+        self.trecho_fim = array('d')
+        self.trecho_texto = _Textos()
+        self.fim_segmentos = array('q')  # Segmentos do trecho i: [fim_segmentos[i - 1], fim_segmentos[i])
+        self.inicio = array('d')
+        self.fim = array('d')
+        self.avg_logprob = array('f')
+        self.no_speech_prob = array('f')
+        self.texto = _Textos()
+        self.fim_tokens = array('q')  # Tokens do segmento j: [fim_tokens[j - 1], fim_tokens[j])
+        self.tokens = array('i')
+
+    def adicionar(self, inicio, fim, texto, segmentos=None):
+        """Acrescenta um trecho; sem `segmentos`, o trecho inteiro vira um único segmento"""
+        if segmentos is None:
+            segmentos = [(inicio, fim, texto, float('nan'), float('nan'), ())]
+        self.trecho_inicio.append(inicio)
+        self.trecho_fim.append(fim)
+        self.trecho_texto.append(texto)
+        for inicio_seg, fim_seg, texto_seg, avg_logprob, no_speech_prob, tokens in segmentos:
+            self.inicio.append(inicio_seg)
+            self.fim.append(fim_seg)
+            self.texto.append(texto_seg)
+            self.avg_logprob.append(avg_logprob)
+            self.no_speech_prob.append(no_speech_prob)
+            self.tokens.extend(tokens)
+            self.fim_tokens.append(len(self.tokens))
+        self.fim_segmentos.append(len(self.inicio))
+
+    def __len__(self):
+        return len(self.trecho_inicio)
+
+    @property
+    def vazio(self):
+        return not any(self.trecho_texto[i].strip() for i in range(len(self)))
+
+    def segmentos(self, indice_trecho):
+        primeiro = self.fim_segmentos[indice_trecho - 1] if indice_trecho > 0 else 0
+        for j in range(primeiro, self.fim_segmentos[indice_trecho]):
+            inicio_tokens = self.fim_tokens[j - 1] if j > 0 else 0
+            yield (self.inicio[j], self.fim[j], self.texto[j], self.avg_logprob[j], self.no_speech_prob[j],
+                   self.tokens[inicio_tokens:self.fim_tokens[j]].tolist())
+
+    def trechos(self):
+        """(inicio, fim, texto, segmentos) de cada trecho, na ordem do áudio"""
+        for i in range(len(self)):
+            yield self.trecho_inicio[i], self.trecho_fim[i], self.trecho_texto[i], list(self.segmentos(i))
+
+    def texto_completo(self, incluir_timestamps):
+        return "".join(formatar_trecho(self.trecho_inicio[i], self.trecho_fim[i], self.trecho_texto[i],
+                                       incluir_timestamps) for i in range(len(self)))
+
+    # --- Persistência ---
+    def para_bytes(self, metadados=None):
+        """Serializa em .npz comprimido; `metadados` (dicionário JSON) acompanha os arrays"""
+        arrays = {campo: np.asarray(getattr(self, campo)) for campo in self.CAMPOS}
+        for campo in ('trecho_texto', 'texto'):
+            textos = getattr(self, campo)
+            arrays[f"{campo}_dados"] = np.asarray(textos.dados, dtype=np.uint8)
+            arrays[f"{campo}_fins"] = np.asarray(textos.fins)
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, metadados=np.array(json.dumps(metadados or {}, ensure_ascii=False)), **arrays)
+        return buffer.getvalue()
+
+    @classmethod
+    def de_bytes(cls, dados):
+        """Retorna (armazém, metadados)"""
+        armazem = cls()
+        with np.load(io.BytesIO(dados), allow_pickle=False) as arquivo:
+            for campo in cls.CAMPOS:
+                atual = getattr(armazem, campo)
+                atual.frombytes(arquivo[campo].astype(atual.typecode).tobytes())
+            for campo in ('trecho_texto', 'texto'):
+                textos = getattr(armazem, campo)
+                textos.dados = bytearray(arquivo[f"{campo}_dados"].tobytes())
+                textos.fins.frombytes(arquivo[f"{campo}_fins"].astype('q').tobytes())
+            metadados = json.loads(str(arquivo['metadados']))
+        return armazem, metadados
+
+    def salvar(self, caminho, metadados=None):
+        temporario = caminho + ".tmp"
+        with open(temporario, 'wb') as arquivo:
+            arquivo.write(self.para_bytes(metadados))
+        os.replace(temporario, caminho)
+
+    @classmethod
+    def carregar(cls, caminho):
+        with open(caminho, 'rb') as arquivo:
+            return cls.de_bytes(arquivo.read())
+
+
+def caminho_segmentos(caminho_saida):
+    """Arquivo .npz gravado ao lado da transcrição"""
+    return os.path.splitext(caminho_saida)[0] + ".segmentos.npz"
@@ -0,0 +1,437 @@
+"""Serviço local que mantém os modelos Whisper carregados entre execuções.
+
+Inicie com:
+    python -m servico_transcricao --porta 8765 --modelos turbo small
+
+A API HTTP escuta apenas em 127.0.0.1:
+    GET  /status                  modelos carregados, fila e job atual
+    POST /jobs                    {"arquivos": [...], "opcoes": {...}} -> {"id": ...}
+    GET  /jobs/<id>               estado e resumo do job
+    GET  /jobs/<id>/eventos       eventos do motor em JSON Lines, até o fim do job
+    POST /jobs/<id>/cancelar      (também /pausar e /retomar)
+
+A fila é persistida em SQLite; jobs pendentes ou interrompidos voltam para a fila
+quando o serviço é reiniciado. Em memória ficam só os jobs ativos e os terminados há menos de
+RETENCAO_JOBS_S, com a cauda dos seus eventos; os mais antigos são consultados no banco.
+ClienteServico é usado pela CLI e pela interface.
+"""
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import urllib.request
+import uuid
+from collections import deque
+from dataclasses import asdict, fields
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from motor_transcricao import ORCAMENTO_MEMORIA_PADRAO_MB, TEMPO_OCIOSO_PADRAO_MIN, CacheModelos, \
+    MotorTranscricao, OpcoesTranscricao
+
+PORTA_PADRAO = 8765
+URL_PADRAO = f"http://127.0.0.1:{PORTA_PADRAO}"
+BANCO_PADRAO = "servico_transcricao.db"
+EVENTOS_FINAIS = ('job_fim',)
+EVENTOS_RETIDOS = 1000  # Cauda de eventos de um job em andamento, para quem começar a acompanhar depois
+EVENTOS_RETIDOS_FIM = 20  # Cauda mantida depois do 'job_fim'
+RETENCAO_JOBS_S = 3600  # Segundos que um job terminado fica em memória antes de ser consultado só no banco
+ESTADOS_FINAIS = ('concluido', 'cancelado', 'erro')
+
+
+def opcoes_de_dict(dados):
+    """Reconstrói OpcoesTranscricao ignorando chaves desconhecidas"""
+    nomes = {campo.name for campo in fields(OpcoesTranscricao)}
+    return OpcoesTranscricao(**{chave: valor for chave, valor in (dados or {}).items() if chave in nomes})
+
+
+class Job:
+    """Estado em memória de um job: cauda dos eventos e condição para quem acompanha.
+
+    `total_eventos` numera os eventos desde o início; quem acompanha guarda quantos já leu e,
+    se ficou para trás da cauda, continua a partir do evento mais antigo ainda retido.
+    """
+
+    def __init__(self, job_id, arquivos, opcoes, estado='pendente'):
+        self.id = job_id
+        self.arquivos = arquivos
+        self.opcoes = opcoes
+        self.estado = estado
+        self.resumo = None
+        self.erro = None
+        self.eventos = deque(maxlen=EVENTOS_RETIDOS)
+        self.total_eventos = 0
+        self.finalizado_em = None
+        self.cancelamento_pedido = False  # Vale também antes de o motor existir ou de o lote começar
+        self.motor = None
+        self.condicao = threading.Condition()
+
+    def registrar_evento(self, evento):
+        with self.condicao:
+            self.eventos.append(evento)
+            self.total_eventos += 1
+            if evento['tipo'] in EVENTOS_FINAIS:
+                # Quem já acompanhava recebe o fim; quem chegar depois só precisa dele
+                self.eventos = deque(self.eventos, maxlen=EVENTOS_RETIDOS_FIM)
+            self.condicao.notify_all()
+
+    def eventos_desde(self, lidos):
+        """(eventos ainda não lidos que continuam retidos, novo total lido); espera se não houver nenhum"""
+        with self.condicao:
+            while lidos >= self.total_eventos:
+                self.condicao.wait()
+            primeiro = self.total_eventos - len(self.eventos)
+            return list(self.eventos)[max(0, lidos - primeiro):], self.total_eventos
+
+    def como_dict(self):
+        return {'id': self.id, 'estado': self.estado, 'arquivos': self.arquivos, 'opcoes': asdict(self.opcoes),
+                'resumo': self.resumo, 'erro': self.erro, 'eventos': self.total_eventos}
+
+
+class ServicoTranscricao:
+    """Fila persistente de jobs executados um a um com os modelos mantidos em memória"""
+
+    def __init__(self, caminho_banco=BANCO_PADRAO, modelos_precarregados=(), cache_modelos=None):
+        self.caminho_banco = caminho_banco
+        self.cache_modelos = cache_modelos or CacheModelos()
+        self.jobs = {}
+        self.fila = []
+        self.fila_condicao = threading.Condition()
+        self.job_atual = None
+        self._inicializar_banco()
+        self._restaurar_fila()
+
+        for nome_modelo in modelos_precarregados:
+            self.obter_modelo(nome_modelo)
+
+    # --- Persistência ---
+    def _conectar(self):
+        return sqlite3.connect(self.caminho_banco, timeout=30)
+
+    def _inicializar_banco(self):
+        with self._conectar() as conexao:
+            conexao.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    estado TEXT NOT NULL,
+                    criado_em REAL NOT NULL,
+                    arquivos TEXT NOT NULL,
+                    opcoes TEXT NOT NULL,
+                    resumo TEXT,
+                    erro TEXT
+                )
+            """)
+
+    def _persistir(self, job):
+        with self._conectar() as conexao:
+            conexao.execute(
+                "UPDATE jobs SET estado = ?, resumo = ?, erro = ? WHERE id = ?",
+                (job.estado, json.dumps(job.resumo, ensure_ascii=False) if job.resumo else None, job.erro, job.id)
+            )
+
+    @staticmethod
+    def _job_de_linha(job_id, estado, arquivos, opcoes, resumo, erro):
+        job = Job(job_id, json.loads(arquivos), opcoes_de_dict(json.loads(opcoes)), estado)
+        job.resumo = json.loads(resumo) if resumo else None
+        job.erro = erro
+        return job
+
+    def _restaurar_fila(self):
+        # Jobs terminados ficam só no banco e são lidos sob demanda (veja obter_job)
+        with self._conectar() as conexao:
+            linhas = conexao.execute(
+                "SELECT id, estado, arquivos, opcoes, resumo, erro FROM jobs "
+                "WHERE estado IN ('pendente', 'executando') ORDER BY criado_em"
+            ).fetchall()
+
+        for linha in linhas:
+            job = self._job_de_linha(*linha)
+            self.jobs[job.id] = job
+            # Jobs interrompidos por uma queda do serviço continuam do último segmento gravado
+            job.opcoes.retomar = job.opcoes.retomar or job.estado == 'executando'
+            job.estado = 'pendente'
+            self.fila.append(job)
+
+        if self.fila:
+            logging.info(f"{len(self.fila)} job(s) restaurado(s) da fila persistente")
+
+    # --- Modelos ---
+    def obter_modelo(self, nome_modelo):
+        """Retorna o modelo residente ou o carrega no cache compartilhado"""
+        return MotorTranscricao(OpcoesTranscricao(modelo=nome_modelo),
+                                cache_modelos=self.cache_modelos).carregar_modelo()
+
+    # --- Jobs ---
+    def obter_job(self, job_id):
+        """Job em memória ou, se já terminou e saiu dela, reconstruído do banco (None se não existir)"""
+        with self.fila_condicao:
+            job = self.jobs.get(job_id)
+        if job is not None:
+            return job
+        with self._conectar() as conexao:
+            linha = conexao.execute("SELECT id, estado, arquivos, opcoes, resumo, erro FROM jobs WHERE id = ?",
+                                    (job_id,)).fetchone()
+        if linha is None:
+            return None
+        job = self._job_de_linha(*linha)
+        if job.estado in ESTADOS_FINAIS:
+            # Quem acompanhar recebe direto o fim, como em um job recém-terminado
+            job.registrar_evento({'tipo': 'job_fim', 'id': job.id, 'estado': job.estado, 'resumo': job.resumo,
+                                  'erro': job.erro})
+        return job
+
+    def _expurgar_jobs(self):
+        """Tira da memória os jobs terminados há mais de RETENCAO_JOBS_S; o estado continua no banco"""
+        limite = time.time() - RETENCAO_JOBS_S
+        with self.fila_condicao:
+            for job_id in [job.id for job in self.jobs.values()
+                           if job.finalizado_em is not None and job.finalizado_em < limite]:
+                del self.jobs[job_id]
+
+    # --- Fila ---
+    def submeter(self, arquivos, opcoes):
+        job = Job(uuid.uuid4().hex, [os.path.abspath(arquivo) for arquivo in arquivos], opcoes)
+        with self._conectar() as conexao:
+            conexao.execute(
+                "INSERT INTO jobs (id, estado, criado_em, arquivos, opcoes) VALUES (?, ?, ?, ?, ?)",
+                (job.id, job.estado, time.time(), json.dumps(job.arquivos, ensure_ascii=False),
+                 json.dumps(asdict(opcoes), ensure_ascii=False))
+            )
+        with self.fila_condicao:
+            self.jobs[job.id] = job
+            self.fila.append(job)
+            self.fila_condicao.notify()
+        logging.info(f"Job {job.id} recebido com {len(job.arquivos)} arquivo(s)")
+        self._expurgar_jobs()
+        return job
+
+    def cancelar(self, job):
+        with self.fila_condicao:
+            if job in self.fila:
+                self.fila.remove(job)
+                self._finalizar_job(job, 'cancelado')
+                return
+            job.cancelamento_pedido = True
+            motor = job.motor
+        if motor is not None:
+            motor.cancelar()
+
+    def executar(self):
+        """Laço do executor: processa um job por vez, reaproveitando os modelos residentes"""
+        while True:
+            with self.fila_condicao:
+                while not self.fila:
+                    self.fila_condicao.wait()
+                job = self.fila.pop(0)
+                self.job_atual = job
+
+            job.estado = 'executando'
+            self._persistir(job)
+            try:
+                motor = MotorTranscricao(job.opcoes, ao_evento=lambda evento, job=job: self._ao_evento(job, evento),
+                                         cache_modelos=self.cache_modelos)
+                with self.fila_condicao:
+                    job.motor = motor
+                    cancelado_antes = job.cancelamento_pedido
+                if cancelado_antes:
+                    self._finalizar_job(job, 'cancelado')
+                    continue
+                job.resumo = motor.processar_lote(job.arquivos)
+                self._finalizar_job(job, 'cancelado' if job.resumo['cancelado'] else 'concluido')
+            except Exception as e:
+                logging.error(f"Erro no job {job.id}: {e}", exc_info=True)
+                job.erro = str(e)
+                self._finalizar_job(job, 'erro')
+            finally:
+                job.motor = None
+                self.job_atual = None
+
+    def _ao_evento(self, job, evento):
+        if evento['tipo'] == 'lote_inicio':
+            # O motor limpa o sinal de cancelamento ao iniciar o lote; um pedido anterior é reaplicado aqui
+            with self.fila_condicao:
+                cancelar = job.cancelamento_pedido
+            if cancelar:
+                job.motor.cancelar()
+        job.registrar_evento(evento)
+
+    def _finalizar_job(self, job, estado):
+        job.estado = estado
+        job.finalizado_em = time.time()
+        self._persistir(job)
+        job.registrar_evento({'tipo': 'job_fim', 'id': job.id, 'estado': estado, 'resumo': job.resumo,
+                              'erro': job.erro})
+        self._expurgar_jobs()
+
+    def status(self):
+        return {
+            'modelos_carregados': self.cache_modelos.nomes,
+            'cache_modelos': self.cache_modelos.resumo(),
+            'fila': [job.id for job in self.fila],
+            'job_atual': self.job_atual.id if self.job_atual else None
+        }
+
+
+def _criar_handler(servico):
+    class HandlerServico(BaseHTTPRequestHandler):
+        def log_message(self, formato, *args):
+            logging.debug("servico: " + formato % args)
+
+        def _responder(self, status, dados):
+            corpo = json.dumps(dados, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def _job(self, partes):
+            job = servico.obter_job(partes[1]) if len(partes) > 1 else None
+            if job is None:
+                self._responder(404, {'erro': 'Job não encontrado'})
+            return job
+
+        def do_GET(self):
+            partes = self.path.split('?')[0].strip('/').split('/')
+            if partes == ['status']:
+                self._responder(200, servico.status())
+            elif partes[0] == 'jobs' and len(partes) == 2:
+                job = self._job(partes)
+                if job:
+                    self._responder(200, job.como_dict())
+            elif partes[0] == 'jobs' and len(partes) == 3 and partes[2] == 'eventos':
+                job = self._job(partes)
+                if job:
+                    self._transmitir_eventos(job)
+            else:
+                self._responder(404, {'erro': 'Rota desconhecida'})
+
+        def do_POST(self):
+            partes = self.path.strip('/').split('/')
+            if partes == ['jobs']:
+                tamanho = int(self.headers.get('Content-Length', 0))
+                dados = json.loads(self.rfile.read(tamanho) or b'{}')
+                if not dados.get('arquivos'):
+                    self._responder(400, {'erro': "Informe 'arquivos'"})
+                    return
+                job = servico.submeter(dados['arquivos'], opcoes_de_dict(dados.get('opcoes')))
+                self._responder(201, {'id': job.id})
+            elif partes[0] == 'jobs' and len(partes) == 3 and partes[2] in ('cancelar', 'pausar', 'retomar'):
+                job = self._job(partes)
+                if not job:
+                    return
+                if partes[2] == 'cancelar':
+                    servico.cancelar(job)
+                elif job.motor is not None:
+                    job.motor.pausar() if partes[2] == 'pausar' else job.motor.retomar()
+                self._responder(200, job.como_dict())
+            else:
+                self._responder(404, {'erro': 'Rota desconhecida'})
+
+        def _transmitir_eventos(self, job):
+            # Sem Content-Length: o cliente lê linha a linha até o servidor fechar a conexão
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+            self.end_headers()
+            self.close_connection = True
+
+            enviados = 0
+            while True:
+                novos, enviados = job.eventos_desde(enviados)
+                try:
+                    for evento in novos:
+                        self.wfile.write((json.dumps(evento, ensure_ascii=False) + "\n").encode('utf-8'))
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    return
+                if any(evento['tipo'] in EVENTOS_FINAIS for evento in novos):
+                    return
+
+    return HandlerServico
+
+
+class ClienteServico:
+    """Cliente HTTP do serviço local, usado pela CLI e pela interface"""
+
+    def __init__(self, url=URL_PADRAO, timeout=10):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def _requisitar(self, metodo, rota, dados=None):
+        corpo = json.dumps(dados).encode('utf-8') if dados is not None else None
+        requisicao = urllib.request.Request(self.url + rota, data=corpo, method=metodo,
+                                            headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(requisicao, timeout=self.timeout) as resposta:
+            return json.loads(resposta.read().decode('utf-8'))
+
+    def disponivel(self):
+        try:
+            self.status()
+            return True
+        except OSError:
+            return False
+
+    def status(self):
+        return self._requisitar("GET", "/status")
+
+    def submeter(self, arquivos, opcoes):
+        return self._requisitar("POST", "/jobs", {'arquivos': list(arquivos), 'opcoes': asdict(opcoes)})['id']
+
+    def consultar(self, job_id):
+        return self._requisitar("GET", f"/jobs/{job_id}")
+
+    def cancelar(self, job_id):
+        return self._requisitar("POST", f"/jobs/{job_id}/cancelar")
+
+    def pausar(self, job_id):
+        return self._requisitar("POST", f"/jobs/{job_id}/pausar")
+
+    def retomar(self, job_id):
+        return self._requisitar("POST", f"/jobs/{job_id}/retomar")
+
+    def acompanhar(self, job_id, ao_evento=None):
+        """Repassa cada evento do job ao callback e retorna o evento final 'job_fim'"""
+        # Sem timeout: um segmento de modelo grande pode levar minutos entre eventos
+        with urllib.request.urlopen(f"{self.url}/jobs/{job_id}/eventos") as resposta:
+            for linha in resposta:
+                evento = json.loads(linha.decode('utf-8'))
+                if ao_evento:
+                    ao_evento(evento)
+                if evento['tipo'] in EVENTOS_FINAIS:
+                    return evento
+        raise ConnectionError(f"O serviço encerrou a transmissão do job {job_id} antes do fim")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m servico_transcricao",
+                                     description="Serviço local que mantém modelos Whisper carregados.")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    parser.add_argument("--modelos", nargs="*", default=[],
+                        help="Modelos a carregar na inicialização ('small:int8', 'ctranslate2/small')")
+    parser.add_argument("--banco", default=BANCO_PADRAO, help="Arquivo SQLite da fila persistente")
+    parser.add_argument("--memoria-mb", type=int, default=ORCAMENTO_MEMORIA_PADRAO_MB,
+                        help="Orçamento de memória para os modelos residentes")
+    parser.add_argument("--ocioso-min", type=int, default=TEMPO_OCIOSO_PADRAO_MIN,
+                        help="Minutos sem uso até descarregar um modelo (0 desativa)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    cache_modelos = CacheModelos(args.memoria_mb, args.ocioso_min * 60)
+    servico = ServicoTranscricao(args.banco, args.modelos, cache_modelos)
+    threading.Thread(target=servico.executar, daemon=True).start()
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", args.porta), _criar_handler(servico))
+    servidor.daemon_threads = True
+    logging.info(f"Serviço de transcrição ouvindo em http://127.0.0.1:{args.porta}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,65 +1,44 @@
+import time
+
+# Início da inicialização, antes das importações do programa, para medir o tempo até a janela responder
+_INICIO_US = time.time_ns() // 1000
+_INICIO = time.perf_counter()
+
 import os
-import whisper
+import queue
 import threading
 import logging
-import time
 import subprocess
 import platform
-import tempfile
 import json
-from enum import Enum
+from itertools import islice
 from datetime import datetime
-from docx import Document
 from tkinter import Tk, Label, Button, filedialog, StringVar, ttk, BooleanVar, Checkbutton, Text, Scrollbar, Frame, \
     NORMAL, DISABLED, messagebox, IntVar
 
-# --- Importação condicional do AudioSegment e tratativa de erro ---
-try:
-    from pydub import AudioSegment
-
-    PYDUB_AVAILABLE = True
-except ImportError:
-    PYDUB_AVAILABLE = False
-    logging.error("A biblioteca 'pydub' não foi encontrada. Por favor, instale-a: pip install pydub")
-    messagebox.showerror("Erro de Dependência",
-                         "A biblioteca 'pydub' não foi encontrada. Por favor, instale-a usando 'pip install pydub'.")
-except Exception as e:
-    PYDUB_AVAILABLE = False
-    logging.error(
-        f"Erro ao importar 'pydub' ou 'AudioSegment'. Verifique se 'ffmpeg' está instalado e no PATH do sistema. Erro: {e}")
-    messagebox.showerror("Erro de Dependência",
-                         f"Erro ao carregar 'pydub'. Certifique-se de que 'ffmpeg' está instalado e configurado corretamente no seu sistema (PATH). Erro: {e}")
+from motor_transcricao import AudioExtension, WhisperModel, IDIOMAS_WHISPER, FORMATOS_SAIDA, FFMPEG_DISPONIVEL, \
+    ORCAMENTO_MEMORIA_PADRAO_MB, TEMPO_OCIOSO_PADRAO_MIN, MODELO_AUTO, \
+    EXTENSOES_AUDIO, MotorTranscricao, OpcoesTranscricao, formatar_tempo, listar_arquivos_audio
+from backends_transcricao import BACKEND_PADRAO, BACKENDS, identificador_modelo
+from cache_audio import TAMANHO_CACHE_AUDIO_PADRAO_MB
+from cache_transcricoes import TAMANHO_CACHE_PADRAO_MB
+from instrumentacao_transcricao import INSTRUMENTACAO, configurar_log_em_fila
+from quantizacao_transcricao import PRECISAO_PADRAO, PRECISOES
+from servico_transcricao import URL_PADRAO, ClienteServico
+from varredura_audio import varrer_arquivos_audio
+
+INSTRUMENTACAO.registrar('importacoes', _INICIO_US, int((time.perf_counter() - _INICIO) * 1e6))
+
+if not FFMPEG_DISPONIVEL:
+    logging.error("O executável 'ffmpeg' não foi encontrado no PATH do sistema.")
 
 # --- Configuração do Logger ---
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('transcricao.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
-
-
-# --- Enums para melhor organização ---
-class AudioExtension(Enum):
-    MP3 = '.mp3'
-    WAV = '.wav'
-    FLAC = '.flac'
-    M4A = '.m4a'
-    OGG = '.ogg'
-    MPEG = '.mpeg'
-    WEBM = '.webm'
-    AAC = '.aac'
-
-
-class WhisperModel(Enum):
-    TINY = "tiny"
-    BASE = "base"
-    SMALL = "small"
-    MEDIUM = "medium"
-    LARGE = "large"
-    TURBO = "turbo"
+# Arquivo e console são escritos por uma thread própria; quem registra só enfileira
+_formato_log = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+_handlers_log = [logging.FileHandler('transcricao.log', encoding='utf-8'), logging.StreamHandler()]
+for _handler in _handlers_log:
+    _handler.setFormatter(_formato_log)
+configurar_log_em_fila(*_handlers_log)
 
 
 class TranscricaoAudio:
@@ -69,52 +48,87 @@ class TranscricaoAudio:
         WhisperModel.SMALL.value: "Small: Boa precisão e velocidade razoável, recomendado para uso geral; requer recursos moderados.",
         WhisperModel.MEDIUM.value: "Medium: Muito preciso, excelente para diferentes sotaques e contextos, ideal para máquinas com boa capacidade.",
         WhisperModel.LARGE.value: "Large: Máxima precisão, melhor qualidade de transcrição; exige muitos recursos, ideal para máquinas potentes.",
-        WhisperModel.TURBO.value: "Turbo: Otimizado para máxima velocidade com alta precisão, indicado para servidores ou estações de alta potência."
+        WhisperModel.TURBO.value: "Turbo: Otimizado para máxima velocidade com alta precisão, indicado para servidores ou estações de alta potência.",
+        MODELO_AUTO: "Auto: Escolhe o modelo mais preciso que cumpre o prazo ou o fator de tempo real definidos nas configurações, pelo desempenho já medido nesta máquina; troca por um mais rápido se o lote atrasar."
     }
 
-    IDIOMAS_WHISPER = {
-        "auto": "Detectar automaticamente",
-        "pt": "Português",
-        "en": "Inglês",
-        "es": "Espanhol",
-        "fr": "Francês",
-        "de": "Alemão",
-        "it": "Italiano",
-        "ja": "Japonês",
-        "ko": "Coreano",
-        "zh": "Chinês",
-        "ru": "Russo",
-        "ar": "Árabe"
-    }
+    IDIOMAS_WHISPER = IDIOMAS_WHISPER
 
     CONFIG_FILE = "config_transcricao.json"
 
+    INTERVALO_QUADRO_MS = 50  # A fila de mensagens é aplicada aos widgets a cada quadro (20 por segundo)
+    INTERVALO_ESTATISTICAS_MS = 1000  # Atualização da aba Estatísticas enquanto ela está visível
+    MAX_LINHAS_DETALHES = 1000  # Acima disso, as linhas mais antigas do painel de detalhes são descartadas
+    EVENTOS_PROGRESSO = ('segmento', 'progresso_lote')  # Só o último de cada quadro é aplicado
+    MAX_FALHAS_RESUMO = 10  # Falhas listadas no resumo do lote; as demais ficam no painel de detalhes
+
     def __init__(self):
-        self.cancel_event = threading.Event()
-        self.pause_event = threading.Event()
-        self.total_bytes = 0
-        self.processed_bytes = 0
-        self.start_time = 0
-        self.modelo_carregado = None
-        self.modelo_carregado_nome = None
-        self.estatisticas = {
-            'arquivos_processados': 0,
-            'tempo_total_processamento': 0,
-            'erros': 0,
-            'sucessos': 0
-        }
+        # Toda a lógica de transcrição fica no motor; a interface apenas reage aos eventos dele.
+        # Os eventos chegam em threads de trabalho e passam pela fila até a thread do Tk
+        self.motor = MotorTranscricao(ao_evento=self._ao_evento_motor)
+        self._fila_interface = queue.Queue()
+        self.posicoes_detalhes = {}
+        self._contador_marcas = 0
+        self.job_servico = None
+        self.servico_pausado = False
+        self.tempo_inicializacao = None  # Segundos do início do programa até a janela responder
+        # Durante um lote, os arquivos concluídos não abrem diálogos; um único resumo aparece no fim
+        self.em_lote = False
+        self.ultima_pasta_saida = None
+        # Resumos lidos do SQLite (histórico e caches), consultados fora da thread do Tk e reaproveitados
+        # pela atualização ao vivo; o lote em andamento escreve nesses bancos e poderia travar a janela
+        self._resumos_persistentes = None
+        self._consulta_resumos = None  # None, 'em_andamento' ou 'pendente' (outra consulta após a atual)
 
         self.root = Tk()
         self._inicializar_variaveis()
         self._carregar_configuracoes()
         self._configurar_interface()
 
-        # Verificar se pydub está disponível, se não, desabilitar botões de início
-        if not PYDUB_AVAILABLE:
+        # Verificar se o ffmpeg está disponível, se não, desabilitar botões de início
+        if not FFMPEG_DISPONIVEL:
             messagebox.showerror("Erro de Configuração",
-                                 "FFmpeg ou pydub não estão configurados corretamente. O aplicativo pode não funcionar. Por favor, consulte o log para mais detalhes.")
+                                 "FFmpeg não está configurado corretamente. O aplicativo pode não funcionar. Por favor, consulte o log para mais detalhes.")
             self._set_transcription_controls_state(False)
 
+        self.root.after(self.INTERVALO_QUADRO_MS, self._drenar_fila_interface)
+
+    @property
+    def estatisticas(self):
+        return self.motor.estatisticas
+
+    @property
+    def modelo_carregado_nome(self):
+        return self.motor.modelo_carregado_nome
+
+    def _opcoes_atuais(self):
+        """Converte o estado dos widgets nas opções do motor"""
+        return OpcoesTranscricao(
+            modelo=self.modelo_escolhido.get(),
+            idioma=self.idioma_escolhido.get(),
+            temperatura=float(self.temperatura.get()),
+            segmento_duracao=self.segmento_duracao.get(),
+            formato_saida=self.formato_saida.get(),
+            incluir_timestamps=self.incluir_timestamps.get(),
+            pasta_saida=self.pasta_saida_personalizada.get(),
+            decodificacao_streaming=self.decodificacao_streaming.get(),
+            num_processos=self.num_processos.get(),
+            orcamento_memoria_mb=self.orcamento_memoria_mb.get(),
+            tempo_ocioso_min=self.tempo_ocioso_min.get(),
+            cache_transcricoes=self.cache_transcricoes.get(),
+            tamanho_cache_mb=self.tamanho_cache_mb.get(),
+            cache_audio=self.cache_audio.get(),
+            tamanho_cache_audio_mb=self.tamanho_cache_audio_mb.get(),
+            retomar=self.retomar.get(),
+            vad=self.vad.get(),
+            tamanho_lote=self.tamanho_lote.get(),
+            agrupar_por_idioma=self.agrupar_por_idioma.get(),
+            prazo_min=self.prazo_min.get(),
+            fator_tempo_real_alvo=float(self.fator_tempo_real_alvo.get()),
+            precisao=self.precisao.get(),
+            backend=self.backend.get()
+        )
+
     def _inicializar_variaveis(self):
         self.modelo_escolhido = StringVar(value=WhisperModel.TURBO.value)
         self.progresso_var = StringVar(value="0")
@@ -125,6 +139,25 @@ class TranscricaoAudio:
         self.segmento_duracao = IntVar(value=30)
         self.incluir_timestamps = BooleanVar()
         self.pasta_saida_personalizada = StringVar()
+        self.decodificacao_streaming = BooleanVar(value=False)
+        self.num_processos = IntVar(value=1)
+        self.orcamento_memoria_mb = IntVar(value=ORCAMENTO_MEMORIA_PADRAO_MB)
+        self.tempo_ocioso_min = IntVar(value=TEMPO_OCIOSO_PADRAO_MIN)
+        self.cache_transcricoes = BooleanVar(value=True)
+        self.tamanho_cache_mb = IntVar(value=TAMANHO_CACHE_PADRAO_MB)
+        self.cache_audio = BooleanVar(value=False)
+        self.tamanho_cache_audio_mb = IntVar(value=TAMANHO_CACHE_AUDIO_PADRAO_MB)
+        self.retomar = BooleanVar(value=False)
+        self.vad = BooleanVar(value=False)
+        self.tamanho_lote = IntVar(value=1)
+        self.agrupar_por_idioma = BooleanVar(value=False)
+        self.prazo_min = IntVar(value=0)
+        self.fator_tempo_real_alvo = StringVar(value="0.0")
+        self.precisao = StringVar(value=PRECISAO_PADRAO)
+        self.backend = StringVar(value=BACKEND_PADRAO)
+        self.pre_carregar_modelo = BooleanVar(value=True)
+        self.usar_servico = BooleanVar(value=False)
+        self.url_servico = StringVar(value=URL_PADRAO)
 
     def _carregar_configuracoes(self):
         """Carrega configurações salvas do arquivo JSON"""
@@ -141,6 +174,25 @@ class TranscricaoAudio:
                 self.incluir_subpastas.set(config.get('incluir_subpastas', False))
                 self.incluir_timestamps.set(config.get('incluir_timestamps', False))
                 self.pasta_saida_personalizada.set(config.get('pasta_saida', ''))
+                self.decodificacao_streaming.set(config.get('decodificacao_streaming', False))
+                self.num_processos.set(config.get('num_processos', 1))
+                self.orcamento_memoria_mb.set(config.get('orcamento_memoria_mb', ORCAMENTO_MEMORIA_PADRAO_MB))
+                self.tempo_ocioso_min.set(config.get('tempo_ocioso_min', TEMPO_OCIOSO_PADRAO_MIN))
+                self.cache_transcricoes.set(config.get('cache_transcricoes', True))
+                self.tamanho_cache_mb.set(config.get('tamanho_cache_mb', TAMANHO_CACHE_PADRAO_MB))
+                self.cache_audio.set(config.get('cache_audio', False))
+                self.tamanho_cache_audio_mb.set(config.get('tamanho_cache_audio_mb', TAMANHO_CACHE_AUDIO_PADRAO_MB))
+                self.retomar.set(config.get('retomar', False))
+                self.vad.set(config.get('vad', False))
+                self.tamanho_lote.set(config.get('tamanho_lote', 1))
+                self.agrupar_por_idioma.set(config.get('agrupar_por_idioma', False))
+                self.prazo_min.set(config.get('prazo_min', 0))
+                self.fator_tempo_real_alvo.set(config.get('fator_tempo_real_alvo', '0.0'))
+                self.precisao.set(config.get('precisao', PRECISAO_PADRAO))
+                self.backend.set(config.get('backend', BACKEND_PADRAO))
+                self.pre_carregar_modelo.set(config.get('pre_carregar_modelo', True))
+                self.usar_servico.set(config.get('usar_servico', False))
+                self.url_servico.set(config.get('url_servico', URL_PADRAO))
 
                 logging.info("Configurações carregadas com sucesso")
         except Exception as e:
@@ -157,7 +209,26 @@ class TranscricaoAudio:
                 'segmento_duracao': self.segmento_duracao.get(),
                 'incluir_subpastas': self.incluir_subpastas.get(),
                 'incluir_timestamps': self.incluir_timestamps.get(),
-                'pasta_saida': self.pasta_saida_personalizada.get()
+                'pasta_saida': self.pasta_saida_personalizada.get(),
+                'decodificacao_streaming': self.decodificacao_streaming.get(),
+                'num_processos': self.num_processos.get(),
+                'orcamento_memoria_mb': self.orcamento_memoria_mb.get(),
+                'tempo_ocioso_min': self.tempo_ocioso_min.get(),
+                'cache_transcricoes': self.cache_transcricoes.get(),
+                'tamanho_cache_mb': self.tamanho_cache_mb.get(),
+                'cache_audio': self.cache_audio.get(),
+                'tamanho_cache_audio_mb': self.tamanho_cache_audio_mb.get(),
+                'retomar': self.retomar.get(),
+                'vad': self.vad.get(),
+                'tamanho_lote': self.tamanho_lote.get(),
+                'agrupar_por_idioma': self.agrupar_por_idioma.get(),
+                'prazo_min': self.prazo_min.get(),
+                'fator_tempo_real_alvo': self.fator_tempo_real_alvo.get(),
+                'precisao': self.precisao.get(),
+                'backend': self.backend.get(),
+                'pre_carregar_modelo': self.pre_carregar_modelo.get(),
+                'usar_servico': self.usar_servico.get(),
+                'url_servico': self.url_servico.get()
             }
 
             with open(self.CONFIG_FILE, 'w', encoding='utf-8') as f:
@@ -204,7 +275,8 @@ class TranscricaoAudio:
         ttk.Label(frame, text="Modelo Whisper:", font=("Arial", 10, "bold")).grid(row=0, column=0, columnspan=2,
                                                                                   pady=(10, 5))
         self.combobox_modelo = ttk.Combobox(frame, textvariable=self.modelo_escolhido,
-                                            values=[model.value for model in WhisperModel], width=15, state="readonly")
+                                            values=[model.value for model in WhisperModel] + [MODELO_AUTO], width=15,
+                                            state="readonly")
         self.combobox_modelo.grid(row=1, column=0, columnspan=2, padx=20, pady=5)
         self.combobox_modelo.bind("<<ComboboxSelected>>", self._atualizar_descricao_modelo)
 
@@ -240,7 +312,7 @@ class TranscricaoAudio:
 
         # Formato de saída
         ttk.Label(frame_opcoes, text="Formato:").pack(side="left", padx=(20, 5))
-        ttk.Combobox(frame_opcoes, textvariable=self.formato_saida, values=["docx", "txt", "markdown", "srt"], width=10,
+        ttk.Combobox(frame_opcoes, textvariable=self.formato_saida, values=FORMATOS_SAIDA, width=10,
                      state="readonly").pack(side="left")
 
         # Barra de Progresso
@@ -312,6 +384,31 @@ class TranscricaoAudio:
         self.idioma_label.grid(row=row, column=2, padx=5, pady=5)
         idioma_combo.bind("<<ComboboxSelected>>", self._atualizar_idioma_label)
 
+        # Agrupamento do lote pelo idioma detectado
+        row += 1
+        ttk.Checkbutton(config_frame, text="Agrupar lote por idioma",
+                        variable=self.agrupar_por_idioma).grid(row=row, column=0, columnspan=2, sticky="w",
+                                                               padx=5, pady=5)
+        ttk.Label(config_frame, text="(com idioma auto, detecta o idioma de cada arquivo antes)",
+                  foreground="gray").grid(row=row, column=2, padx=5, pady=5)
+
+        # Precisão da inferência
+        row += 1
+        ttk.Label(config_frame, text="Precisão (CPU):").grid(row=row, column=0, sticky="w", padx=5, pady=5)
+        ttk.Combobox(config_frame, textvariable=self.precisao, values=list(PRECISOES),
+                     state="readonly", width=10).grid(row=row, column=1, padx=5, pady=5, sticky="w")
+        ttk.Label(config_frame, text="(int8 quantiza as camadas lineares: mais rápido e menor, em CPU)",
+                  foreground="gray").grid(row=row, column=2, padx=5, pady=5)
+
+        # Backend de inferência
+        row += 1
+        ttk.Label(config_frame, text="Backend:").grid(row=row, column=0, sticky="w", padx=5, pady=5)
+        ttk.Combobox(config_frame, textvariable=self.backend,
+                     values=[backend for backend in BACKENDS if backend != "stub"],
+                     state="readonly", width=10).grid(row=row, column=1, padx=5, pady=5, sticky="w")
+        ttk.Label(config_frame, text="(ctranslate2 requer o pacote faster-whisper)",
+                  foreground="gray").grid(row=row, column=2, padx=5, pady=5)
+
         # Temperatura
         row += 1
         ttk.Label(config_frame, text="Temperatura (0.0-1.0):").grid(row=row, column=0, sticky="w", padx=5, pady=5)
@@ -328,6 +425,114 @@ class TranscricaoAudio:
                                textvariable=self.segmento_duracao, width=10)
         seg_spin.grid(row=row, column=1, padx=5, pady=5, sticky="w")
 
+        # Decodificação em streaming
+        row += 1
+        ttk.Checkbutton(config_frame, text="Decodificação em streaming",
+                        variable=self.decodificacao_streaming).grid(row=row, column=0, columnspan=2, sticky="w",
+                                                                    padx=5, pady=5)
+        ttk.Label(config_frame, text="(memória constante para gravações longas)",
+                  foreground="gray").grid(row=row, column=2, padx=5, pady=5)
+
+        # Detecção de voz
+        row += 1
+        ttk.Checkbutton(config_frame, text="Pular silêncio (VAD)",
+                        variable=self.vad).grid(row=row, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+        ttk.Label(config_frame, text="(corta os segmentos nas pausas e não transcreve silêncio)",
+                  foreground="gray").grid(row=row, column=2, padx=5, pady=5)
+
+        # Inferência em lote
+        row += 1
+        ttk.Label(config_frame, text="Lote de Inferência:").grid(row=row, column=0, sticky="w", padx=5, pady=5)
+        lote_spin = ttk.Spinbox(config_frame, from_=1, to=64, increment=1,
+                                textvariable=self.tamanho_lote, width=10)
+        lote_spin.grid(row=row, column=1, padx=5, pady=5, sticky="w")
+        ttk.Label(config_frame, text="(janelas de 30 s por chamada; 1 = sequencial)",
+                  foreground="gray").grid(row=row, column=2, padx=5, pady=5)
+
+        # Processos paralelos no lote
+        row += 1
+        ttk.Label(config_frame, text="Processos Paralelos:").grid(row=row, column=0, sticky="w", padx=5, pady=5)
+        proc_spin = ttk.Spinbox(config_frame, from_=1, to=os.cpu_count() or 1, increment=1,
+                                textvariable=self.num_processos, width=10)
+        proc_spin.grid(row=row, column=1, padx=5, pady=5, sticky="w")
+        ttk.Label(config_frame, text="(um modelo por processo; um arquivo só é dividido em faixas)",
+                  foreground="gray").grid(row=row, column=2, padx=5, pady=5)
+
+        # Cache de modelos residentes
+        row += 1
+        ttk.Label(config_frame, text="Memória para Modelos (MB):").grid(row=row, column=0, sticky="w", padx=5, pady=5)
+        memoria_spin = ttk.Spinbox(config_frame, from_=256, to=131072, increment=256,
+                                   textvariable=self.orcamento_memoria_mb, width=10)
+        memoria_spin.grid(row=row, column=1, padx=5, pady=5, sticky="w")
+        ttk.Label(config_frame, text="(modelos menos usados são descarregados ao exceder)",
+                  foreground="gray").grid(row=row, column=2, padx=5, pady=5)
+
+        row += 1
+        ttk.Label(config_frame, text="Descarregar Ocioso (min):").grid(row=row, column=0, sticky="w", padx=5, pady=5)
+        ocioso_spin = ttk.Spinbox(config_frame, from_=0, to=240, increment=5,
+                                  textvariable=self.tempo_ocioso_min, width=10)
+        ocioso_spin.grid(row=row, column=1, padx=5, pady=5, sticky="w")
+        ttk.Label(config_frame, text="(0 mantém os modelos até fechar o programa)",
+                  foreground="gray").grid(row=row, column=2, padx=5, pady=5)
+
+        # Pré-carregamento do modelo
+        row += 1
+        ttk.Checkbutton(config_frame, text="Pré-carregar o modelo ao abrir",
+                        variable=self.pre_carregar_modelo).grid(row=row, column=0, columnspan=2, sticky="w",
+                                                                padx=5, pady=5)
+        ttk.Label(config_frame, text="(carrega em segundo plano o último modelo usado)",
+                  foreground="gray").grid(row=row, column=2, padx=5, pady=5)
+
+        # Modelo automático
+        row += 1
+        ttk.Label(config_frame, text="Prazo do Lote (min):").grid(row=row, column=0, sticky="w", padx=5, pady=5)
+        prazo_spin = ttk.Spinbox(config_frame, from_=0, to=10080, increment=15,
+                                 textvariable=self.prazo_min, width=10)
+        prazo_spin.grid(row=row, column=1, padx=5, pady=5, sticky="w")
+        ttk.Label(config_frame, text="(modelo auto; 0 = sem prazo)",
+                  foreground="gray").grid(row=row, column=2, padx=5, pady=5)
+
+        row += 1
+        ttk.Label(config_frame, text="Fator de Tempo Real Alvo:").grid(row=row, column=0, sticky="w", padx=5, pady=5)
+        fator_spin = ttk.Spinbox(config_frame, from_=0.0, to=10.0, increment=0.05,
+                                 textvariable=self.fator_tempo_real_alvo, width=10)
+        fator_spin.grid(row=row, column=1, padx=5, pady=5, sticky="w")
+        ttk.Label(config_frame, text="(modelo auto; segundos de processamento por segundo de áudio, 0 = livre)",
+                  foreground="gray").grid(row=row, column=2, padx=5, pady=5)
+
+        # Cache de transcrições
+        row += 1
+        ttk.Checkbutton(config_frame, text="Reaproveitar transcrições já feitas",
+                        variable=self.cache_transcricoes).grid(row=row, column=0, columnspan=2, sticky="w",
+                                                               padx=5, pady=5)
+        ttk.Label(config_frame, text="(mesmo áudio e parâmetros não são transcritos de novo)",
+                  foreground="gray").grid(row=row, column=2, padx=5, pady=5)
+
+        row += 1
+        ttk.Label(config_frame, text="Tamanho do Cache (MB):").grid(row=row, column=0, sticky="w", padx=5, pady=5)
+        cache_spin = ttk.Spinbox(config_frame, from_=16, to=4096, increment=16,
+                                 textvariable=self.tamanho_cache_mb, width=10)
+        cache_spin.grid(row=row, column=1, padx=5, pady=5, sticky="w")
+
+        # Cache do áudio decodificado
+        row += 1
+        ttk.Checkbutton(config_frame, text="Cache do áudio decodificado",
+                        variable=self.cache_audio).grid(row=row, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+        ttk.Label(config_frame, text="(reexecuções com outro modelo não decodificam o áudio de novo)",
+                  foreground="gray").grid(row=row, column=2, padx=5, pady=5)
+
+        row += 1
+        ttk.Label(config_frame, text="Cache de Áudio (MB):").grid(row=row, column=0, sticky="w", padx=5, pady=5)
+        ttk.Spinbox(config_frame, from_=256, to=65536, increment=256, textvariable=self.tamanho_cache_audio_mb,
+                    width=10).grid(row=row, column=1, padx=5, pady=5, sticky="w")
+
+        # Retomar execuções interrompidas
+        row += 1
+        ttk.Checkbutton(config_frame, text="Retomar transcrições interrompidas",
+                        variable=self.retomar).grid(row=row, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+        ttk.Label(config_frame, text="(continua do último segmento salvo no diário)",
+                  foreground="gray").grid(row=row, column=2, padx=5, pady=5)
+
         # Configurações de Saída
         saida_frame = ttk.LabelFrame(frame, text="Configurações de Saída", padding=10)
         saida_frame.pack(fill="x", padx=10, pady=10)
@@ -342,6 +547,17 @@ class TranscricaoAudio:
 
         ttk.Button(pasta_frame, text="Procurar", command=self._selecionar_pasta_saida, width=10).pack(side="right")
 
+        # Serviço local com modelos já carregados
+        servico_frame = ttk.LabelFrame(frame, text="Serviço Local", padding=10)
+        servico_frame.pack(fill="x", padx=10, pady=10)
+
+        ttk.Checkbutton(servico_frame, text="Enviar transcrições ao serviço local (python -m servico_transcricao)",
+                        variable=self.usar_servico).pack(anchor="w", pady=5)
+        url_frame = ttk.Frame(servico_frame)
+        url_frame.pack(fill="x", pady=5)
+        ttk.Label(url_frame, text="Endereço:").pack(side="left", padx=(0, 5))
+        ttk.Entry(url_frame, textvariable=self.url_servico, width=40).pack(side="left", fill="x", expand=True)
+
         # Botões de configuração
         botoes_frame = ttk.Frame(frame)
         botoes_frame.pack(fill="x", padx=10, pady=20)
@@ -363,10 +579,80 @@ class TranscricaoAudio:
         self.stats_text.pack(side="left", fill="both", expand=True)
         scrollbar_stats.pack(side="right", fill="y")
 
-        # Botão para atualizar estatísticas
-        ttk.Button(frame, text="Atualizar Estatísticas", command=self._atualizar_estatisticas).pack(pady=10)
+        botoes_frame = ttk.Frame(frame)
+        botoes_frame.pack(pady=10)
+        ttk.Button(botoes_frame, text="Atualizar Estatísticas", command=self._consultar_resumos_persistentes).pack(
+            side="left", padx=5)
+        ttk.Button(botoes_frame, text="Exportar Métricas (JSON)", command=self._exportar_metricas).pack(
+            side="left", padx=5)
+        ttk.Button(botoes_frame, text="Exportar Trace (Chrome)", command=self._exportar_trace).pack(
+            side="left", padx=5)
 
         self._atualizar_estatisticas()
+        self._consultar_resumos_persistentes()
+        self.root.after(self.INTERVALO_ESTATISTICAS_MS, self._atualizar_estatisticas_ao_vivo)
+
+    def _consultar_resumos_persistentes(self):
+        """Relê o histórico e os caches em segundo plano; pedidos durante uma consulta viram uma só a seguir"""
+        if self._consulta_resumos is not None:
+            self._consulta_resumos = 'pendente'
+            return
+        self._consulta_resumos = 'em_andamento'
+        threading.Thread(target=self._executar_consulta_resumos, name="resumos-estatisticas", daemon=True).start()
+
+    def _executar_consulta_resumos(self):
+        motor = self.motor
+        consultas = {
+            'historico': lambda: motor.historico_desempenho.resumo(),
+            'precisoes': lambda: motor.historico_desempenho.comparar_precisoes(),
+            'cache_transcricoes': lambda: motor.cache_transcricoes and motor.cache_transcricoes.resumo(),
+            'cache_audio': lambda: motor.cache_audio and motor.cache_audio.resumo(),
+        }
+        resumos = {}
+        for nome, consulta in consultas.items():
+            try:
+                resumos[nome] = consulta()
+            except Exception as e:
+                logging.warning(f"Não foi possível consultar as estatísticas ({nome}): {e}")
+                resumos[nome] = [f"Indisponível: {e}"]
+        self._na_interface(self._aplicar_resumos_persistentes, resumos)
+
+    def _aplicar_resumos_persistentes(self, resumos):
+        self._resumos_persistentes = resumos
+        pendente = self._consulta_resumos == 'pendente'
+        self._consulta_resumos = None
+        if pendente:
+            self._consultar_resumos_persistentes()
+        self._atualizar_estatisticas()
+
+    def _atualizar_estatisticas_ao_vivo(self):
+        try:
+            if self.notebook.select() == str(self.frame_stats):
+                self._atualizar_estatisticas()
+        finally:
+            self.root.after(self.INTERVALO_ESTATISTICAS_MS, self._atualizar_estatisticas_ao_vivo)
+
+    def _exportar_metricas(self):
+        caminho = filedialog.asksaveasfilename(title="Exportar métricas", defaultextension=".json",
+                                               initialfile="metricas_transcricao.json",
+                                               filetypes=[("JSON", "*.json")])
+        if caminho:
+            self._exportar_instrumentacao(INSTRUMENTACAO.exportar_json, caminho)
+
+    def _exportar_trace(self):
+        caminho = filedialog.asksaveasfilename(title="Exportar trace (chrome://tracing, Perfetto)",
+                                               defaultextension=".json", initialfile="trace_transcricao.json",
+                                               filetypes=[("JSON", "*.json")])
+        if caminho:
+            self._exportar_instrumentacao(INSTRUMENTACAO.exportar_trace, caminho)
+
+    def _exportar_instrumentacao(self, exportar, caminho):
+        try:
+            exportar(caminho)
+        except OSError as e:
+            messagebox.showerror("Erro", f"Não foi possível exportar para '{caminho}'. Erro: {e}")
+            return
+        self._inserir_detalhes(f"📈 Métricas exportadas para {caminho}")
 
     def _selecionar_pasta_saida(self):
         pasta = filedialog.askdirectory(title="Selecione a pasta de saída")
@@ -382,6 +668,25 @@ class TranscricaoAudio:
         self.incluir_subpastas.set(False)
         self.incluir_timestamps.set(False)
         self.pasta_saida_personalizada.set("")
+        self.decodificacao_streaming.set(False)
+        self.num_processos.set(1)
+        self.orcamento_memoria_mb.set(ORCAMENTO_MEMORIA_PADRAO_MB)
+        self.tempo_ocioso_min.set(TEMPO_OCIOSO_PADRAO_MIN)
+        self.cache_transcricoes.set(True)
+        self.tamanho_cache_mb.set(TAMANHO_CACHE_PADRAO_MB)
+        self.cache_audio.set(False)
+        self.tamanho_cache_audio_mb.set(TAMANHO_CACHE_AUDIO_PADRAO_MB)
+        self.retomar.set(False)
+        self.vad.set(False)
+        self.tamanho_lote.set(1)
+        self.agrupar_por_idioma.set(False)
+        self.prazo_min.set(0)
+        self.fator_tempo_real_alvo.set("0.0")
+        self.precisao.set(PRECISAO_PADRAO)
+        self.backend.set(BACKEND_PADRAO)
+        self.pre_carregar_modelo.set(True)
+        self.usar_servico.set(False)
+        self.url_servico.set(URL_PADRAO)
         self._atualizar_idioma_label()
         messagebox.showinfo("Sucesso", "Configurações restauradas para os valores padrão!")
 
@@ -393,8 +698,15 @@ class TranscricaoAudio:
     def _atualizar_descricao_modelo(self, event=None):
         descricao = self.MODELOS_DESCRICAO.get(self.modelo_escolhido.get(), "Descrição não disponível.")
         self.modelo_explicacao.config(text=descricao)
-        # Limpar status do modelo carregado quando trocar
-        if self.modelo_carregado_nome != self.modelo_escolhido.get():
+        # A troca não descarrega nada: o modelo anterior continua no cache
+        identificador = identificador_modelo(self.modelo_escolhido.get(), self.precisao.get(), self.backend.get())
+        if self.modelo_escolhido.get() == MODELO_AUTO:
+            self.status_modelo.config(text="Modelo escolhido a cada parte do lote", foreground="blue")
+        elif self.motor.cache_modelos.contem(identificador):
+            self.status_modelo.config(text="Modelo em cache", foreground="green")
+        elif self.motor.cache_modelos.carregando(identificador):
+            self.status_modelo.config(text="Carregando modelo em segundo plano...", foreground="orange")
+        else:
             self.status_modelo.config(text="Modelo não carregado", foreground="red")
 
     def _atualizar_estatisticas(self):
@@ -405,6 +717,32 @@ class TranscricaoAudio:
 • Sucessos: {self.estatisticas['sucessos']}
 • Erros: {self.estatisticas['erros']}
 • Tempo total de processamento: {self._formatar_tempo(self.estatisticas['tempo_total_processamento'])}
+• Áudio percorrido: {self._formatar_tempo(self.estatisticas['audio_processado'])}
+• Silêncio descartado (VAD): {self._formatar_silencio_descartado()}
+
+⛓️ Pipeline do último lote:
+{self._formatar_metricas_pipeline()}
+
+⏱️ Desempenho por etapa:
+{self._formatar_instrumentacao()}
+
+🚀 Inicialização:
+{self._formatar_inicializacao()}
+
+🤖 Histórico de desempenho desta máquina:
+{self._formatar_historico_desempenho()}
+
+⚖️ Precisão reduzida contra {PRECISAO_PADRAO}:
+{self._formatar_precisoes()}
+
+🧠 Cache de Modelos:
+{self._formatar_cache_modelos()}
+
+♻️ Cache de Transcrições:
+{self._formatar_cache_persistente('cache_transcricoes')}
+
+🎧 Cache de Áudio Decodificado:
+{self._formatar_cache_persistente('cache_audio')}
 
 ⚙️ Configuração Atual:
 • Modelo: {self.modelo_escolhido.get()}
@@ -412,10 +750,22 @@ class TranscricaoAudio:
 • Formato de saída: {self.formato_saida.get().upper()}
 • Temperatura: {self.temperatura.get()}
 • Duração do segmento: {self.segmento_duracao.get()}s
+• Decodificação em streaming: {'Sim' if self.decodificacao_streaming.get() else 'Não'}
+• Pular silêncio (VAD): {'Sim' if self.vad.get() else 'Não'}
+• Lote de inferência: {self.tamanho_lote.get()}
+• Agrupar lote por idioma: {'Sim' if self.agrupar_por_idioma.get() else 'Não'}
+• Processos paralelos: {self.num_processos.get()}
+• Precisão da inferência: {self.precisao.get()}
+• Backend de inferência: {self.backend.get()}
+• Prazo do lote (modelo auto): {f'{self.prazo_min.get()} min' if self.prazo_min.get() else 'Sem prazo'}
+• Retomar interrompidas: {'Sim' if self.retomar.get() else 'Não'}
+• Memória para modelos: {self.orcamento_memoria_mb.get()} MB (ociosos após {self.tempo_ocioso_min.get()} min)
+• Pré-carregar o modelo ao abrir: {'Sim' if self.pre_carregar_modelo.get() else 'Não'}
+• Serviço local: {self.url_servico.get() if self.usar_servico.get() else 'Não utilizado'}
 
 🖥️ Sistema:
 • OS: {platform.system()} {platform.release()}
-• FFmpeg disponível: {'Sim' if PYDUB_AVAILABLE else 'Não'}
+• FFmpeg disponível: {'Sim' if FFMPEG_DISPONIVEL else 'Não'}
 • Modelo carregado: {self.modelo_carregado_nome or 'Nenhum'}
 
 📅 Última atualização: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
@@ -426,52 +776,79 @@ class TranscricaoAudio:
         self.stats_text.insert("end", stats_text)
         self.stats_text.config(state=DISABLED)
 
+    def _formatar_metricas_pipeline(self):
+        if not self.motor.metricas_pipeline:
+            return "• Nenhum lote executado nesta sessão"
+        return "\n".join(f"• {metricas.resumo()}" for metricas in self.motor.metricas_pipeline)
+
+    def _formatar_instrumentacao(self):
+        linhas = INSTRUMENTACAO.resumo()
+        if not linhas:
+            return "• Nenhuma etapa medida nesta sessão"
+        return "\n".join(f"• {linha}" for linha in linhas)
+
+    def _formatar_inicializacao(self):
+        if self.tempo_inicializacao is None:
+            return "• Janela ainda não exibida"
+        etapas = INSTRUMENTACAO.para_dict()['etapas']
+        importacoes = etapas.get('importacoes', {}).get('total', 0.0)
+        return (f"• Janela interativa em {self.tempo_inicializacao:.2f}s "
+                f"(importações {importacoes:.2f}s, interface {self.tempo_inicializacao - importacoes:.2f}s)")
+
+    def _resumo_persistente(self, nome):
+        """Linhas da última consulta em segundo plano; None se ainda não houve nenhuma"""
+        return None if self._resumos_persistentes is None else self._resumos_persistentes[nome]
+
+    def _formatar_historico_desempenho(self):
+        linhas = self._resumo_persistente('historico')
+        if linhas is None:
+            return "• Consultando..."
+        if not linhas:
+            return "• Nenhuma transcrição medida nesta máquina"
+        return "\n".join(f"• {linha}" for linha in linhas)
+
+    def _formatar_precisoes(self):
+        linhas = (self._resumo_persistente('precisoes') or []) + self.motor.cache_modelos.comparar_precisoes()
+        if not linhas:
+            return f"• Nenhum modelo medido em {PRECISAO_PADRAO} e em outra precisão"
+        return "\n".join(f"• {linha}" for linha in linhas)
+
+    def _formatar_silencio_descartado(self):
+        audio = self.estatisticas['audio_processado']
+        silencio = self.estatisticas['silencio_descartado']
+        percentual = silencio / audio * 100 if audio else 0.0
+        return f"{self._formatar_tempo(silencio)} ({percentual:.0f}% do áudio)"
+
+    def _formatar_cache_modelos(self):
+        return "\n".join(f"• {linha}" for linha in self.motor.cache_modelos.resumo())
+
+    def _formatar_cache_persistente(self, nome):
+        if self._resumos_persistentes is None:
+            return "• Consultando..."
+        linhas = self._resumo_persistente(nome)
+        if not linhas:
+            return "• Desativado"
+        return "\n".join(f"• {linha}" for linha in linhas)
+
     def _formatar_tempo(self, segundos):
-        horas, resto = divmod(int(segundos), 3600)
-        minutos, segs = divmod(resto, 60)
-        return f"{horas:02d}:{minutos:02d}:{segs:02d}"
+        return formatar_tempo(segundos)
 
     def carregar_modelo(self):
-        if not PYDUB_AVAILABLE:
-            messagebox.showerror("Erro", "FFmpeg ou pydub não estão disponíveis. Não é possível carregar o modelo.")
+        if not FFMPEG_DISPONIVEL:
+            messagebox.showerror("Erro", "FFmpeg não está disponível. Não é possível carregar o modelo.")
             return None
 
-        modelo_selecionado = self.modelo_escolhido.get()
-
-        # Se o modelo já está carregado, retornar
-        if self.modelo_carregado and self.modelo_carregado_nome == modelo_selecionado:
-            return self.modelo_carregado
-
-        logging.info(f"Carregando o modelo '{modelo_selecionado}'...")
-        self._inserir_detalhes(f"🔄 Carregando modelo: {modelo_selecionado}...")
-        self.status_modelo.config(text="Carregando modelo...", foreground="orange")
-        self.root.update_idletasks()
-
+        self.motor.opcoes = self._opcoes_atuais()
         try:
-            # Limpar modelo anterior
-            self.modelo_carregado = None
-            self.modelo_carregado_nome = None
-
-            # Carregar novo modelo
-            self.modelo_carregado = whisper.load_model(modelo_selecionado)
-            self.modelo_carregado_nome = modelo_selecionado
-
-            self.status_modelo.config(text=f"✅ Modelo {modelo_selecionado} carregado", foreground="green")
-            self._inserir_detalhes(f"✅ Modelo carregado com sucesso: {modelo_selecionado}")
-
-            return self.modelo_carregado
-
+            return self.motor.carregar_modelo()
         except Exception as e:
-            error_msg = f"Não foi possível carregar o modelo '{modelo_selecionado}'. Erro: {e}"
+            error_msg = f"Não foi possível carregar o modelo '{self.motor.opcoes.modelo}'. Erro: {e}"
             messagebox.showerror("Erro de Carregamento", error_msg)
-            logging.error(f"Erro ao carregar o modelo '{modelo_selecionado}': {e}")
-            self._inserir_detalhes(f"❌ Falha ao carregar modelo: {modelo_selecionado} - {e}")
-            self.status_modelo.config(text="❌ Erro ao carregar modelo", foreground="red")
             return None
 
     def iniciar_transcricao(self):
-        if not PYDUB_AVAILABLE:
-            messagebox.showerror("Erro", "FFmpeg ou pydub não estão disponíveis. Não é possível iniciar a transcrição.")
+        if not FFMPEG_DISPONIVEL:
+            messagebox.showerror("Erro", "FFmpeg não está disponível. Não é possível iniciar a transcrição.")
             return
 
         self._limpar_detalhes()
@@ -479,303 +856,289 @@ class TranscricaoAudio:
         caminho_audio = filedialog.askopenfilename(title="Selecione o arquivo de áudio", filetypes=tipos_arquivo)
 
         if caminho_audio:
-            modelo = self.carregar_modelo()
-            if modelo is None:
+            if self.usar_servico.get():
+                self._iniciar_no_servico([caminho_audio])
                 return
 
+            # O modelo é carregado pelo motor só se a transcrição não estiver no cache
+            self.motor.opcoes = self._opcoes_atuais()
             self._set_transcription_controls_state(True)
-            self.cancel_event.clear()
-            self.pause_event.clear()
-            self.total_bytes = os.path.getsize(caminho_audio)
-            self.processed_bytes = 0
-            self.start_time = time.time()
-            threading.Thread(target=self.transcrever_audio, args=(modelo, caminho_audio, 1, 1), daemon=True).start()
+            threading.Thread(target=self._executar_transcricao, args=(caminho_audio,), daemon=True).start()
         else:
             self.progresso_text_label.config(text="Nenhum arquivo selecionado.")
 
     def iniciar_transcricao_em_lote(self):
-        if not PYDUB_AVAILABLE:
+        if not FFMPEG_DISPONIVEL:
             messagebox.showerror("Erro",
-                                 "FFmpeg ou pydub não estão disponíveis. Não é possível iniciar a transcrição em lote.")
+                                 "FFmpeg não está disponível. Não é possível iniciar a transcrição em lote.")
             return
 
         self._limpar_detalhes()
         pasta = filedialog.askdirectory(title="Selecione a pasta com os arquivos de áudio")
 
         if pasta:
-            arquivos_audio = self._selecionar_arquivos_audio(pasta)
+            incluir_subpastas = self.incluir_subpastas.get()
+            if self.usar_servico.get():
+                arquivos_audio = listar_arquivos_audio(pasta, incluir_subpastas)
+            else:
+                # Só o começo da varredura para a prévia; o motor termina de varrer enquanto transcreve
+                arquivos_audio = list(islice(varrer_arquivos_audio(pasta, EXTENSOES_AUDIO, incluir_subpastas), 11))
             if not arquivos_audio:
                 self.progresso_text_label.config(text="Nenhum arquivo de áudio encontrado na pasta selecionada.")
                 return
 
             # Mostrar prévia dos arquivos encontrados
-            preview = f"Encontrados {len(arquivos_audio)} arquivo(s):\n\n"
+            if self.usar_servico.get() or len(arquivos_audio) <= 10:
+                preview = f"Encontrados {len(arquivos_audio)} arquivo(s):\n\n"
+            else:
+                preview = "Encontrados mais de 10 arquivos (a pasta segue sendo varrida durante a transcrição):\n\n"
             for i, arquivo in enumerate(arquivos_audio[:10]):  # Mostrar apenas os primeiros 10
                 preview += f"• {os.path.basename(arquivo)}\n"
-            if len(arquivos_audio) > 10:
+            if self.usar_servico.get() and len(arquivos_audio) > 10:
                 preview += f"... e mais {len(arquivos_audio) - 10} arquivo(s)"
 
             if not messagebox.askyesno("Confirmar Transcrição em Lote", preview):
                 return
 
-            modelo = self.carregar_modelo()
-            if modelo is None:
+            if self.usar_servico.get():
+                self._iniciar_no_servico(arquivos_audio)
                 return
 
+            # O motor carrega o modelo só para os arquivos fora do cache (ou em cada processo do pool)
+            self.motor.opcoes = self._opcoes_atuais()
             self._set_transcription_controls_state(True)
-            self.cancel_event.clear()
-            self.pause_event.clear()
-            self.total_bytes = sum(os.path.getsize(arquivo) for arquivo in arquivos_audio)
-            self.processed_bytes = 0
-            self.start_time = time.time()
-            threading.Thread(target=self.processar_em_lote, args=(modelo, arquivos_audio), daemon=True).start()
+            threading.Thread(target=self._executar_lote, args=(pasta, incluir_subpastas), daemon=True).start()
         else:
             self.progresso_text_label.config(text="Nenhuma pasta selecionada.")
 
-    def _selecionar_arquivos_audio(self, pasta):
-        arquivos_audio = []
-        extensoes = [ext.value.lower() for ext in AudioExtension]
+    def _executar_transcricao(self, caminho_audio):
+        try:
+            self.motor.transcrever(caminho_audio)
+        except Exception as e:
+            logging.error(f"Erro na transcrição de '{caminho_audio}': {e}", exc_info=True)
+            self._na_interface(messagebox.showerror, "Erro", f"Não foi possível transcrever o arquivo. Erro: {e}")
+        finally:
+            self._na_interface(self._ao_fim_execucao, "Transcrição concluída! Pronto para nova transcrição.")
 
-        if self.incluir_subpastas.get():
-            for root_dir, _, files in os.walk(pasta):
-                for f in files:
-                    if any(f.lower().endswith(ext) for ext in extensoes):
-                        arquivos_audio.append(os.path.join(root_dir, f))
-        else:
-            for f in os.listdir(pasta):
-                if any(f.lower().endswith(ext) for ext in extensoes):
-                    arquivos_audio.append(os.path.join(pasta, f))
+    def _executar_lote(self, pasta, incluir_subpastas):
+        try:
+            self.motor.processar_pasta(pasta, incluir_subpastas)
+        except Exception as e:
+            logging.error(f"Erro no processamento em lote: {e}", exc_info=True)
+            self._na_interface(self._inserir_detalhes, f"❌ Erro no processamento em lote: {e}")
+        finally:
+            self._na_interface(self._ao_fim_execucao)
 
-        return sorted(arquivos_audio)  # Ordenar por nome
+    def _ao_fim_execucao(self, mensagem=None):
+        if mensagem:
+            self.progresso_text_label.config(text=mensagem)
+        self.eta_label.config(text="")
+        self._set_transcription_controls_state(False)
 
-    def transcrever_audio(self, modelo, caminho_audio, indice, total, ultimo_arquivo=False):
-        if modelo is None:
-            self.progresso_text_label.config(text="Erro: Modelo Whisper não carregado.")
-            self._set_transcription_controls_state(False)
+    def _iniciar_no_servico(self, arquivos_audio):
+        """Envia o trabalho ao serviço local, que já mantém o modelo carregado"""
+        cliente = ClienteServico(self.url_servico.get())
+        try:
+            self.job_servico = (cliente, cliente.submeter(arquivos_audio, self._opcoes_atuais()))
+        except OSError as e:
+            messagebox.showerror("Serviço Indisponível",
+                                 f"Não foi possível falar com o serviço em {self.url_servico.get()}. Erro: {e}")
             return
 
-        arquivo_nome = os.path.basename(caminho_audio)
-        pos_inicial = self._inserir_detalhes(f"🎵 Iniciando transcrição: {arquivo_nome}")
-        segment_duration = self.segmento_duracao.get()
-        transcricao_completa = ""
-        temp_file_path = None
-        arquivo_inicio = time.time()
+        self.servico_pausado = False
+        self._set_transcription_controls_state(True)
+        self._inserir_detalhes(f"📨 Trabalho enviado ao serviço local ({len(arquivos_audio)} arquivo(s))")
+        threading.Thread(target=self._acompanhar_servico, daemon=True).start()
 
+    def _acompanhar_servico(self):
+        cliente, job_id = self.job_servico
         try:
-            # Informações do arquivo
-            tamanho_mb = os.path.getsize(caminho_audio) / (1024 * 1024)
-            self._inserir_detalhes(f"📄 Arquivo: {arquivo_nome} ({tamanho_mb:.1f} MB)")
+            fim = cliente.acompanhar(job_id, self._ao_evento_motor)
+            if fim['erro']:
+                self._na_interface(self._inserir_detalhes, f"❌ Erro no serviço: {fim['erro']}")
+        except OSError as e:
+            logging.error(f"Conexão com o serviço perdida: {e}")
+            self._na_interface(self._inserir_detalhes, f"❌ Conexão com o serviço perdida: {e}")
+        finally:
+            self.job_servico = None
+            self._na_interface(self._ao_fim_execucao)
 
-            audio = AudioSegment.from_file(caminho_audio)
-            duration = len(audio) / 1000  # Duração total em segundos
-            segments_count = int(duration / segment_duration) + (1 if duration % segment_duration > 0 else 0)
+    # --- Canal entre as threads de trabalho e a interface ---
+    def _ao_evento_motor(self, evento):
+        """Recebe os eventos do motor (em qualquer thread) e os enfileira para a thread do Tk"""
+        self._fila_interface.put(('evento', evento))
 
-            self._inserir_detalhes(f"⏱️ Duração: {self._formatar_tempo(duration)} | Segmentos: {segments_count}")
+    def _na_interface(self, funcao, *args):
+        """Agenda `funcao(*args)` na thread do Tk; threads de trabalho não tocam nos widgets"""
+        self._fila_interface.put(('chamada', (funcao, args)))
 
-            self.progresso_barra['value'] = 0
-            self.progresso_text_label.config(text=f"Transcrevendo: {arquivo_nome}...")
+    def _drenar_fila_interface(self):
+        """Aplica as mensagens pendentes uma vez por quadro.
 
-            # Configurações do Whisper
-            idioma = None if self.idioma_escolhido.get() == "auto" else self.idioma_escolhido.get()
-            temperatura = float(self.temperatura.get())
-
-            for i, start_time_sec in enumerate(range(0, int(duration), segment_duration)):
-                if self.cancel_event.is_set():
-                    self.progresso_text_label.config(text="Transcrição cancelada.")
-                    self._substituir_detalhes(pos_inicial, f"❌ Transcrição cancelada: {arquivo_nome}")
-                    return
-
-                while self.pause_event.is_set():
-                    self.root.update_idletasks()
-                    time.sleep(0.1)
-
-                end_time_sec = min(start_time_sec + segment_duration, duration)
-                segment = audio[start_time_sec * 1000:end_time_sec * 1000]
-
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                    temp_file_path = temp_file.name
-                    segment.export(temp_file_path, format="wav")
-
-                # Transcreve o segmento com configurações avançadas
-                result = modelo.transcribe(
-                    temp_file_path,
-                    language=idioma,
-                    temperature=temperatura,
-                    task="transcribe"
-                )
-
-                # Adicionar timestamps se solicitado
-                if self.incluir_timestamps.get():
-                    timestamp = f"[{self._formatar_tempo(start_time_sec)} -> {self._formatar_tempo(end_time_sec)}] "
-                    transcricao_completa += timestamp + result["text"] + "\n\n"
-                else:
-                    transcricao_completa += result["text"] + " "
-
-                # Remove o arquivo temporário imediatamente
-                if temp_file_path and os.path.exists(temp_file_path):
-                    os.remove(temp_file_path)
-                    temp_file_path = None
-
-                # Atualizar progresso
-                progresso_segmento = ((i + 1) / segments_count) * 100
-                self.progresso_barra['value'] = progresso_segmento
-
-                # Calcular ETA
-                elapsed = time.time() - arquivo_inicio
-                if i > 0:
-                    eta_total = (elapsed / (i + 1)) * segments_count - elapsed
-                    self.eta_label.config(text=f"TEMPO RESTANTE: {self._formatar_tempo(eta_total)}")
-
-                self.root.update_idletasks()
-
-        except FileNotFoundError:
-            messagebox.showerror("Erro", f"Arquivo não encontrado: {arquivo_nome}")
-            logging.error(f"Arquivo não encontrado: {caminho_audio}")
-            self._substituir_detalhes(pos_inicial, f"❌ Erro: Arquivo não encontrado: {arquivo_nome}")
-            self.estatisticas['erros'] += 1
-        except Exception as e:
-            messagebox.showerror("Erro de Transcrição", f"Erro ao transcrever '{arquivo_nome}'. Erro: {e}")
-            logging.error(f"Erro na transcrição de '{caminho_audio}': {e}", exc_info=True)
-            self._substituir_detalhes(pos_inicial, f"❌ Erro na transcrição: {arquivo_nome} - {e}")
-            self.estatisticas['erros'] += 1
+        Eventos de progresso consecutivos são reduzidos ao último de cada tipo; antes de
+        qualquer outra mensagem, o progresso acumulado é aplicado para manter a ordem.
+        """
+        pendentes = self._fila_interface.qsize()
+        try:
+            if pendentes:
+                with INSTRUMENTACAO.medir('interface', mensagens=pendentes):
+                    self._aplicar_mensagens(pendentes)
         finally:
-            # Garantir limpeza do arquivo temporário
-            if temp_file_path and os.path.exists(temp_file_path):
-                try:
-                    os.remove(temp_file_path)
-                except:
-                    pass
-
-            if not self.cancel_event.is_set():
-                if transcricao_completa.strip():
-                    tempo_arquivo = time.time() - arquivo_inicio
-                    self.salvar_transcricao(transcricao_completa, caminho_audio, self.formato_saida.get())
-                    self.processed_bytes += os.path.getsize(caminho_audio)
-                    self._atualizar_progresso(indice, total)
-                    self._substituir_detalhes(pos_inicial,
-                                              f"✅ Transcrito com sucesso: {arquivo_nome} ({self._formatar_tempo(tempo_arquivo)})")
-                    self.estatisticas['sucessos'] += 1
-                    self.estatisticas['tempo_total_processamento'] += tempo_arquivo
-                else:
-                    self.progresso_text_label.config(text=f"Transcrição vazia para {arquivo_nome}. Verifique o áudio.")
-                    self._substituir_detalhes(pos_inicial, f"⚠️ Transcrição vazia: {arquivo_nome}")
-
-            self.estatisticas['arquivos_processados'] += 1
-
-            # Verificar se deve reabilitar controles
-            if ultimo_arquivo or self.cancel_event.is_set() or indice == total:
-                self.progresso_text_label.config(text="Transcrição concluída! Pronto para nova transcrição.")
-                self.eta_label.config(text="")
-                self._set_transcription_controls_state(False)
-
-    def _atualizar_progresso(self, indice, total):
-        elapsed_time = time.time() - self.start_time
-        progresso_percentual = (self.processed_bytes / self.total_bytes) * 100 if self.total_bytes > 0 else 0
-        self.progresso_barra['value'] = progresso_percentual
-
-        # ETA para processamento em lote
-        if indice > 0 and total > 1:
-            eta_restante = (elapsed_time / indice) * (total - indice)
-            eta_text = f"ETA total: {self._formatar_tempo(eta_restante)}"
-        else:
-            eta_text = ""
+            self.root.after(self.INTERVALO_QUADRO_MS, self._drenar_fila_interface)
+
+    def _aplicar_mensagens(self, pendentes):
+        progresso = {}
+        # Só o que já estava na fila: um produtor rápido não prende a thread do Tk aqui
+        for _ in range(pendentes):
+            tipo, conteudo = self._fila_interface.get_nowait()
+            if tipo == 'evento' and conteudo['tipo'] in self.EVENTOS_PROGRESSO:
+                progresso[conteudo['tipo']] = conteudo
+                continue
+            self._aplicar_progresso(progresso)
+            if tipo == 'evento':
+                self._aplicar_mensagem(self._aplicar_evento, conteudo)
+            else:
+                funcao, args = conteudo
+                self._aplicar_mensagem(funcao, *args)
+        self._aplicar_progresso(progresso)
 
-        progresso_text = f"{progresso_percentual:.0f}% [{indice}/{total}] Tempo: {self._formatar_tempo(elapsed_time)}"
-        self.progresso_text_label.config(text=progresso_text)
-        self.eta_label.config(text=eta_text)
-        self.root.update_idletasks()
+    def _aplicar_progresso(self, progresso):
+        for evento in progresso.values():
+            self._aplicar_mensagem(self._aplicar_evento, evento)
+        progresso.clear()
 
-    def salvar_transcricao(self, texto_transcrito, caminho_audio, formato='docx'):
-        # Determinar pasta de saída
-        if self.pasta_saida_personalizada.get():
-            pasta_saida = self.pasta_saida_personalizada.get()
-        else:
-            pasta_saida = os.path.dirname(caminho_audio)
+    @staticmethod
+    def _aplicar_mensagem(funcao, *args):
+        try:
+            funcao(*args)
+        except Exception as e:
+            # Uma mensagem com erro não deve impedir as seguintes
+            logging.error(f"Erro ao atualizar a interface: {e}", exc_info=True)
+
+    def _aplicar_evento(self, evento):
+        """Traduz os eventos do motor em atualizações da interface (sempre na thread do Tk)"""
+        tipo = evento['tipo']
+
+        if tipo == 'modelo':
+            if evento['estado'] == 'carregando':
+                self.status_modelo.config(text="Carregando modelo...", foreground="orange")
+            elif evento['estado'] == 'carregado':
+                self.status_modelo.config(text=f"✅ Modelo {evento['modelo']} carregado", foreground="green")
+            else:
+                self.status_modelo.config(text="❌ Erro ao carregar modelo", foreground="red")
 
-        nome_arquivo = os.path.splitext(os.path.basename(caminho_audio))[0]
-        modelo = self.modelo_escolhido.get()
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        elif tipo == 'detalhe':
+            self._inserir_detalhes(evento['mensagem'])
 
-        if formato == 'srt':
-            # Para SRT, precisamos dos timestamps
-            caminho_saida = os.path.join(pasta_saida, f"{nome_arquivo}_transcrito_{modelo}_{timestamp}.srt")
-        else:
-            caminho_saida = os.path.join(pasta_saida, f"{nome_arquivo}_transcrito_{modelo}_{timestamp}.{formato}")
+        elif tipo == 'arquivo_inicio':
+            arquivo_nome = os.path.basename(evento['caminho'])
+            self.posicoes_detalhes[evento['caminho']] = self._inserir_detalhes(
+                f"🎵 Iniciando transcrição: {arquivo_nome}", marcar=True)
+            self._inserir_detalhes(f"📄 Arquivo: {arquivo_nome} ({evento['tamanho_mb']:.1f} MB)")
+            self.progresso_barra['value'] = 0
+            self.progresso_text_label.config(text=f"Transcrevendo: {arquivo_nome}...")
 
-        try:
-            # Criar pasta se não existir
-            os.makedirs(pasta_saida, exist_ok=True)
-
-            if formato == 'txt':
-                with open(caminho_saida, 'w', encoding='utf-8') as f:
-                    header = f"=== TRANSCRIÇÃO DE ÁUDIO ===\n"
-                    header += f"Arquivo: {os.path.basename(caminho_audio)}\n"
-                    header += f"Modelo: {modelo}\n"
-                    header += f"Data: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n"
-                    header += f"Idioma: {self.IDIOMAS_WHISPER.get(self.idioma_escolhido.get(), 'Auto')}\n"
-                    header += "=" * 50 + "\n\n"
-                    f.write(header + texto_transcrito)
-
-            elif formato == 'markdown':
-                with open(caminho_saida, 'w', encoding='utf-8') as f:
-                    header = f"# Transcrição de {nome_arquivo}\n\n"
-                    header += f"**Modelo:** {modelo}  \n"
-                    header += f"**Data:** {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}  \n"
-                    header += f"**Idioma:** {self.IDIOMAS_WHISPER.get(self.idioma_escolhido.get(), 'Auto')}  \n\n"
-                    header += "---\n\n## Conteúdo\n\n"
-                    f.write(header + texto_transcrito)
-
-            elif formato == 'srt':
-                with open(caminho_saida, 'w', encoding='utf-8') as f:
-                    # Converter para formato SRT básico
-                    if self.incluir_timestamps.get():
-                        f.write(texto_transcrito)
-                    else:
-                        f.write("1\n00:00:00,000 --> 99:59:59,999\n" + texto_transcrito.strip() + "\n")
-
-            else:  # docx
-                doc = Document()
-                doc.add_heading(f"Transcrição de {nome_arquivo}", level=1)
-
-                # Adicionar metadados
-                info_table = doc.add_table(rows=4, cols=2)
-                info_table.style = 'Table Grid'
-
-                cells = info_table.rows[0].cells
-                cells[0].text = "Modelo Whisper"
-                cells[1].text = modelo
-
-                cells = info_table.rows[1].cells
-                cells[0].text = "Data da Transcrição"
-                cells[1].text = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
-
-                cells = info_table.rows[2].cells
-                cells[0].text = "Idioma"
-                cells[1].text = self.IDIOMAS_WHISPER.get(self.idioma_escolhido.get(), 'Auto')
-
-                cells = info_table.rows[3].cells
-                cells[0].text = "Arquivo Original"
-                cells[1].text = os.path.basename(caminho_audio)
-
-                doc.add_paragraph("")  # Espaço
-                doc.add_heading("Conteúdo da Transcrição", level=2)
-                doc.add_paragraph(texto_transcrito)
-                doc.save(caminho_saida)
-
-            logging.info(f"Transcrição salva no arquivo: {caminho_saida}")
-
-            # Perguntar se quer abrir a pasta apenas no final da transcrição individual
-            # ou no último arquivo do lote
-            if messagebox.askyesno("Transcrição Concluída",
-                                   f"Transcrição de '{nome_arquivo}' salva com sucesso!\n\n"
-                                   f"Local: {caminho_saida}\n\n"
+        elif tipo == 'arquivo_info':
+            if evento['segmentos']:
+                self._inserir_detalhes(
+                    f"⏱️ Duração: {self._formatar_tempo(evento['duracao'])} | Segmentos: {evento['segmentos']}")
+            elif evento['duracao']:
+                self._inserir_detalhes(
+                    f"⏱️ Duração: {self._formatar_tempo(evento['duracao'])} | Segmentos definidos pelas pausas")
+            else:
+                self._inserir_detalhes("⏱️ Duração desconhecida; transcrevendo à medida que o áudio é decodificado")
+
+        elif tipo == 'segmento':
+            arquivo_nome = os.path.basename(evento['caminho'])
+            # Sem duração conhecida, apenas o tempo de áudio já transcrito
+            if evento['progresso'] is None:
+                self.progresso_text_label.config(
+                    text=f"Transcrevendo: {arquivo_nome}... {self._formatar_tempo(evento['fim'])} de áudio")
+            else:
+                self.progresso_barra['value'] = evento['progresso']
+                if evento['eta'] is not None:
+                    self.eta_label.config(text=f"TEMPO RESTANTE: {self._formatar_tempo(evento['eta'])}")
+
+        elif tipo == 'arquivo_fim':
+            self._ao_fim_arquivo(evento)
+            self._consultar_resumos_persistentes()  # Histórico e caches mudam a cada arquivo concluído
+
+        elif tipo == 'progresso_lote':
+            self.progresso_barra['value'] = evento['percentual']
+            eta_text = f"ETA total: {self._formatar_tempo(evento['eta'])}" if evento['eta'] is not None else ""
+            progresso_text = (f"{evento['percentual']:.0f}% [{evento['indice']}/{evento['total']}] "
+                              f"Tempo: {self._formatar_tempo(evento['decorrido'])}")
+            self.progresso_text_label.config(text=progresso_text)
+            self.eta_label.config(text=eta_text)
+
+        elif tipo == 'lote_inicio':
+            self.em_lote = True
+            self.ultima_pasta_saida = None
+
+        elif tipo == 'lote_fim':
+            self.em_lote = False
+            if evento['cancelado']:
+                self.progresso_text_label.config(text="Processo de lote cancelado.")
+            else:
+                self.progresso_text_label.config(
+                    text=f"Lote concluído! {evento['sucessos']} sucessos, {evento['erros']} erros.")
+                self._inserir_detalhes(
+                    f"🎉 Processamento em lote concluído em {self._formatar_tempo(evento['tempo_total'])}")
+                self._inserir_detalhes(f"📊 Resumo: {evento['sucessos']} sucessos, {evento['erros']} erros")
+            for linha in evento['metricas']:
+                self._inserir_detalhes(f"⛓️ {linha}")
+            if not evento['cancelado']:
+                # Depois do quadro atual, para que as últimas mensagens do lote já estejam no painel
+                self.root.after_idle(self._mostrar_resumo_lote, evento)
+
+    def _ao_fim_arquivo(self, evento):
+        caminho_audio = evento['caminho']
+        arquivo_nome = os.path.basename(caminho_audio)
+        pos_inicial = self.posicoes_detalhes.pop(caminho_audio, None)
+        if pos_inicial is None:
+            pos_inicial = self._inserir_detalhes(f"🎵 {arquivo_nome}", marcar=True)
+
+        if evento['status'] == 'sucesso':
+            self._substituir_detalhes(pos_inicial,
+                                      f"✅ Transcrito com sucesso: {arquivo_nome} "
+                                      f"({self._formatar_tempo(evento['tempo'])})")
+            if self.em_lote:
+                self.ultima_pasta_saida = os.path.dirname(evento['saida'])
+            # Perguntar se quer abrir a pasta onde a transcrição foi salva
+            elif messagebox.askyesno("Transcrição Concluída",
+                                   f"Transcrição de '{arquivo_nome}' salva com sucesso!\n\n"
+                                   f"Local: {evento['saida']}\n\n"
                                    f"Deseja abrir a pasta onde o arquivo foi salvo?"):
-                self.abrir_pasta(pasta_saida)
-
-        except Exception as e:
-            messagebox.showerror("Erro ao Salvar",
-                                 f"Não foi possível salvar a transcrição para '{nome_arquivo}'. Erro: {e}")
-            logging.error(f"Erro ao salvar transcrição para '{caminho_audio}': {e}")
+                self.abrir_pasta(os.path.dirname(evento['saida']))
+        elif evento['status'] == 'cancelado':
+            self.progresso_text_label.config(text="Transcrição cancelada.")
+            self._substituir_detalhes(pos_inicial, f"❌ Transcrição cancelada: {arquivo_nome}")
+        elif evento['status'] == 'vazio':
+            self.progresso_text_label.config(text=f"Transcrição vazia para {arquivo_nome}. Verifique o áudio.")
+            self._substituir_detalhes(pos_inicial, f"⚠️ Transcrição vazia: {arquivo_nome}")
+        else:
+            if not self.em_lote:
+                messagebox.showerror("Erro de Transcrição",
+                                     f"Erro ao transcrever '{arquivo_nome}'. Erro: {evento['erro']}")
+            self._substituir_detalhes(pos_inicial, f"❌ Erro na transcrição: {arquivo_nome} - {evento['erro']}")
+
+    def _mostrar_resumo_lote(self, evento):
+        """Único diálogo do lote: contagens, falhas e a opção de abrir a pasta de saída"""
+        texto = (f"Lote concluído em {self._formatar_tempo(evento['tempo_total'])}.\n\n"
+                 f"{evento['sucessos']} sucesso(s), {evento['erros']} erro(s).")
+        falhas = evento.get('falhas') or []
+        if falhas:
+            texto += "\n\nFalhas:\n" + "\n".join(f"• {os.path.basename(falha['caminho'])}: {falha['erro']}"
+                                                 for falha in falhas[:self.MAX_FALHAS_RESUMO])
+            if len(falhas) > self.MAX_FALHAS_RESUMO:
+                texto += f"\n... e mais {len(falhas) - self.MAX_FALHAS_RESUMO} (veja o painel de detalhes)"
+        if self.ultima_pasta_saida:
+            if messagebox.askyesno("Lote Concluído", f"{texto}\n\nDeseja abrir a pasta de saída?"):
+                self.abrir_pasta(self.ultima_pasta_saida)
+        elif falhas:
+            messagebox.showwarning("Lote Concluído", texto)
+        else:
+            messagebox.showinfo("Lote Concluído", texto)
 
     def abrir_pasta(self, caminho_pasta):
         try:
@@ -789,56 +1152,32 @@ class TranscricaoAudio:
             logging.error(f"Falha ao abrir a pasta '{caminho_pasta}': {e}")
             messagebox.showerror("Erro", f"Não foi possível abrir a pasta: {e}")
 
-    def processar_em_lote(self, modelo, arquivos_audio):
-        if modelo is None:
-            self.progresso_text_label.config(text="Erro: Modelo Whisper não carregado para transcrição em lote.")
-            self._set_transcription_controls_state(False)
-            return
-
-        total = len(arquivos_audio)
-        inicio_lote = time.time()
-        self._inserir_detalhes(f"🚀 Iniciando processamento em lote de {total} arquivo(s)")
-
-        for index, caminho_audio in enumerate(arquivos_audio):
-            if self.cancel_event.is_set():
-                self.progresso_text_label.config(text="Processo de lote cancelado.")
-                break
-
-            while self.pause_event.is_set():
-                self.root.update_idletasks()
-                time.sleep(0.1)
-
-            ultimo_arquivo = index == total - 1
-            self.transcrever_audio(modelo, caminho_audio, index + 1, total, ultimo_arquivo=ultimo_arquivo)
-
-        # Resumo final
-        tempo_total = time.time() - inicio_lote
-        if not self.cancel_event.is_set():
-            self.progresso_text_label.config(
-                text=f"Lote concluído! {self.estatisticas['sucessos']} sucessos, {self.estatisticas['erros']} erros.")
-            self._inserir_detalhes(f"🎉 Processamento em lote concluído em {self._formatar_tempo(tempo_total)}")
-            self._inserir_detalhes(
-                f"📊 Resumo: {self.estatisticas['sucessos']} sucessos, {self.estatisticas['erros']} erros")
-
-        self._set_transcription_controls_state(False)
-
     def cancelar_processo(self):
-        self.cancel_event.set()
-        logging.info("Sinal de cancelamento enviado para o processo de transcrição.")
+        if self.job_servico:
+            cliente, job_id = self.job_servico
+            cliente.cancelar(job_id)
+        self.motor.cancelar()
         self.progresso_text_label.config(text="Cancelando transcrição...")
         self.botao_pausar.config(text="Pausar")
-        self.pause_event.clear()
 
     def pausar_processo(self):
-        if self.pause_event.is_set():
-            self.pause_event.clear()
+        if self.job_servico:
+            cliente, job_id = self.job_servico
+            if self.servico_pausado:
+                cliente.retomar(job_id)
+            else:
+                cliente.pausar(job_id)
+            self.servico_pausado = not self.servico_pausado
+            self.botao_pausar.config(text="Continuar" if self.servico_pausado else "Pausar")
+            return
+
+        if self.motor.pausado:
+            self.motor.retomar()
             novo_texto = "Pausar"
-            logging.info("Processo de transcrição retomado.")
             self.progresso_text_label.config(text="Transcrição retomada.")
         else:
-            self.pause_event.set()
+            self.motor.pausar()
             novo_texto = "Continuar"
-            logging.info("Processo de transcrição pausado.")
             self.progresso_text_label.config(text="Transcrição pausada.")
 
         self.botao_pausar.config(text=novo_texto)
@@ -859,25 +1198,47 @@ class TranscricaoAudio:
             self.botao_pausar.config(state=DISABLED)
             # Reset do botão pausar
             self.botao_pausar.config(text="Pausar")
-            self.pause_event.clear()
+            self.motor.liberado_event.set()
 
-    def _inserir_detalhes(self, mensagem):
+    def _inserir_detalhes(self, mensagem, marcar=False):
+        """Acrescenta uma linha ao painel; com `marcar`, retorna a marca usada em _substituir_detalhes"""
         self.detalhes_text.config(state=NORMAL)
-        pos_inicial = self.detalhes_text.index("end-1c")
+        marca = None
+        if marcar:
+            # Uma marca acompanha a linha mesmo quando as linhas antigas são descartadas
+            self._contador_marcas += 1
+            marca = f"linha{self._contador_marcas}"
+            self.detalhes_text.mark_set(marca, "end-1c")
+            self.detalhes_text.mark_gravity(marca, "left")
         timestamp = datetime.now().strftime('%H:%M:%S')
         self.detalhes_text.insert("end", f"[{timestamp}] {mensagem}\n")
+        self._limitar_detalhes()
         self.detalhes_text.config(state=DISABLED)
         self.detalhes_text.see("end")
-        return pos_inicial
+        return marca
 
-    def _substituir_detalhes(self, pos_inicial, mensagem):
+    def _limitar_detalhes(self):
+        """Mantém no painel só as MAX_LINHAS_DETALHES linhas mais recentes (buffer circular)"""
+        linhas = int(self.detalhes_text.index("end-1c").split(".")[0]) - 1
+        excedente = linhas - self.MAX_LINHAS_DETALHES
+        if excedente <= 0:
+            return
+        corte = f"{excedente + 1}.0"
+        for marca in self.posicoes_detalhes.values():
+            if marca in self.detalhes_text.mark_names() and self.detalhes_text.compare(marca, "<", corte):
+                self.detalhes_text.mark_unset(marca)
+        self.detalhes_text.delete("1.0", corte)
+
+    def _substituir_detalhes(self, marca, mensagem):
+        if marca not in self.detalhes_text.mark_names():
+            # A linha original já saiu do painel
+            self._inserir_detalhes(mensagem)
+            return
         self.detalhes_text.config(state=NORMAL)
-        try:
-            self.detalhes_text.delete(pos_inicial, f"{pos_inicial} lineend")
-        except:
-            pass
+        self.detalhes_text.delete(marca, f"{marca} lineend")
         timestamp = datetime.now().strftime('%H:%M:%S')
-        self.detalhes_text.insert(pos_inicial, f"[{timestamp}] {mensagem}\n")
+        self.detalhes_text.insert(marca, f"[{timestamp}] {mensagem}")
+        self.detalhes_text.mark_unset(marca)
         self.detalhes_text.config(state=DISABLED)
         self.detalhes_text.see("end")
 
@@ -892,6 +1253,9 @@ class TranscricaoAudio:
     def _limpar_detalhes(self):
         self.detalhes_text.config(state=NORMAL)
         self.detalhes_text.delete(1.0, "end")
+        for marca in self.posicoes_detalhes.values():
+            self.detalhes_text.mark_unset(marca)
+        self.posicoes_detalhes.clear()
         self.detalhes_text.config(state=DISABLED)
 
     def _fechar_aplicacao(self):
@@ -902,15 +1266,37 @@ class TranscricaoAudio:
         if str(self.botao_cancelar.cget('state')) != DISABLED:
             if messagebox.askyesno("Fechar Aplicação",
                                    "Há uma transcrição em andamento. Deseja cancelar e fechar?"):
-                self.cancel_event.set()
+                self.motor.cancelar()
             else:
                 return
 
         self.root.quit()
 
+    def _ao_exibir_janela(self):
+        """Primeira volta ociosa do laço do Tk: a janela já está desenhada e responde"""
+        self.tempo_inicializacao = time.perf_counter() - _INICIO
+        INSTRUMENTACAO.registrar('inicializacao', _INICIO_US, int(self.tempo_inicializacao * 1e6))
+        logging.info(f"Janela interativa em {self.tempo_inicializacao:.2f}s desde o início do programa")
+        self._pre_carregar_modelo()
+
+    def _pre_carregar_modelo(self):
+        """Carrega em segundo plano o último modelo usado; o primeiro clique aguarda essa mesma carga"""
+        if not self.pre_carregar_modelo.get() or self.usar_servico.get():
+            return
+        self.motor.opcoes = self._opcoes_atuais()
+        threading.Thread(target=self._executar_pre_carregamento, name="pre-carregamento", daemon=True).start()
+
+    def _executar_pre_carregamento(self):
+        try:
+            self.motor.carregar_modelo()
+        except Exception as e:
+            # O evento 'modelo' com estado 'erro' já atualizou o status; o clique tentará de novo
+            logging.warning(f"Pré-carregamento do modelo falhou: {e}")
+
     def iniciar_interface(self):
         # Configurar evento de fechamento da janela
         self.root.protocol("WM_DELETE_WINDOW", self._fechar_aplicacao)
+        self.root.after_idle(self._ao_exibir_janela)
         self.root.mainloop()
 
 
@@ -0,0 +1,142 @@
+"""Detecção de voz (VAD) por energia, aplicada ao PCM decodificado antes da inferência.
+
+A energia é medida em quadros de 30 ms de forma vetorizada; o limiar se adapta ao ruído de
+fundo de cada gravação (um percentil baixo da energia em dB). Trechos sem fala mais longos
+que PAUSA_MAXIMA são descartados, e os cortes entre segmentos caem em pausas em vez de em
+múltiplos fixos de `segmento_duracao`. Os segmentos continuam sendo views do buffer original,
+com o instante de início no arquivo, então os timestamps não mudam.
+"""
+import numpy as np
+
+DURACAO_QUADRO = 0.03  # Segundos por quadro de análise
+MARGEM_DB = 10.0  # Quanto acima do ruído de fundo um quadro precisa estar para contar como fala
+LIMIAR_MINIMO_DB = -55.0  # Abaixo disso é sempre silêncio, mesmo em gravações muito limpas
+CONTRASTE_MINIMO_DB = 10.0  # O limiar nunca passa do percentil 95 menos este valor
+SILENCIO_MINIMO = 0.3  # Pausas mais curtas fazem parte da fala
+FALA_MINIMA = 0.2  # Trechos de fala mais curtos são tratados como ruído
+FOLGA = 0.15  # Margem mantida antes e depois de cada trecho de fala
+PAUSA_MAXIMA = 2.0  # Pausas até este tamanho ficam dentro do segmento; maiores são descartadas
+
+
+def _energia_quadros_db(audio, amostras_quadro):
+    n_quadros = len(audio) // amostras_quadro
+    if n_quadros == 0:
+        return np.empty(0, np.float32)
+    quadros = audio[:n_quadros * amostras_quadro].reshape(n_quadros, amostras_quadro)
+    # einsum evita a cópia temporária que quadros ** 2 criaria
+    energia = np.einsum('ij,ij->i', quadros, quadros) / amostras_quadro
+    return 10.0 * np.log10(energia + 1e-10)
+
+
+def _trechos(mascara):
+    """Converte uma máscara booleana em arrays (inicios, fins) de trechos verdadeiros"""
+    bordas = np.diff(np.concatenate(([0], mascara.view(np.int8), [0])))
+    return np.flatnonzero(bordas == 1), np.flatnonzero(bordas == -1)
+
+
+def detectar_fala(audio, taxa):
+    """Retorna (trechos de fala em quadros [(inicio, fim)], energia em dB, amostras por quadro)"""
+    amostras_quadro = int(DURACAO_QUADRO * taxa)
+    energia_db = _energia_quadros_db(audio, amostras_quadro)
+    if len(energia_db) == 0:
+        return [], energia_db, amostras_quadro
+
+    piso, pico = np.percentile(energia_db, [10, 95])
+    limiar = max(min(piso + MARGEM_DB, pico - CONTRASTE_MINIMO_DB), LIMIAR_MINIMO_DB)
+    inicios, fins = _trechos(energia_db > limiar)
+    if len(inicios) == 0:
+        return [], energia_db, amostras_quadro
+
+    # Unir trechos separados por pausas curtas
+    quadros_silencio = int(SILENCIO_MINIMO / DURACAO_QUADRO)
+    separados = np.flatnonzero(inicios[1:] - fins[:-1] >= quadros_silencio)
+    inicios = np.concatenate(([inicios[0]], inicios[1:][separados]))
+    fins = np.concatenate((fins[:-1][separados], [fins[-1]]))
+
+    # Descartar estalos curtos e aplicar a folga
+    longos = (fins - inicios) >= int(FALA_MINIMA / DURACAO_QUADRO)
+    folga = int(FOLGA / DURACAO_QUADRO)
+    inicios = np.maximum(inicios[longos] - folga, 0)
+    fins = np.minimum(fins[longos] + folga, len(energia_db))
+    return list(zip(inicios.tolist(), fins.tolist())), energia_db, amostras_quadro
+
+
+def amostra_mais_silenciosa(audio, taxa):
+    """Amostra no meio da pausa de SILENCIO_MINIMO segundos com menor energia do trecho.
+
+    Usada para escolher onde dividir um arquivo longo sem cortar uma palavra ao meio.
+    """
+    amostras_quadro = int(DURACAO_QUADRO * taxa)
+    energia_db = _energia_quadros_db(audio, amostras_quadro)
+    largura = int(SILENCIO_MINIMO / DURACAO_QUADRO)
+    if len(energia_db) < largura:
+        return len(audio) // 2
+    media = np.convolve(energia_db, np.ones(largura) / largura, mode='valid')
+    return (int(np.argmin(media)) + largura // 2) * amostras_quadro
+
+
+def segmentar_fala(audio, segundos_por_segmento, taxa):
+    """Agrupa a fala em segmentos de até `segundos_por_segmento`, cortando nas pausas.
+
+    Retorna pares (inicio_amostra, fim_amostra); o áudio fora deles é silêncio descartado.
+    """
+    trechos, energia_db, amostras_quadro = detectar_fala(audio, taxa)
+    max_quadros = max(1, int(segundos_por_segmento / DURACAO_QUADRO))
+    pausa_quadros = int(PAUSA_MAXIMA / DURACAO_QUADRO)
+
+    # Trechos de fala contínua maiores que o segmento são cortados no quadro mais silencioso
+    # da segunda metade da janela
+    divididos = []
+    for inicio, fim in trechos:
+        while fim - inicio > max_quadros:
+            janela = energia_db[inicio + max_quadros // 2:inicio + max_quadros]
+            corte = inicio + max_quadros // 2 + int(np.argmin(janela))
+            divididos.append((inicio, corte))
+            inicio = corte
+        divididos.append((inicio, fim))
+
+    # Trechos próximos viram um único segmento, para não chamar o modelo para cada frase
+    segmentos = []
+    for inicio, fim in divididos:
+        if segmentos and inicio - segmentos[-1][1] <= pausa_quadros and fim - segmentos[-1][0] <= max_quadros:
+            segmentos[-1][1] = fim
+        else:
+            segmentos.append([inicio, fim])
+
+    return [(inicio * amostras_quadro, min(fim * amostras_quadro, len(audio))) for inicio, fim in segmentos]
+
+
+def iterar_segmentos_fala(audio, segundos_por_segmento, taxa, inicio=0.0):
+    """Gera (inicio_seg, view) só com a fala de um buffer já decodificado"""
+    deslocamento = int(round(inicio * taxa))
+    trecho = audio[deslocamento:]
+    for inicio_amostra, fim_amostra in segmentar_fala(trecho, segundos_por_segmento, taxa):
+        yield (deslocamento + inicio_amostra) / taxa, trecho[inicio_amostra:fim_amostra]
+
+
+def segmentar_fala_em_fluxo(blocos, segundos_por_segmento, taxa):
+    """Aplica o VAD a blocos (inicio_seg, array) vindos da decodificação em streaming.
+
+    O último segmento de cada bloco pode continuar no próximo; por isso ele é guardado e
+    reavaliado junto com o bloco seguinte, e o corte continua caindo em uma pausa.
+    """
+    pendente, inicio_pendente = None, 0.0
+    amostras_pausa = int(PAUSA_MAXIMA * taxa)
+    for inicio_bloco, bloco in blocos:
+        if pendente is not None and len(pendente):
+            audio, base = np.concatenate((pendente, bloco)), inicio_pendente
+        else:
+            audio, base = bloco, inicio_bloco
+
+        segmentos = segmentar_fala(audio, segundos_por_segmento, taxa)
+        corte = len(audio)
+        if segmentos and len(audio) - segmentos[-1][1] <= amostras_pausa:
+            corte = segmentos.pop()[0]
+        for inicio_amostra, fim_amostra in segmentos:
+            yield base + inicio_amostra / taxa, audio[inicio_amostra:fim_amostra]
+
+        pendente, inicio_pendente = audio[corte:], base + corte / taxa
+
+    if pendente is not None and len(pendente):
+        for inicio_amostra, fim_amostra in segmentar_fala(pendente, segundos_por_segmento, taxa):
+            yield inicio_pendente + inicio_amostra / taxa, pendente[inicio_amostra:fim_amostra]
@@ -0,0 +1,156 @@
+"""Descoberta de arquivos de áudio em fluxo e consulta das durações em segundo plano.
+
+A varredura usa os.scandir e entrega cada arquivo assim que ele é encontrado, então um lote
+sobre uma árvore com dezenas de milhares de arquivos começa a transcrever antes de a árvore
+ter sido listada inteira. As durações (ffprobe) são consultadas por um pool pequeno de threads
+à medida que os arquivos aparecem; o progresso do lote é medido em segundos de áudio.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ESPERA_ONDA = 1.0  # Segundos que uma onda aguarda por mais arquivos depois do primeiro
+THREADS_SONDA = 4  # Processos ffprobe simultâneos
+
+
+def varrer_arquivos_audio(pasta, extensoes, incluir_subpastas=False):
+    """Gera os arquivos de `pasta` cuja extensão (minúscula, com o ponto) está em `extensoes`.
+
+    Cada diretório é lido uma vez com os.scandir e os nomes saem em ordem alfabética. Como no
+    os.walk, links para diretórios não são seguidos; um subdiretório ilegível é registrado e
+    ignorado, e um erro na própria `pasta` é propagado.
+    """
+    with os.scandir(pasta) as entradas:
+        entradas = sorted(entradas, key=lambda entrada: entrada.name)
+    for entrada in entradas:
+        try:
+            if entrada.is_dir(follow_symlinks=False):
+                if not incluir_subpastas:
+                    continue
+                try:
+                    yield from varrer_arquivos_audio(entrada.path, extensoes, incluir_subpastas)
+                except OSError as e:
+                    logging.warning(f"Pasta ignorada na varredura: '{entrada.path}': {e}")
+            elif os.path.splitext(entrada.name)[1].lower() in extensoes and entrada.is_file():
+                yield entrada.path
+        except OSError as e:
+            logging.warning(f"Entrada ignorada na varredura: '{entrada.path}': {e}")
+
+
+class VarreduraAudio:
+    """Varre uma pasta em uma thread e entrega os arquivos encontrados em ondas"""
+
+    def __init__(self, pasta, extensoes, incluir_subpastas=False, ao_encontrar=None):
+        self.pasta = pasta
+        self.extensoes = extensoes
+        self.incluir_subpastas = incluir_subpastas
+        self.ao_encontrar = ao_encontrar  # Chamado na thread da varredura para cada arquivo
+        self.encontrados = []
+        self.concluida = False
+        self.erro = None  # OSError da pasta raiz, se houver
+        self._cancelada = False
+        self._condicao = threading.Condition()
+
+    def iniciar(self):
+        threading.Thread(target=self._varrer, daemon=True).start()
+        return self
+
+    def cancelar(self):
+        self._cancelada = True
+
+    def _varrer(self):
+        try:
+            for caminho in varrer_arquivos_audio(self.pasta, self.extensoes, self.incluir_subpastas):
+                if self._cancelada:
+                    break
+                if self.ao_encontrar is not None:
+                    self.ao_encontrar(caminho)
+                with self._condicao:
+                    self.encontrados.append(caminho)
+                    self._condicao.notify_all()
+        except OSError as e:
+            self.erro = e
+        finally:
+            with self._condicao:
+                self.concluida = True
+                self._condicao.notify_all()
+
+    def proximos(self, ja_entregues, espera=ESPERA_ONDA):
+        """Arquivos encontrados além dos `ja_entregues` primeiros; lista vazia quando não há mais.
+
+        Bloqueia até surgir um arquivo novo e então aguarda até `espera` segundos por outros,
+        para que a onda não tenha um arquivo só. Com `espera` None, aguarda a varredura inteira.
+        """
+        with self._condicao:
+            self._condicao.wait_for(lambda: len(self.encontrados) > ja_entregues or self.concluida)
+            limite = None if espera is None else time.monotonic() + espera
+            while not self.concluida:
+                restante = None if limite is None else limite - time.monotonic()
+                if restante is not None and restante <= 0:
+                    break
+                self._condicao.wait(restante)
+            return self.encontrados[ja_entregues:]
+
+
+class SondaDuracoes:
+    """Durações dos arquivos do lote, consultadas em segundo plano.
+
+    Quem pergunta não espera: enquanto a duração de um arquivo não chegou, ou se o ffprobe
+    falhou, vale a média das durações já conhecidas.
+    """
+
+    def __init__(self, obter_duracao, max_workers=THREADS_SONDA):
+        self._obter_duracao = obter_duracao
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sonda-duracao")
+        self._lock = threading.Lock()
+        self._futuros = {}  # caminho -> Future da consulta
+        self._duracoes = {}  # caminho -> segundos, só as consultas bem-sucedidas
+        self._soma = 0.0
+        self._encerrada = False
+
+    def sondar(self, caminhos):
+        with self._lock:
+            if self._encerrada:
+                return
+            for caminho in caminhos:
+                if caminho not in self._futuros:
+                    self._futuros[caminho] = self._executor.submit(self._consultar, caminho)
+
+    def _consultar(self, caminho):
+        duracao = self._obter_duracao(caminho)
+        if duracao is not None:
+            with self._lock:
+                self._duracoes[caminho] = duracao
+                self._soma += duracao
+        return duracao
+
+    def aguardar(self, caminho):
+        """Duração consultada do arquivo (None se o ffprobe falhou), esperando a consulta terminar"""
+        self.sondar([caminho])
+        futuro = self._futuros.get(caminho)
+        return None if futuro is None or futuro.cancelled() else futuro.result()
+
+    def estimada(self, caminho):
+        with self._lock:
+            duracao = self._duracoes.get(caminho)
+            if duracao is None and self._duracoes:
+                duracao = self._soma / len(self._duracoes)
+            return duracao or 0.0
+
+    def total_estimado(self):
+        """Soma das durações de todos os arquivos registrados, com a média no lugar das desconhecidas"""
+        with self._lock:
+            if not self._duracoes:
+                return 0.0
+            desconhecidas = len(self._futuros) - len(self._duracoes)
+            return self._soma + desconhecidas * self._soma / len(self._duracoes)
+
+    def __len__(self):
+        return len(self._futuros)
+
+    def encerrar(self):
+        with self._lock:
+            self._encerrada = True
+        self._executor.shutdown(wait=False, cancel_futures=True)